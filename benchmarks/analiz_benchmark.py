@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Toplu analiz (AIEngine.analyze_batch) için performans ölçümü.
+
+kaynaklar.csv'deki sorularla rastgele cevap ve hissiyat matrisleri üretir,
+analyze_batch süresini ölçer ve bir örneklem üzerinde sonuçların
+analyze_student ile aynı olduğunu doğrular.
+
+Kullanım:
+    python benchmarks/analiz_benchmark.py --ogrenci 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config import settings
+from core.ai_engine import AIEngine
+from core.data_loader import DataLoader
+from models.answer_matrix import AnswerMatrix, HISSIYATLAR, BOS, BELIRSIZ
+
+
+def sentetik_matris(soru_nolari, ogrenci_sayisi: int, rng) -> AnswerMatrix:
+    """Rastgele cevaplar (boş ve belirsiz dahil) ve hissiyatlarla bir cevap matrisi üretir"""
+    secenekler = tuple(settings.SECENEKLER)
+    cevaplar = rng.integers(BELIRSIZ, len(secenekler), size=(ogrenci_sayisi, len(soru_nolari))).astype(np.int8)
+    kimlik = pd.DataFrame({
+        'okul_no': [str(i) for i in range(ogrenci_sayisi)],
+        'ad_soyad': [f"Öğrenci {i}" for i in range(ogrenci_sayisi)],
+        'sinif_sube': "5A",
+        'dosya': [f"sonuc_5A_{i}_Ogrenci.json" for i in range(ogrenci_sayisi)]
+    })
+    hissiyat = rng.integers(0, len(HISSIYATLAR), size=cevaplar.shape).astype(np.int8)
+    return AnswerMatrix(cevaplar=cevaplar, soru_nolari=np.array(soru_nolari, dtype=np.int32),
+                        secenekler=secenekler, kimlik=kimlik, hissiyat=hissiyat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toplu analiz performans ölçümü")
+    parser.add_argument("--ogrenci", type=int, default=5000, help="Öğrenci sayısı")
+    parser.add_argument("--dogrulama", type=int, default=200, help="analyze_student ile karşılaştırılacak öğrenci sayısı")
+    parser.add_argument("--tohum", type=int, default=0, help="Rastgele sayı tohumu")
+    args = parser.parse_args()
+
+    motor = AIEngine()
+    motor.set_questions(DataLoader().get_questions())
+    soru_nolari = [q.soru_no for q in motor.questions]
+    matris = sentetik_matris(soru_nolari, args.ogrenci, np.random.default_rng(args.tohum))
+
+    baslangic = time.perf_counter()
+    sonuc = motor.analyze_batch(matris)
+    toplu_sure = time.perf_counter() - baslangic
+
+    ornek = min(args.dogrulama, args.ogrenci)
+    baslangic = time.perf_counter()
+    uyusmayan = 0
+    for i in range(ornek):
+        hissiyatlar = {str(s): HISSIYATLAR[k] for s, k in zip(soru_nolari, matris.hissiyat[i].tolist())}
+        tekil = motor.analyze_student(matris.ogrenci(i, hissiyatlar))
+        for beklenen, bulunan in zip(tekil, sonuc.sonuclar(i)):
+            uyusmayan += beklenen.to_dict() != bulunan.to_dict()
+    tekil_sure = (time.perf_counter() - baslangic) / max(ornek, 1) * args.ogrenci
+
+    print(f"Öğrenci x soru     : {args.ogrenci} x {len(soru_nolari)}")
+    print(f"analyze_batch      : {1000 * toplu_sure:.1f} ms")
+    print(f"analyze_student    : {1000 * tekil_sure:.1f} ms (tahmini, {ornek} öğrenciden)")
+    print(f"Uyuşmayan sonuç    : {uyusmayan}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optik okuma motoru için performans ölçümü.
+
+Sentetik optik formlar üretir, bunları OptikEngine ile okur ve saniyedeki
+form sayısını, aşama başına ortalama gecikmeyi ve okuma doğruluğunu
+raporlar.
+
+Kullanım:
+    python benchmarks/optik_benchmark.py --form 500 --isci 4
+    python benchmarks/optik_benchmark.py --aci 3 --olcek 1.5   # eğik ve büyük taramalar
+    python benchmarks/optik_benchmark.py --olcek 3 --bicim jpg  # ~300 dpi JPEG taramalar
+    python benchmarks/optik_benchmark.py --yigin                # tek çok sayfalı TIFF
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.optik_engine import OptikEngine, FormLayout
+from utils.image_processor import sayfalari_listele
+
+_motor = None
+
+
+def _isci_baslat():
+    global _motor
+    _motor = OptikEngine()
+    _motor.hata_ayiklama = False
+
+
+def _isci_oku(sayfa):
+    dosya_yolu, sayfa_no = sayfa
+    zamanlama = {}
+    sonuc = _motor.formu_oku(dosya_yolu, zamanlama, sayfa_no)
+    return sonuc, zamanlama
+
+
+def sentetik_form_ciz(layout: FormLayout, cevaplar, aci: float = 0.0, olcek: float = 1.0,
+                      okul_no: str = "", sinif_sube: str = ""):
+    """Verilen cevaplar ve kimlikle doldurulmuş, isteğe bağlı olarak döndürülüp ölçeklenmiş bir form görüntüsü üretir"""
+    genislik, yukseklik = layout.sayfa_boyutu
+    img = np.full((yukseklik, genislik), 255, dtype=np.uint8)
+    for soru, soru_merkezleri in enumerate(layout.baloncuk_merkezleri):
+        for j, (x, y) in enumerate(soru_merkezleri):
+            dolu = cevaplar[soru] == j
+            cv2.circle(img, (int(x), int(y)), 8, 0, -1 if dolu else 1)
+    kodlar = layout.kimlik_kodla(okul_no, sinif_sube)
+    for alan in layout.kimlik_alanlari:
+        for hane, secim in enumerate(kodlar[alan.ad]):
+            for k, (x, y) in enumerate(alan.baloncuk_merkezleri[hane]):
+                cv2.circle(img, (int(x), int(y)), 8, 0, -1 if k == secim else 1)
+    if layout.hizalama_isaretleri is not None:
+        for x, y in layout.hizalama_isaretleri:
+            cv2.circle(img, (int(x), int(y)), layout.hizalama_yaricap, 0, -1)
+    if aci or olcek != 1.0:
+        donusum = cv2.getRotationMatrix2D((genislik / 2, yukseklik / 2), aci, olcek)
+        # Sayfa ortada kalacak şekilde ölçeklenmiş tuvale taşı
+        donusum[:, 2] += (np.array([genislik, yukseklik]) * (olcek - 1)) / 2
+        boyut = (int(round(genislik * olcek)), int(round(yukseklik * olcek)))
+        img = cv2.warpAffine(img, donusum, boyut, borderValue=255)
+    return img
+
+
+def sentetik_form_olustur(layout: FormLayout, cevaplar, dosya_yolu: Path, aci: float = 0.0, olcek: float = 1.0,
+                          okul_no: str = "", sinif_sube: str = ""):
+    cv2.imwrite(str(dosya_yolu), sentetik_form_ciz(layout, cevaplar, aci, olcek, okul_no, sinif_sube))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optik okuma motoru performans ölçümü")
+    parser.add_argument("--form", type=int, default=200, help="Üretilecek form sayısı")
+    parser.add_argument("--isci", type=int, default=1, help="Süreç havuzundaki işçi sayısı")
+    parser.add_argument("--tohum", type=int, default=0, help="Rastgele sayı tohumu")
+    parser.add_argument("--aci", type=float, default=0.0, help="Formların en fazla kaç derece döndürüleceği")
+    parser.add_argument("--olcek", type=float, default=1.0, help="Tarama çözünürlüğünün form boyutuna oranı")
+    parser.add_argument("--bicim", choices=("png", "jpg", "tif"), default="png", help="Tarama dosya biçimi")
+    parser.add_argument("--yigin", action="store_true", help="Tüm formları tek bir çok sayfalı TIFF olarak yaz")
+    args = parser.parse_args()
+
+    layout = FormLayout.varsayilan()
+    rng = np.random.default_rng(args.tohum)
+    # -1: boş bırakılmış soru
+    beklenen = rng.integers(-1, len(layout.secenekler), size=(args.form, layout.soru_sayisi))
+    okul_nolari = [str(n) for n in rng.integers(1, 10 ** layout.kimlik_alanlari[0].hane_sayisi, size=args.form)]
+    subeler = [f"{rng.integers(1, 13)}{rng.choice(list(layout.kimlik_alanlari[2].etiketler))}" for _ in range(args.form)]
+
+    with tempfile.TemporaryDirectory(prefix="optik_benchmark_") as gecici:
+        dosyalar = []
+        yigin = []
+        for i in range(args.form):
+            aci = rng.uniform(-args.aci, args.aci) if args.aci else 0.0
+            if args.yigin:
+                yigin.append(sentetik_form_ciz(layout, beklenen[i], aci, args.olcek, okul_nolari[i], subeler[i]))
+                continue
+            dosya_yolu = Path(gecici) / f"5A_{i}_FORM.{args.bicim}"
+            sentetik_form_olustur(layout, beklenen[i], dosya_yolu, aci, args.olcek, okul_nolari[i], subeler[i])
+            dosyalar.append(dosya_yolu)
+        if args.yigin:
+            dosya_yolu = Path(gecici) / "5A_YIGIN.tif"
+            cv2.imwritemulti(str(dosya_yolu), yigin)
+            dosyalar.append(dosya_yolu)
+        sayfalar = list(sayfalari_listele(dosyalar))
+
+        baslangic = time.perf_counter()
+        if args.isci > 1:
+            with ProcessPoolExecutor(max_workers=args.isci, initializer=_isci_baslat) as havuz:
+                ciktilar = list(havuz.map(_isci_oku, sayfalar, chunksize=8))
+        else:
+            _isci_baslat()
+            ciktilar = [_isci_oku(sayfa) for sayfa in sayfalar]
+        toplam_sure = time.perf_counter() - baslangic
+
+    zamanlama = {}
+    dogru = 0
+    hizalanan = 0
+    kimlik_dogru = 0
+    for i, (sonuc, sureler) in enumerate(ciktilar):
+        hizalanan += sonuc.get('hizalama', {}).get('durum') == 'hizalandi'
+        kimlik_dogru += (sonuc.get('okul_no'), sonuc.get('sinif_sube')) == (okul_nolari[i], subeler[i])
+        for asama, sure in sureler.items():
+            zamanlama[asama] = zamanlama.get(asama, 0.0) + sure
+        for soru in range(layout.soru_sayisi):
+            cevap = sonuc.get('cevaplar', {}).get(str(soru + 1))
+            hedef = None if beklenen[i, soru] < 0 else layout.secenekler[beklenen[i, soru]]
+            dogru += cevap == hedef
+
+    print(f"Form sayısı      : {args.form}")
+    print(f"İşçi sayısı      : {args.isci}")
+    print(f"Toplam süre      : {toplam_sure:.3f} s")
+    print(f"Hız              : {args.form / toplam_sure:.1f} form/s")
+    for asama, sure in zamanlama.items():
+        print(f"  {asama:<15}: {1000 * sure / args.form:.3f} ms/form")
+    print(f"Hizalanan form   : {hizalanan}/{args.form}")
+    print(f"Okuma doğruluğu  : {100 * dogru / beklenen.size:.2f}%")
+    print(f"Kimlik doğruluğu : {100 * kimlik_dogru / args.form:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
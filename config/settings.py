@@ -13,15 +13,82 @@ OPTIK_CEVAPLAR_DIR = DATA_DIR / "optik_cevaplar"
 TEMPLATE_OUTPUT_DIR = DATA_DIR / "template_output"
 RAPORLAR_DIR = DATA_DIR / "raporlar"
 
+# Rapor şablonu ve raporların bağlandığı ortak stil sayfası
+TEMPLATES_DIR = BASE_DIR / "templates"
+STATIC_DIR = BASE_DIR / "static"
+RAPOR_SABLONU_PATH = TEMPLATES_DIR / "student_detail.html"
+RAPOR_STIL_PATH = STATIC_DIR / "css" / "style.css"
+# Sınıf PDF raporlarına gömülen yazı tipleri (DejaVu Sans)
+FONT_DIR = BASE_DIR / "ttf"
+
 # Optik form ayarları
 SORU_SAYISI = 20
 SECENEKLER = ['a', 'b', 'c', 'd', 'e']
+# Optik formdaki kimlik alanı: okul no ve sınıf hane sayıları, şube seçenekleri
+OKUL_NO_HANE = 4
+SINIF_HANE = 2
+SUBELER = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
 BOS_ESIK = 0.3
 DOLU_ESIK = 0.5
+# Köşe hizalama işaretleriyle eğik/kaymış taramaları düzeltme ve işaretlerin
+# beklenen konum çevresinde aranacağı pencerenin yarı boyu (sayfa boyutuna oran)
+OPTIK_HIZALAMA = True
+OPTIK_HIZALAMA_PENCERESI = 0.08
+# Ön işleme bölgesi: "baloncuk" yalnızca baloncukları kapsayan bölgeyi, "tam" tüm sayfayı eşikler
+OPTIK_ONISLEME_BOLGESI = "baloncuk"
+# Taramaların okunurken küçültülme oranı (1, 2, 4 veya 8). Küçültülmüş görüntü
+# form boyutunun OPTIK_MIN_OLCEK katından küçük kalırsa tam çözünürlükte okunur.
+OPTIK_KUCULTME = 2
+OPTIK_MIN_OLCEK = 1.0
+# PDF girdilerin sayfa başına işlenme çözünürlüğü (PyMuPDF gerektirir)
+OPTIK_PDF_DPI = 200
+
+# Optik toplu işleme ayarları (None: CPU çekirdek sayısı, 1: seri işleme)
+OPTIK_ISCI_SAYISI = None
+# İşlenmiş formların boyut/zaman/özet ve sonuç kaydı (artımlı ve devam ettirilebilir işlem için)
+OPTIK_MANIFEST_PATH = DATA_DIR / "optik_manifest.jsonl"
+# Optik sonuç dosyalarını toplu okuyan iş parçacığı sayısı (None: otomatik)
+VERI_OKUMA_ISCI_SAYISI = None
+# Optik okuma, analiz ve rapor sonuçlarının SQLite deposu (form başına JSON dosyası yerine)
+SONUC_DEPOSU_PATH = DATA_DIR / "sonuclar.sqlite"
+# Öğrenci raporlarını yazan işçi süreç sayısı (None: CPU çekirdek sayısı, 1: seri) ve
+# işçi başına aynı anda bekleyebilecek rapor parçası sayısı
+RAPOR_ISCI_SAYISI = None
+RAPOR_KUYRUK_CARPANI = 4
+# Depodaki rapor verilerinin kodlanması: "json" (standart kütüphane) veya "orjson" (kuruluysa)
+# ve gzip sıkıştırma seviyesi (0: sıkıştırma yok)
+RAPOR_KODLAYICI = "json"
+RAPOR_GZIP_SEVIYESI = 6
+
+# Klasör izleme modu (main.py -watch): yoklama aralığı, dosyanın değişmeden
+# beklemesi gereken süre (saniye) ve işçi havuzuna giden kuyruğun boyutu
+IZLEME_YOKLAMA_ARALIGI = 2.0
+IZLEME_BEKLEME_SURESI = 3.0
+IZLEME_KUYRUK_BOYUTU = 64
+
+# Hata ayıklama görüntüleri: "kapali", "ornek" (her N formdan biri ve belirsiz cevaplar) veya "tam".
+# HATA_AYIKLAMA_MAKS_DOSYA çalışma başına toplam sınırdır (süreç havuzunda işçilere bölünür).
+HATA_AYIKLAMA_MODU = "kapali"
+HATA_AYIKLAMA_ORNEK_ARALIGI = 50
+HATA_AYIKLAMA_DIZINI = DATA_DIR / "hata_ayiklama"
+HATA_AYIKLAMA_MAKS_DOSYA = 5000
+HATA_AYIKLAMA_KUYRUK_BOYUTU = 256
 
 # AI ve Analiz ayarları
 GUVEN_ESIK_DUSUK = 0.3
 GUVEN_ESIK_YUKSEK = 0.7
+# Sınıf özetleri: bir temada tam öğrenme sayılan doğru oranı ve ayırt edicilik
+# indeksinde kullanılan üst/alt dilim oranı
+TAM_OGRENME_ESIGI = 0.8
+AYIRT_EDICILIK_ORANI = 0.27
+# IRT kalibrasyonu: None (kapalı), "rasch" veya "2pl". Açıkken zorluk seviyesi
+# soru güçlüğü ile öğrenci yeteneği farkından (logit) belirlenir; fark
+# IRT_ZORLUK_SINIRI'ndan büyükse "Zor", -IRT_ZORLUK_SINIRI'ndan küçükse "Kolay".
+# Tavsiyeler de bu seviyeye göre seçilir (tavsiyeler.csv'deki isteğe bağlı Zorluk sütunu).
+IRT_MODELI = None
+IRT_ZORLUK_SINIRI = 1.0
+# Son kalibrasyonun soru parametreleri (sonraki sınavda başlangıç değeri olarak kullanılır)
+IRT_PARAMETRE_PATH = DATA_DIR / "irt_parametreleri.json"
 
 # Loglama ayarları
 LOG_DIR = BASE_DIR / "logs"
@@ -36,6 +103,8 @@ OPTIK_CEVAPLAR_DIR = DATA_DIR / "optik_cevaplar"
 
 # config.py dosyasına hissiyatlar path'ini ekleyin
 HISSIYATLAR_PATH = DATA_DIR / "hissiyatlar" / "hissiyatlar.csv"
+# (durum, hissiyat) tavsiye kuralları; okullar mesajları bu dosyadan özelleştirebilir
+TAVSIYELER_PATH = DATA_DIR / "tavsiyeler" / "tavsiyeler.csv"
 
 # Güven eşik değerleri
 GUVEN_ESIK_DUSUK = 0.3
@@ -0,0 +1,107 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+from config import settings
+from utils.logger import logger
+from models.answer_matrix import BELIRSIZ, HISSIYATLAR
+from models.result import AnalysisBatch, DURUMLAR
+
+DOGRU = DURUMLAR.index("Doğru")
+
+
+class AggregateEngine:
+    """Toplu analiz sonuçlarından sınıf ve okul düzeyinde özetler çıkarır.
+
+    Tüm hesaplar AnalysisBatch kod matrisleri üzerinde grup başına
+    np.bincount indirgemeleridir; öğrenci veya soru başına döngü yoktur.
+    Okul özeti, tüm öğrencilerin tek grup sayıldığı aynı hesaptır.
+    """
+
+    def __init__(self, tam_ogrenme_esigi: float = None, ayirt_edicilik_orani: float = None):
+        self.tam_ogrenme_esigi = settings.TAM_OGRENME_ESIGI if tam_ogrenme_esigi is None else tam_ogrenme_esigi
+        self.ayirt_edicilik_orani = (settings.AYIRT_EDICILIK_ORANI if ayirt_edicilik_orani is None
+                                     else ayirt_edicilik_orani)
+
+    def hesapla(self, batch: AnalysisBatch, grup_sutunu: str = 'sinif_sube') -> Dict:
+        """{'siniflar': {sınıf: özet}, 'okul': özet} döndürür"""
+        gruplar, adlar = pd.factorize(batch.kimlik[grup_sutunu].astype(str), sort=True)
+        siniflar = self._grup_ozetleri(batch, gruplar.astype(np.intp), len(adlar))
+        okul = self._grup_ozetleri(batch, np.zeros(len(batch), dtype=np.intp), 1)[0]
+        logger.info(f"{len(batch)} öğrenci için {len(adlar)} sınıf özeti hesaplandı")
+        return {
+            'siniflar': dict(zip(adlar.tolist(), siniflar)),
+            'okul': okul
+        }
+
+    def _grup_ozetleri(self, batch: AnalysisBatch, g: np.ndarray, grup_sayisi: int):
+        n, soru_sayisi = batch.durum.shape
+        dogru = (batch.durum == DOGRU)
+        ogrenci_sayilari = np.bincount(g, minlength=grup_sayisi)
+        bolen = np.maximum(ogrenci_sayilari, 1)[:, None]
+
+        # (grup, soru) hücre indeksi; her öğrenci satırı kendi grubunun bloğuna düşer
+        hucre = g[:, None] * soru_sayisi + np.arange(soru_sayisi)
+
+        def grup_soru_toplami(agirlik):
+            return np.bincount(hucre.ravel(), weights=agirlik.ravel(),
+                               minlength=grup_sayisi * soru_sayisi).reshape(grup_sayisi, soru_sayisi)
+
+        # Soru güçlüğü (p değeri): soruyu doğru yanıtlayanların oranı
+        p_degeri = grup_soru_toplami(dogru) / bolen
+
+        # Ayırt edicilik: grup içinde toplam puana göre üst ve alt dilimlerin p farkı
+        toplam_puan = dogru.sum(axis=1)
+        sira = np.lexsort((toplam_puan, g))
+        baslangic = np.concatenate(([0], np.cumsum(ogrenci_sayilari)[:-1]))
+        grup_ici_sira = np.empty(n, dtype=np.intp)
+        grup_ici_sira[sira] = np.arange(n) - baslangic[g[sira]]
+        dilim = np.ceil(ogrenci_sayilari * self.ayirt_edicilik_orani).astype(np.intp)
+        alt = grup_ici_sira < dilim[g]
+        ust = grup_ici_sira >= (ogrenci_sayilari - dilim)[g]
+        dilim_boleni = np.maximum(dilim, 1)[:, None]
+        ayirt_edicilik = (grup_soru_toplami(dogru & ust[:, None])
+                          - grup_soru_toplami(dogru & alt[:, None])) / dilim_boleni
+
+        # Seçenek dağılımı: kodlar BELIRSIZ..k-1 aralığından 0..k+1 aralığına kaydırılır
+        kod_sayisi = len(batch.secenekler) - BELIRSIZ
+        kodlar = batch.cevaplar.astype(np.intp) - BELIRSIZ
+        secenek_dagilimi = np.bincount((hucre * kod_sayisi + kodlar).ravel(),
+                                       minlength=grup_sayisi * soru_sayisi * kod_sayisi
+                                       ).reshape(grup_sayisi, soru_sayisi, kod_sayisi)
+
+        # Tema başarısı ve tam öğrenme: öğrenci x tema doğru oranı eşiği geçenlerin payı
+        tema_sayisi = len(batch.temalar)
+        tema_soru_sayisi = np.bincount(batch.tema_kodlari, minlength=tema_sayisi)
+        tema_matrisi = np.zeros((soru_sayisi, tema_sayisi))
+        tema_matrisi[np.arange(soru_sayisi), batch.tema_kodlari] = 1.0
+        ogrenci_tema = (dogru @ tema_matrisi) / np.maximum(tema_soru_sayisi, 1)
+        tema_hucre = (g[:, None] * tema_sayisi + np.arange(tema_sayisi)).ravel()
+        tema_basarisi = np.bincount(tema_hucre, weights=ogrenci_tema.ravel(),
+                                    minlength=grup_sayisi * tema_sayisi).reshape(grup_sayisi, tema_sayisi) / bolen
+        tam_ogrenme = np.bincount(tema_hucre, weights=(ogrenci_tema >= self.tam_ogrenme_esigi).ravel(),
+                                  minlength=grup_sayisi * tema_sayisi).reshape(grup_sayisi, tema_sayisi) / bolen
+
+        # Hissiyat x durum çapraz tablosu
+        hissiyat_hucre = (g[:, None] * len(HISSIYATLAR) + batch.hissiyat) * len(DURUMLAR) + batch.durum
+        hissiyat_durum = np.bincount(hissiyat_hucre.ravel(),
+                                     minlength=grup_sayisi * len(HISSIYATLAR) * len(DURUMLAR)
+                                     ).reshape(grup_sayisi, len(HISSIYATLAR), len(DURUMLAR))
+
+        etiketler = ("belirsiz", "boş") + batch.secenekler
+        soru_nolari = [str(s) for s in batch.soru_nolari.tolist()]
+        return [
+            {
+                'ogrenci_sayisi': int(ogrenci_sayilari[k]),
+                'ortalama_basari': float(p_degeri[k].mean()) if soru_sayisi else 0.0,
+                'p_degeri': dict(zip(soru_nolari, p_degeri[k].round(4).tolist())),
+                'ayirt_edicilik': dict(zip(soru_nolari, ayirt_edicilik[k].round(4).tolist())),
+                'secenek_dagilimi': {soru: dict(zip(etiketler, sayilar))
+                                     for soru, sayilar in zip(soru_nolari, secenek_dagilimi[k].tolist())},
+                'tema_basarisi': {tema: {'basari_orani': round(b, 4), 'tam_ogrenme_orani': round(t, 4)}
+                                  for tema, b, t in zip(batch.temalar, tema_basarisi[k].tolist(),
+                                                        tam_ogrenme[k].tolist())},
+                'hissiyat_durum': {hissiyat: dict(zip(DURUMLAR, sayilar))
+                                   for hissiyat, sayilar in zip(HISSIYATLAR, hissiyat_durum[k].tolist())}
+            }
+            for k in range(grup_sayisi)
+        ]
@@ -1,17 +1,44 @@
-from typing import Dict, List
+from typing import List, Union
+import numpy as np
 from config import settings
 from utils.logger import logger
 from models.question import Question
-from models.result import AnalysisResult
+from models.question_bank import QuestionBank
+from models.result import AnalysisResult, AnalysisBatch, DURUMLAR, ZORLUK_SEVIYELERI
 from models.student import Student
+from models.answer_matrix import AnswerMatrix, HISSIYATLAR, HISSIYAT_KODLARI
+from core.recommendation_table import RecommendationTable
+from core.irt_calibration import IRTCalibrator
+
+DOGRU, YANLIS, BOS = range(3)
+KOLAY, ORTA, ZOR = range(3)
+
+# Hissiyat koduna göre taban güven ve duruma göre düzeltme (_calculate_confidence_csv ile aynı)
+_HISSIYAT_GUVEN = np.array([{"çok kolay": 0.9, "kolay": 0.7, "orta": 0.5, "zor": 0.3,
+                             "çok zor": 0.1, "anlamadım": 0.1}.get(h, 0.5) for h in HISSIYATLAR])
+_DURUM_DUZELTME = np.array([0.2, -0.2, -0.3])
+
+# (durum, hissiyat) -> zorluk seviyesi tablosu (_determine_difficulty_level ile aynı)
+_ZORLUK_TABLOSU = np.full((len(DURUMLAR), len(HISSIYATLAR)), ORTA, dtype=np.int8)
+for _h in ("çok kolay", "kolay"):
+    _ZORLUK_TABLOSU[DOGRU, HISSIYAT_KODLARI[_h]] = KOLAY
+for _h in ("zor", "çok zor", "anlamadım"):
+    _ZORLUK_TABLOSU[YANLIS, HISSIYAT_KODLARI[_h]] = ZOR
+
 
 class AIEngine:
     def __init__(self):
-        self.questions = []
+        self.questions = ()
+        self.soru_bankasi = QuestionBank.olustur((), settings.SECENEKLER)
+        self.tavsiyeler = RecommendationTable.yukle()
+        self.kalibrasyon = IRTCalibrator(settings.IRT_MODELI) if settings.IRT_MODELI else None
         
-    def set_questions(self, questions: List[Question]):
+    def set_questions(self, questions: Union[QuestionBank, List[Question]]):
         """Analiz için soruları ayarla"""
-        self.questions = questions
+        if not isinstance(questions, QuestionBank):
+            questions = QuestionBank.olustur(questions, settings.SECENEKLER)
+        self.soru_bankasi = questions
+        self.questions = questions.sorular
         
     def analyze_student(self, student: Student) -> List[AnalysisResult]:
         """Öğrenci cevaplarını analiz eder"""
@@ -64,6 +91,72 @@ class AIEngine:
             
         return results
         
+    def analyze_batch(self, matris: AnswerMatrix) -> AnalysisBatch:
+        """Tüm öğrencileri tek seferde analiz eder.
+
+        Öğrenci x soru cevap ve hissiyat matrislerinden durum, güven endeksi
+        ve zorluk seviyesini dizi işlemleri ve arama tablolarıyla hesaplar.
+        Sonuç sütunsal bir AnalysisBatch'tir; sütunlar set_questions ile
+        verilen soru sırasındadır. Satır görünümleri (batch.sonuclar(i))
+        analyze_student ile aynı sonuçları verir.
+
+        settings.IRT_MODELI ayarlıysa tüm yanıt matrisine IRT modeli uydurulur;
+        zorluk seviyesi öğrencinin kendi hissiyatı yerine soru güçlüğü ile
+        öğrenci yeteneği farkından belirlenir, tavsiye bu seviyeye göre
+        seçilir ve kestirimler sonuca eklenir.
+        """
+        banka = self.soru_bankasi
+        if banka.secenekler != matris.secenekler:
+            banka = QuestionBank.olustur(banka.sorular, matris.secenekler)
+        soru_nolari = banka.soru_nolari
+        sutunlar = {soru: j for j, soru in enumerate(matris.soru_nolari.tolist())}
+
+        # Sonuçta olmayan sorular boş, bilinmeyen doğru cevaplar hiçbir cevapla eşleşmez
+        n = len(matris)
+        cevaplar = np.full((n, len(soru_nolari)), -1, dtype=np.int8)
+        hissiyat = np.full((n, len(soru_nolari)), HISSIYAT_KODLARI["belirsiz"], dtype=np.int8)
+        for j, soru in enumerate(soru_nolari.tolist()):
+            if soru in sutunlar:
+                cevaplar[:, j] = matris.cevaplar[:, sutunlar[soru]]
+                if matris.hissiyat is not None:
+                    hissiyat[:, j] = matris.hissiyat[:, sutunlar[soru]]
+
+        durum = np.where(cevaplar == banka.dogru_cevap_kodlari, DOGRU, YANLIS).astype(np.int8)
+        durum[cevaplar == -1] = BOS
+        guven_endeksi = np.clip(_HISSIYAT_GUVEN[hissiyat] + _DURUM_DUZELTME[durum], 0.0, 1.0)
+        zorluk_seviyesi = _ZORLUK_TABLOSU[durum, hissiyat]
+        kalibrasyon = None
+        if self.kalibrasyon is not None and n > 0:
+            kalibrasyon = self.kalibrasyon.kalibre_et(durum == DOGRU, soru_nolari)
+            fark = kalibrasyon.gucluk - kalibrasyon.yetenek[:, None]
+            zorluk_seviyesi = np.digitize(fark, (-settings.IRT_ZORLUK_SINIRI, settings.IRT_ZORLUK_SINIRI)
+                                          ).astype(np.int8)
+        # Tavsiyeler şablon numarası olarak tutulur; konu adıyla raporlamada doldurulur
+        tavsiye = self.tavsiyeler.tablo[durum, hissiyat]
+        if kalibrasyon is not None:
+            tavsiye = self.tavsiyeler.irt_uygula(tavsiye, durum, zorluk_seviyesi)
+
+        return AnalysisBatch(
+            kimlik=matris.kimlik,
+            soru_nolari=soru_nolari,
+            secenekler=matris.secenekler,
+            dogru_cevaplar=tuple(q.dogru_cevap for q in self.questions),
+            temalar=banka.temalar,
+            tema_kodlari=banka.tema_kodlari,
+            ogrenme_ciktilari=tuple(q.ogrenme_ciktisi for q in self.questions),
+            ogrenme_baglantilari=tuple(q.ogrenme_baglantisi for q in self.questions),
+            tavsiye_sablonlari=self.tavsiyeler.sablonlar,
+            cevaplar=cevaplar,
+            hissiyat=hissiyat,
+            durum=durum,
+            guven_endeksi=guven_endeksi,
+            zorluk_seviyesi=zorluk_seviyesi,
+            tavsiye=tavsiye,
+            yetenek=kalibrasyon.yetenek if kalibrasyon else None,
+            gucluk=kalibrasyon.gucluk if kalibrasyon else None,
+            ayirt_edicilik=kalibrasyon.ayirt_edicilik if kalibrasyon else None
+        )
+
     def _normalize_sentiment(self, hissiyat: str) -> str:
         """Hissiyat değerlerini standartlaştırır"""
         hissiyat = hissiyat.lower().strip()
@@ -127,21 +220,4 @@ class AIEngine:
             
     def _generate_recommendation(self, durum: str, hissiyat: str, guven_endeksi: float, tema: str) -> str:
         """Öğrenci için tavsiye oluşturur"""
-        recommendations = {
-            ("Boş", "any"): f"{tema} konusunu tekrar gözden geçirmeniz önerilir.",
-            ("any", "anlamadım"): f"{tema} konusunda temel eksiğiniz var. Öğretmeninizle görüşmeniz faydalı olacaktır.",
-            ("Yanlış", "any"): f"{tema} konusunda yanlış anlaşılmalar var. Konuyu tekrar çalışmanız önerilir.",
-            ("Doğru", "çok kolay"): f"{tema} konusunu mükemmel anlamışsınız! Bir sonraki konuya geçebilirsiniz.",
-            ("Doğru", "kolay"): f"{tema} konusunu iyi anlamışsınız. Pratik yapmaya devam edin.",
-            ("Doğru", "orta"): f"{tema} konusunu anlamışsınız. Daha fazla pratik yaparak pekiştirebilirsiniz.",
-            ("Doğru", "zor"): f"{tema} konusunu anlamışsınız ancak zorlandınız. Ek çalışma faydalı olacaktır.",
-            ("Doğru", "çok zor"): f"{tema} konusunu anlamışsınız ama çok zorlandınız. Öğretmeninizden destek alabilirsiniz."
-        }
-        
-        # Özel durumlar için kontrol
-        for (d, h), recommendation in recommendations.items():
-            if (d == durum or d == "any") and (h == hissiyat or h == "any"):
-                return recommendation
-        
-        # Varsayılan tavsiye
-        return f"{tema} konusunda ortalama performans gösterdiniz. Pratik yapmaya devam edin."
\ No newline at end of file
+        return self.tavsiyeler.olustur(self.tavsiyeler.sablon_no(durum, hissiyat), tema)
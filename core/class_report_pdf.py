@@ -0,0 +1,190 @@
+import itertools
+import textwrap
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from config import settings
+from utils.logger import logger
+from core.result_store import ResultStore
+
+# A4 dikey (inç) ve soru tablosunun alanı (şekil oranı): ilk sayfada başlık ve tema
+# grafiğinin altı, devam sayfalarında başlık satırının altı
+_SAYFA_BOYUTU = (8.27, 11.69)
+_ILK_TABLO_ALANI = (0.06, 0.04, 0.88, 0.55)
+_DEVAM_TABLO_ALANI = (0.06, 0.04, 0.88, 0.89)
+_SUTUNLAR = ("Soru", "Durum", "Tema", "Hissiyat", "Güven", "Zorluk", "Tavsiye")
+_SUTUN_GENISLIKLERI = (0.06, 0.08, 0.2, 0.11, 0.07, 0.07, 0.41)
+# HTML raporlarındaki (static/css/style.css) satır renkleri
+_DURUM_RENKLERI = {"Doğru": "#d4edda", "Yanlış": "#f8d7da"}
+_BOS_RENGI = "#fff3cd"
+# Hücre metni (punto): satır aralığı ve satırın üst + alt boşluğu; tema ve tavsiye hücreleri
+# sütun genişliğine göre sarılır ve satır yüksekliği en çok satırlı hücreye göre belirlenir.
+# textwrap karakter saydığından sütun genişliği DejaVu Sans'ın Türkçe metindeki ortalama
+# karakter genişliğiyle karaktere çevrilir.
+_HUCRE_PUNTO = 6.5
+_SATIR_ARALIGI = 8.0
+_SATIR_BOSLUGU = 4.0
+_KARAKTER_GENISLIGI = 3.6
+_SARILAN_SUTUNLAR = ("Tema", "Tavsiye")
+
+
+class ClassReportPDF:
+    """Bir sınıfın öğrenci raporlarını tek bir PDF dosyasında birleştirir.
+
+    Rapor verileri sonuç deposundan öğrenci öğrenci okunur; her öğrenci bir
+    veya daha fazla sayfa olarak çizilip hemen dosyaya yazılır, bu nedenle
+    bellekte aynı anda tek bir sayfa bulunur. Yazı tipleri ttf/ dizinindeki
+    DejaVu Sans normal ve kalın dosyalarıdır; tüm metinler bu iki dosyayı
+    kullandığından PDF'e yalnızca bir kez (alt küme olarak) gömülürler.
+    matplotlib gerektirir.
+    """
+
+    def __init__(self, store: Optional[ResultStore] = None, font_dizini: Optional[Path] = None):
+        self.store = store or ResultStore()
+        font_dizini = Path(font_dizini or settings.FONT_DIR)
+        self.fontlar = {False: font_dizini / "DejaVuSans.ttf", True: font_dizini / "DejaVuSans-Bold.ttf"}
+
+    def olustur(self, sinif_sube: str, pdf_path: Optional[Path] = None) -> Optional[Path]:
+        """sinif_sube'nin raporlarını pdf_path'e (varsayılan raporlar/sinif_<sınıf>.pdf) yazar"""
+        try:
+            from matplotlib import rc_context
+            from matplotlib.backends.backend_pdf import PdfPages
+        except ImportError:
+            logger.error("matplotlib bulunamadı. 'pip install matplotlib' ile yükleyin.")
+            return None
+
+        raporlar = self.store.raporlar(sinif_sube)
+        if not raporlar:
+            logger.warning(f"{sinif_sube} sınıfı için rapor bulunamadı")
+            return None
+        pdf_path = Path(pdf_path or settings.RAPORLAR_DIR / f"sinif_{sinif_sube}.pdf")
+
+        try:
+            eksik = [str(font) for font in self.fontlar.values() if not font.exists()]
+            if eksik:
+                logger.error(f"Yazı tipi dosyaları bulunamadı: {', '.join(eksik)}")
+                return None
+            # Type 42: TrueType yazı tipi her sayfada değil, belgede bir kez gömülür
+            ayarlar = {'pdf.fonttype': 42}
+            sayfa_sayisi = 0
+            with rc_context(ayarlar), PdfPages(pdf_path) as pdf:
+                for rapor in raporlar:
+                    veri = self.store.rapor_verisi(rapor['okul_no'], sinif_sube)
+                    if not veri:
+                        logger.warning(f"{rapor['ad_soyad']} için rapor verisi bulunamadı")
+                        continue
+                    for sayfa in self._sayfalar(veri):
+                        pdf.savefig(sayfa)
+                        sayfa_sayisi += 1
+                pdf.infodict()['Title'] = f"Tam Öğrenme Raporları - {sinif_sube}"
+            logger.info(f"{sinif_sube} sınıf raporu oluşturuldu ({len(raporlar)} öğrenci, {sayfa_sayisi} sayfa): {pdf_path}")
+            return pdf_path
+
+        except Exception as e:
+            logger.error(f"Sınıf PDF raporu oluşturma hatası ({sinif_sube}): {e}")
+            return None
+
+    def _font(self, boyut: float, kalin: bool = False):
+        from matplotlib.font_manager import FontProperties
+        return FontProperties(fname=self.fontlar[kalin], size=boyut)
+
+    def _sayfalar(self, veri: Dict) -> Iterable:
+        """Bir öğrencinin sayfalarını sırayla üretir (Figure nesneleri)"""
+        from matplotlib.figure import Figure
+
+        bilgi = veri['ogrenci_bilgileri']
+        istatistik = veri['genel_istatistikler']
+        sonuclar = veri['analiz_sonuclari']
+
+        sayfa = Figure(figsize=_SAYFA_BOYUTU)
+        sayfa.text(0.06, 0.955, "Tam Öğrenme Analiz Raporu", fontproperties=self._font(16, kalin=True))
+        sayfa.text(0.06, 0.925, f"Öğrenci: {bilgi['ad_soyad']}    Okul No: {bilgi['okul_no']}    "
+                                f"Sınıf/Şube: {bilgi['sinif_sube']}    Tarih: {bilgi['tarih']}",
+                   fontproperties=self._font(9))
+        sayfa.text(0.06, 0.9, f"Toplam Soru: {istatistik['toplam_soru']}    Doğru: {istatistik['dogru_sayisi']}    "
+                              f"Yanlış: {istatistik['yanlis_sayisi']}    Boş: {istatistik['bos_sayisi']}    "
+                              f"Başarı Oranı: {istatistik['basari_orani']:.2f}%    "
+                              f"Ortalama Güven Endeksi: {istatistik['ortalama_guven_endeksi']:.2f}",
+                   fontproperties=self._font(9))
+
+        # Tema bazlı performans
+        temalar = list(istatistik['tema_basarisi'].items())
+        ax = sayfa.add_axes((0.3, 0.64, 0.64, 0.22))
+        oranlar = [100 * s['dogru'] / s['toplam'] if s['toplam'] else 0 for _, s in temalar]
+        ax.barh(range(len(temalar)), oranlar, color="#007bff", height=0.6)
+        ax.set_yticks(range(len(temalar)))
+        ax.set_yticklabels([textwrap.shorten(tema, 40, placeholder="…") for tema, _ in temalar],
+                           fontproperties=self._font(8))
+        ax.set_xlim(0, 100)
+        ax.set_xticks(range(0, 101, 20))
+        ax.set_xticklabels([str(x) for x in range(0, 101, 20)], fontproperties=self._font(8))
+        ax.invert_yaxis()
+        ax.set_title("Tema Bazlı Performans (%)", loc="left", fontproperties=self._font(10, kalin=True))
+        for k, ((_, s), oran) in enumerate(zip(temalar, oranlar)):
+            ax.text(min(oran, 100) + 1, k, f"{s['dogru']}/{s['toplam']}", va="center",
+                    fontproperties=self._font(7))
+
+        satirlar = [self._tablo_satiri(r) for r in sonuclar]
+        ilk, kalan = self._sigdir(satirlar, _ILK_TABLO_ALANI)
+        self._soru_tablosu(sayfa, ilk, _ILK_TABLO_ALANI)
+        yield sayfa
+
+        while kalan:
+            sayfa = Figure(figsize=_SAYFA_BOYUTU)
+            sayfa.text(0.06, 0.955, f"{bilgi['ad_soyad']} ({bilgi['okul_no']}) - Detaylı Soru Analizi (devam)",
+                       fontproperties=self._font(10, kalin=True))
+            parca, kalan = self._sigdir(kalan, _DEVAM_TABLO_ALANI)
+            self._soru_tablosu(sayfa, parca, _DEVAM_TABLO_ALANI)
+            yield sayfa
+
+    @staticmethod
+    def _tablo_satiri(r: Dict):
+        """Bir soru sonucunu (durum, hücre metinleri) satırına çevirir; tema ve tavsiye sarılır"""
+        hucreler = (
+            str(r['soru_no']), r['durum'], str(r['tema_adi']), r['hissiyat'],
+            f"{r.get('guven_endeksi') or 0:.2f}", r.get('zorluk_seviyesi') or "Orta", str(r.get('tavsiye') or '')
+        )
+        tablo_genisligi = _ILK_TABLO_ALANI[2] * _SAYFA_BOYUTU[0] * 72
+        hucreler = tuple(
+            "\n".join(textwrap.wrap(hucre, int((genislik - 0.01) * tablo_genisligi / _KARAKTER_GENISLIGI))) or hucre
+            if baslik in _SARILAN_SUTUNLAR else hucre
+            for baslik, genislik, hucre in zip(_SUTUNLAR, _SUTUN_GENISLIKLERI, hucreler)
+        )
+        return r['durum'], hucreler
+
+    @staticmethod
+    def _satir_yuksekligi(hucreler) -> float:
+        return _SATIR_BOSLUGU + _SATIR_ARALIGI * max(hucre.count("\n") + 1 for hucre in hucreler)
+
+    def _sigdir(self, satirlar, alan):
+        """Tablo alanına sığan satırları ve kalanları döndürür (en az bir satır alınır)"""
+        bos_yer = alan[3] * _SAYFA_BOYUTU[1] * 72 - self._satir_yuksekligi(_SUTUNLAR)
+        adet = 0
+        for _, hucreler in satirlar:
+            bos_yer -= self._satir_yuksekligi(hucreler)
+            if bos_yer < 0 and adet:
+                break
+            adet += 1
+        return satirlar[:adet], satirlar[adet:]
+
+    def _soru_tablosu(self, sayfa, satirlar, alan):
+        """Soru tablosunu çizer; y ekseni tablonun üstünden punto cinsindendir"""
+        ax = sayfa.add_axes(alan)
+        ax.axis("off")
+        ax.set_xlim(0, 1)
+        ax.set_ylim(alan[3] * _SAYFA_BOYUTU[1] * 72, 0)
+        if not satirlar:
+            return
+
+        # Matplotlib tablosu yerine satır başına tek dikdörtgen ve hücre başına tek (gerekirse çok satırlı) metin
+        yukseklikler = [self._satir_yuksekligi(_SUTUNLAR)] + [self._satir_yuksekligi(h) for _, h in satirlar]
+        ustler = [0.0, *itertools.accumulate(yukseklikler[:-1])]
+        renkler = ["#f2f2f2"] + [_DURUM_RENKLERI.get(durum, _BOS_RENGI) for durum, _ in satirlar]
+        ax.barh(ustler, 1, height=yukseklikler, align="edge", color=renkler, edgecolor="#dddddd", linewidth=0.5)
+        sol = [sum(_SUTUN_GENISLIKLERI[:c]) for c in range(len(_SUTUNLAR))]
+        ax.vlines(sol[1:], 0, sum(yukseklikler), colors="#dddddd", linewidth=0.5)
+        baslik_fontu, hucre_fontu = self._font(7, kalin=True), self._font(_HUCRE_PUNTO)
+        for x, baslik in zip(sol, _SUTUNLAR):
+            ax.text(x + 0.005, yukseklikler[0] / 2, baslik, va="center", fontproperties=baslik_fontu)
+        for ust, yukseklik, (_, hucreler) in zip(ustler[1:], yukseklikler[1:], satirlar):
+            for x, hucre in zip(sol, hucreler):
+                ax.text(x + 0.005, ust + yukseklik / 2, hucre, va="center", fontproperties=hucre_fontu)
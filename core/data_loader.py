@@ -1,30 +1,133 @@
+import os
 import pandas as pd  
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path  
 from typing import Dict, List, Tuple, Optional  
 from config import settings  
-from utils.file_utils import load_csv_file, load_json_file, find_optik_files  
+from utils.file_utils import load_csv_file, load_json_file, find_optik_files, file_sha1
 from utils.logger import logger  
-from models.student import Student  
 from models.question import Question  
+from models.question_bank import QuestionBank
+from models.answer_matrix import AnswerMatrix
+from core.result_store import ResultStore
+
+# Süreç genelinde paylaşılan soru bankaları: yol -> (boyut, mtime, içerik özeti, banka).
+# Boyut ve mtime değişmedikçe dosya okunmaz; değişmişse içerik özeti aynıysa banka korunur.
+_soru_bankalari: Dict[str, Tuple[int, int, str, QuestionBank]] = {}
+
+# Veri kaynakları ve settings'teki yolları
+KAYNAK_YOLLARI = {
+    'kaynaklar': 'KAYNAKLAR_PATH',
+    'ogrenci': 'OGRENCI_PATH',
+    'hissiyatlar': 'HISSIYATLAR_PATH',
+    'optik': 'SONUC_DEPOSU_PATH',
+}
+_YUKLENMEDI = object()
+
+
+def _dosya_durumu(yol: Path) -> Optional[Tuple[int, int]]:
+    try:
+        durum = os.stat(yol)
+    except OSError:
+        return None
+    return durum.st_size, durum.st_mtime_ns
+
 
 class DataLoader:  
+    """Veri kaynaklarını ilk erişimde yükler.
+
+    Her kaynağın (kaynaklar, ogrenci, hissiyatlar CSV'leri ve optik sonuç
+    deposu) boyut/mtime bilgisi tutulur; erişimde yalnızca diskte değişen
+    kaynaklar yeniden okunur. invalidate() kaynakları bir sonraki erişimde
+    koşulsuz yeniden okunmak üzere işaretler.
+    """
+
     def __init__(self):
-        self.kaynaklar_df = None  
-        self.ogrenci_df = None  
-        self.hissiyatlar_df = None  
-        self.optik_dosyalar = []
-        self.load_all_data()  # Otomatik veri yükleme
+        self._kaynaklar_df = None
+        self._ogrenci_df = None
+        self._hissiyatlar_df = None
+        self._optik_etiketleri = []
+        self._durumlar = dict.fromkeys(KAYNAK_YOLLARI, _YUKLENMEDI)
+        # (okul_no, sinif_sube) -> normalize edilmiş hissiyat demeti; CSV değişince yeniden kurulur
+        self._hissiyat_indeksi = {}
+        self._hissiyat_sorulari = ()
+        self._ogrenci_adlari = {}
+
+    @property
+    def kaynaklar_df(self) -> pd.DataFrame:
+        self._guncelle('kaynaklar')
+        return self._kaynaklar_df
+
+    @property
+    def ogrenci_df(self) -> pd.DataFrame:
+        self._guncelle('ogrenci')
+        return self._ogrenci_df
+
+    @property
+    def hissiyatlar_df(self) -> pd.DataFrame:
+        self._guncelle('hissiyatlar')
+        return self._hissiyatlar_df
+
+    @property
+    def optik_etiketleri(self) -> List[str]:
+        """Sonuç deposunda başarıyla okunmuş optik form etiketleri"""
+        self._guncelle('optik')
+        return self._optik_etiketleri
+
+    def _guncelle(self, kaynak: str) -> bool:
+        """Kaynak hiç yüklenmemişse veya diskte değişmişse yükler; yüklendiyse True döner"""
+        durum = _dosya_durumu(getattr(settings, KAYNAK_YOLLARI[kaynak]))
+        onceki = self._durumlar[kaynak]
+        if onceki is not _YUKLENMEDI and onceki == durum:
+            return False
+        if onceki is not _YUKLENMEDI:
+            logger.info(f"{kaynak} verisi değişmiş, yeniden yükleniyor")
+        self._durumlar[kaynak] = durum
+        getattr(self, f"_load_{kaynak}")()
+        return True
+
+    def invalidate(self, *kaynaklar: str):
+        """Verilen kaynakları (verilmezse tümünü) bir sonraki erişimde yeniden okunmak üzere işaretler"""
+        for kaynak in kaynaklar or tuple(KAYNAK_YOLLARI):
+            if kaynak not in KAYNAK_YOLLARI:
+                raise ValueError(f"Bilinmeyen veri kaynağı: {kaynak}")
+            self._durumlar[kaynak] = _YUKLENMEDI
+            if kaynak == 'kaynaklar':
+                _soru_bankalari.pop(str(settings.KAYNAKLAR_PATH), None)
 
     def refresh_data(self):
         """Tüm verileri yeniden yükle"""
-        self.load_all_data()
+        self.invalidate()
+        return self.load_all_data()
 
-    def get_questions(self):
-        """kaynaklar.csv içeriğini Question listesine çevirir"""
-        if self.kaynaklar_df is None or self.kaynaklar_df.empty:
+    def get_questions(self) -> QuestionBank:
+        """kaynaklar.csv içeriğini soru bankası olarak döndürür (dosya değişmedikçe önbellekten)"""
+        yol = settings.KAYNAKLAR_PATH
+        try:
+            durum = os.stat(yol)
+        except OSError:
+            logger.error(f"Kaynaklar dosyası bulunamadı: {yol}")
+            return QuestionBank.olustur((), settings.SECENEKLER)
+
+        kayit = _soru_bankalari.get(str(yol))
+        if kayit is not None and kayit[:2] == (durum.st_size, durum.st_mtime_ns):
+            return kayit[3]
+        ozet = file_sha1(yol)
+        if kayit is not None and kayit[2] == ozet:
+            _soru_bankalari[str(yol)] = (durum.st_size, durum.st_mtime_ns, ozet, kayit[3])
+            return kayit[3]
+
+        banka = QuestionBank.olustur(self._sorulari_oku(self.kaynaklar_df), settings.SECENEKLER)
+        _soru_bankalari[str(yol)] = (durum.st_size, durum.st_mtime_ns, ozet, banka)
+        logger.info(f"Soru bankası yüklendi: {len(banka)} soru")
+        return banka
+
+    def _sorulari_oku(self, kaynaklar_df: pd.DataFrame) -> List[Question]:
+        """kaynaklar.csv satırlarını Question listesine çevirir"""
+        if kaynaklar_df is None or kaynaklar_df.empty:
             return []
         questions = []
-        for _, row in self.kaynaklar_df.iterrows():
+        for row in kaynaklar_df.to_dict('records'):
             secenekler = {
                 'A': str(row.get('A_Seçeneği', '')).strip(),
                 'B': str(row.get('B_Seçeneği', '')).strip(),
@@ -48,30 +151,17 @@ class DataLoader:
         return questions
 
     def load_all_data(self) -> bool:
-        """Tüm verileri yükler"""
+        """Tüm verilerin güncel olmasını sağlar; yalnızca yüklenmemiş veya değişmiş kaynaklar okunur"""
         try:
-            # Kaynakları yükle
-            self.kaynaklar_df = load_csv_file(settings.KAYNAKLAR_PATH)
             if self.kaynaklar_df.empty:
                 logger.error("Kaynaklar dosyası yüklenemedi")
                 return False
-                
-            # Öğrenci bilgilerini yükle
-            self.ogrenci_df = load_csv_file(settings.OGRENCI_PATH)
-            if self.ogrenci_df.empty:
-                logger.warning("Öğrenci dosyası yüklenemedi")
-                
-            # Hissiyat verilerini yükle
-            self.hissiyatlar_df = load_csv_file(settings.HISSIYATLAR_PATH)
-            if self.hissiyatlar_df.empty:
-                logger.warning("Hissiyatlar dosyası yüklenemedi")
-            else:
-                self.hissiyatlar_df['Okul_No'] = self.hissiyatlar_df['Okul_No'].astype(str)
-                
-            # Optik dosyaları bul
-            self.optik_dosyalar = find_optik_files()
-            if not self.optik_dosyalar:
-                logger.error("Optik dosya bulunamadı")
+
+            self._guncelle('ogrenci')
+            self._guncelle('hissiyatlar')
+
+            if not self.optik_etiketleri:
+                logger.error("Okunmuş optik form bulunamadı")
                 return False
                 
             logger.info("Tüm veriler başarıyla yüklendi")
@@ -81,67 +171,137 @@ class DataLoader:
             logger.error(f"Veri yükleme hatası: {e}")
             return False
 
+    def _load_kaynaklar(self):
+        self._kaynaklar_df = load_csv_file(settings.KAYNAKLAR_PATH)
+
+    def _load_ogrenci(self):
+        self._ogrenci_df = load_csv_file(settings.OGRENCI_PATH)
+        if self._ogrenci_df.empty:
+            logger.warning("Öğrenci dosyası yüklenemedi")
+            self._ogrenci_adlari = {}
+        else:
+            self._ogrenci_adlari = {
+                (str(okul_no), sinif_sube): str(ad).strip()
+                for okul_no, sinif_sube, ad in zip(self._ogrenci_df['Okul_No'], self._ogrenci_df['Sınıf_Sube'],
+                                                   self._ogrenci_df['Ad_Soyad'])
+            }
+
+    def _load_optik(self):
+        self._optik_etiketleri = find_optik_files()
+
+    def get_student_name(self, okul_no: str, sinif_sube: str) -> str:
+        """Öğrencinin adını öğrenci listesinden getirir"""
+        self._guncelle('ogrenci')
+        ad = self._ogrenci_adlari.get((okul_no, sinif_sube))
+        if ad is None:
+            logger.warning(f"Öğrenci listesinde bulunamadı: {okul_no} - {sinif_sube}")
+            return okul_no
+        return ad
+
+    def _load_hissiyatlar(self):
+        """hissiyatlar.csv dosyasını yükler ve öğrenci anahtarlı indeksi kurar"""
+        self._hissiyat_indeksi = {}
+        self._hissiyat_sorulari = ()
+
+        self._hissiyatlar_df = load_csv_file(settings.HISSIYATLAR_PATH)
+        if self._hissiyatlar_df.empty:
+            logger.warning("Hissiyatlar dosyası yüklenemedi")
+            return
+        self._hissiyatlar_df['Okul_No'] = self._hissiyatlar_df['Okul_No'].astype(str)
+
+        # h1..hN sütunları soru numarası sırasıyla; boş hücreler "belirsiz"
+        sutunlar = sorted((c for c in self._hissiyatlar_df.columns if c[:1] == 'h' and c[1:].isdigit()),
+                          key=lambda c: int(c[1:]))
+        degerler = self._hissiyatlar_df[sutunlar]
+        normalize = degerler.astype(str).apply(lambda sutun: sutun.str.strip().str.lower())
+        normalize = normalize.where(degerler.notna(), "belirsiz")
+
+        # Aynı öğrenci birden fazla satırdaysa ilk satır geçerlidir
+        anahtarlar = zip(self._hissiyatlar_df['Okul_No'], self._hissiyatlar_df['Sınıf_Sube'])
+        for anahtar, satir in zip(anahtarlar, normalize.itertuples(index=False, name=None)):
+            self._hissiyat_indeksi.setdefault(anahtar, satir)
+        self._hissiyat_sorulari = tuple(c[1:] for c in sutunlar)
+        logger.debug(f"Hissiyat indeksi kuruldu: {len(self._hissiyat_indeksi)} öğrenci")
+
     def get_student_hissiyat(self, okul_no: str, sinif_sube: str) -> Dict[str, str]:
         """Öğrencinin hissiyat verilerini getirir"""
-        if self.hissiyatlar_df is None or self.hissiyatlar_df.empty:
-            return {}
-            
         try:
-            student_data = self.hissiyatlar_df[
-                (self.hissiyatlar_df['Okul_No'] == okul_no) & 
-                (self.hissiyatlar_df['Sınıf_Sube'] == sinif_sube)
-            ]
-            
-            if student_data.empty:
-                logger.warning(f"Hissiyat bulunamadı: {okul_no} - {sinif_sube}")
+            self._guncelle('hissiyatlar')
+
+            satir = self._hissiyat_indeksi.get((str(okul_no), sinif_sube))
+            if satir is None:
+                if self._hissiyat_indeksi:
+                    logger.warning(f"Hissiyat bulunamadı: {okul_no} - {sinif_sube}")
                 return {}
-                
-            hissiyatlar = {}
-            for i in range(1, 21):
-                column_name = f'h{i}'
-                if column_name in student_data.columns:
-                    hissiyat_value = student_data[column_name].values[0]
-                    if pd.notna(hissiyat_value):
-                        hissiyatlar[str(i)] = str(hissiyat_value).strip().lower()
-                    else:
-                        hissiyatlar[str(i)] = "belirsiz"
-                    
-            logger.info(f"Hissiyat verileri yüklendi: {okul_no} - {hissiyatlar}")
+
+            hissiyatlar = dict(zip(self._hissiyat_sorulari, satir))
+            logger.debug(f"Hissiyat verileri yüklendi: {okul_no} - {hissiyatlar}")
             return hissiyatlar
             
         except Exception as e:
             logger.error(f"Hissiyat verisi okuma hatası: {e}")
             return {}
 
-    def parse_optik_file(self, file_path: Path) -> Optional[Student]:
-        """Optik cevap dosyasını işler ve Student nesnesi döndürür"""
-        try:
-            data = load_json_file(file_path)
-            if not data:
-                return None
-                
-            file_name = file_path.stem.replace('sonuc_', '')
-            parts = file_name.split('_')
-            
-            if len(parts) < 3:
+    def _resolve_identity(self, file_name: str, data: Dict) -> Optional[Tuple[str, str, str]]:
+        """Optik sonucun (okul_no, ad_soyad, sinif_sube) bilgisini belirler.
+
+        Formdan okunan alanlar formdaki değerle, okunamayanlar taranan dosyanın
+        <sinif>_<okulno>_<ad> biçimindeki adından alınır. Çok sayfalı dosyalarda
+        file_name sayfa etiketi olduğundan dosya adı sonucun dosya_adi alanından
+        okunur. Ad, iki alan da dosya adından geldiyse dosya adından, aksi halde
+        öğrenci listesinden alınır.
+        """
+        kimlik_kaynagi = data.get('kimlik_kaynagi', {})
+        parts = (Path(data['dosya_adi']).stem if data.get('dosya_adi') else file_name).split('_')
+        dosya_kimligi = {'sinif_sube': parts[0], 'okul_no': parts[1]} if len(parts) >= 3 else {}
+
+        kimlik = {}
+        for alan in ('okul_no', 'sinif_sube'):
+            if kimlik_kaynagi.get(alan) == 'form':
+                kimlik[alan] = str(data[alan])
+            elif alan in dosya_kimligi:
+                kimlik[alan] = dosya_kimligi[alan]
+            else:
                 logger.warning(f"Dosya adı formatı hatalı: {file_name}")
                 return None
-                
-            sinif_sube = parts[0]
-            okul_no = parts[1]
-            ad_soyad = ' '.join(parts[2:])
-            
-            hissiyat_verileri = self.get_student_hissiyat(okul_no, sinif_sube)
-            
-            return Student(
-                okul_no=okul_no,
-                ad_soyad=ad_soyad,
-                sinif_sube=sinif_sube,
-                cevaplar=data.get('cevaplar', {}),
-                hissiyat_verileri=hissiyat_verileri,
-                istatistikler=data.get('istatistikler', {})
-            )
-            
-        except Exception as e:
-            logger.error(f"Optik dosya ayrıştırma hatası: {e}")
-            return None
\ No newline at end of file
+
+        okul_no, sinif_sube = kimlik['okul_no'], kimlik['sinif_sube']
+        if 'form' in (kimlik_kaynagi.get('okul_no'), kimlik_kaynagi.get('sinif_sube')):
+            return okul_no, self.get_student_name(okul_no, sinif_sube), sinif_sube
+        return okul_no, ' '.join(parts[2:]), sinif_sube
+
+    def load_answer_matrix(self, files: Optional[List[Path]] = None) -> AnswerMatrix:
+        """Tüm optik sonuçlarını tek seferde öğrenci x soru matrisine yükler.
+
+        Sonuçlar sonuç deposundan tek sorguyla okunur (her form etiketinin en
+        son başarılı okuması). files verilirse bunun yerine bu sonuc_*.json
+        dosyaları iş parçacığı havuzuyla eşzamanlı okunur. Kimlik çözümü ve
+        matris kurulumu ana iş parçacığında yapılır; hissiyat matrisi hissiyat
+        indeksinden doldurulur. Kimliği çözülemeyen sonuçlar atlanan listesine
+        eklenir.
+        """
+        if files is None:
+            veriler = ResultStore().optik_sonuclari()
+            adlar = [veri['etiket'] for veri in veriler]
+        else:
+            files = sorted(files)
+            isci_sayisi = settings.VERI_OKUMA_ISCI_SAYISI or min(32, (os.cpu_count() or 1) + 4)
+            with ThreadPoolExecutor(max_workers=isci_sayisi) as havuz:
+                veriler = list(havuz.map(load_json_file, files))
+            adlar = [file_path.stem.replace('sonuc_', '') for file_path in files]
+
+        kayitlar, atlanan = [], []
+        for ad, data in zip(adlar, veriler):
+            kimlik = self._resolve_identity(ad, data) if data else None
+            if kimlik is None:
+                atlanan.append(ad)
+                continue
+            okul_no, ad_soyad, sinif_sube = kimlik
+            kayit = {'okul_no': okul_no, 'ad_soyad': ad_soyad, 'sinif_sube': sinif_sube, 'dosya': ad}
+            kayitlar.append((kayit, data.get('cevaplar', {})))
+
+        matris = AnswerMatrix.olustur(kayitlar, settings.SECENEKLER, atlanan)
+        for i, (kayit, _) in enumerate(kayitlar):
+            matris.hissiyat_doldur(i, self.get_student_hissiyat(kayit['okul_no'], kayit['sinif_sube']))
+        logger.info(f"{len(matris)} optik sonuç yüklendi ({len(atlanan)} sonuç atlandı)")
+        return matris
@@ -5,11 +5,14 @@ from typing import List
 from config import settings
 from utils.logger import logger
 from utils.file_utils import load_csv_file
+from core.optik_engine import FormLayout
 
 class FormGenerator:
     def __init__(self):
         self.output_dir = settings.TEMPLATE_OUTPUT_DIR
         self.output_dir.mkdir(exist_ok=True)
+        # Kimlik baloncuklarının konumu optik okuyucuyla aynı düzenden alınır
+        self.layout = FormLayout.varsayilan()
         
     def generate_forms_for_all_students(self) -> List[Path]:
         """Tüm öğrenciler için optik form oluşturur"""
@@ -157,6 +160,8 @@ class FormGenerator:
                 x_pos = 500 + j*30
                 svg_content += f'<circle cx="{x_pos}" cy="{y_pos-5}" r="8" fill="none" stroke="black"/>\n'
 
+        svg_content += self._generate_kimlik_svg(okul_no, sinif_sube)
+
         # Hizalama işaretleri
         svg_content += '''
 <!-- Hizalama işaretleri -->
@@ -174,4 +179,31 @@ class FormGenerator:
 </text>
 </svg>'''
 
-        return svg_content
\ No newline at end of file
+        return svg_content
+
+    def _generate_kimlik_svg(self, okul_no: str, sinif_sube: str) -> str:
+        """Okul no, sınıf ve şube baloncuk alanlarını oluşturur.
+
+        Kişiye özel formlarda öğrencinin kimliği önceden işaretlenir; böylece
+        taranan formların dosya adları elle düzenlenmeden okunabilir.
+        """
+        basliklar = {'okul_no': 'Okul No', 'sinif': 'Sınıf', 'sube': 'Şube'}
+        kodlar = self.layout.kimlik_kodla(okul_no, sinif_sube)
+        if (okul_no or sinif_sube) and any(None in kod for kod in kodlar.values()):
+            logger.warning(f"Kimlik alanına sığmayan bilgi, ilgili baloncuklar boş bırakıldı: {okul_no} - {sinif_sube}")
+
+        svg = '\n<!-- Kimlik alanı -->\n'
+        svg += '<text x="120" y="430" text-anchor="start" font-family="Arial, sans-serif" font-size="14" font-weight="bold">Kimlik Bilgileri</text>\n'
+        for alan in self.layout.kimlik_alanlari:
+            merkezler = alan.baloncuk_merkezleri
+            x_orta = (merkezler[0, 0, 0] + merkezler[-1, 0, 0]) / 2
+            svg += f'<text x="{x_orta:g}" y="455" text-anchor="middle" font-family="Arial, sans-serif" font-size="12">{basliklar.get(alan.ad, alan.ad)}</text>\n'
+            # Satır etiketleri ilk hanenin solunda
+            for k, etiket in enumerate(alan.etiketler):
+                x_pos, y_pos = merkezler[0, k]
+                svg += f'<text x="{x_pos - 20}" y="{y_pos + 4}" text-anchor="middle" font-family="Arial, sans-serif" font-size="10">{etiket}</text>\n'
+            for hane, secim in enumerate(kodlar[alan.ad]):
+                for k, (x_pos, y_pos) in enumerate(merkezler[hane]):
+                    dolgu = "black" if k == secim else "none"
+                    svg += f'<circle cx="{x_pos}" cy="{y_pos}" r="8" fill="{dolgu}" stroke="black"/>\n'
+        return svg
\ No newline at end of file
@@ -0,0 +1,115 @@
+import hashlib
+import re
+import shutil
+from functools import lru_cache
+from html import escape
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Optional
+from config import settings
+
+# Şablonda soru ve tema başına tekrarlanan bloklar: <!-- ad --> ... <!-- /ad -->
+_BLOK = re.compile(r"^<!-- (tema|soru) -->\n(.*?)^<!-- /\1 -->\n", re.S | re.M)
+_DEGISKEN = re.compile(r"\$(\w+)")
+_SATIR_SINIFLARI = {"Doğru": "correct", "Yanlış": "wrong"}
+# Şablonun doldurulma biçimi değiştiğinde artırılır; eski raporların yeniden üretilmesini sağlar
+RENDERER_SURUMU = 1
+
+# Soru satırını belirleyen alanlar (AnalysisResult.to_dict anahtarları)
+_soru_alanlari = itemgetter("soru_no", "durum", "tema_adi", "hissiyat", "guven_endeksi",
+                            "zorluk_seviyesi", "tavsiye", "ogrenme_baglantisi")
+
+
+def _derle(parca: str) -> str:
+    """$ad yer tutucularını str.format alanlarına çevirir"""
+    parca = parca.replace("{", "{{").replace("}", "}}")
+    return _DEGISKEN.sub(r"{\1}", parca)
+
+
+class HTMLReportRenderer:
+    """Öğrenci HTML raporlarını templates/student_detail.html şablonundan üretir.
+
+    Şablon bir kez okunup sayfa başı, tema bloğu, sayfa ortası, soru satırı
+    ve sayfa sonu olarak derlenir; her rapor bu parçalar doldurularak
+    doğrudan dosyaya yazılır. Stil sayfası raporlara gömülmez, raporlar
+    dizinine bir kez kopyalanıp bağlanır. Metin alanları HTML'e kaçışlanır.
+    Soru satırları ve tema blokları öğrenciler arasında büyük ölçüde
+    tekrarlandığından alan değerlerine göre önbelleklenir.
+    """
+
+    def __init__(self, sablon_yolu: Optional[Path] = None, stil_yolu: Optional[Path] = None):
+        self.sablon_yolu = Path(sablon_yolu or settings.RAPOR_SABLONU_PATH)
+        self.stil_yolu = Path(stil_yolu or settings.RAPOR_STIL_PATH)
+
+        sablon = self.sablon_yolu.read_text(encoding="utf-8")
+        # Rapor parmak izlerine giren şablon sürümü (stil sayfası bağlandığından dahil değildir)
+        self.surum = hashlib.sha1(f"{RENDERER_SURUMU}\n{sablon}".encode("utf-8")).hexdigest()
+        parcalar = _BLOK.split(sablon)
+        if parcalar[1::3] != ["tema", "soru"]:
+            raise ValueError(f"Rapor şablonunda tema ve soru blokları bulunamadı: {self.sablon_yolu}")
+        self._bas, _, self._tema, self._orta, _, self._soru, self._son = map(_derle, parcalar)
+        self._soru_satiri = lru_cache(maxsize=8192)(self._soru_satiri_olustur)
+        self._tema_blogu = lru_cache(maxsize=1024)(self._tema_blogu_olustur)
+
+    def __getstate__(self):
+        # İşçi süreçlerine yalnızca yollar gönderilir; şablon orada yeniden derlenir
+        return {'sablon_yolu': self.sablon_yolu, 'stil_yolu': self.stil_yolu}
+
+    def __setstate__(self, durum):
+        self.__init__(durum['sablon_yolu'], durum['stil_yolu'])
+
+    def stil_sayfasini_kopyala(self, hedef_dizin: Path) -> Path:
+        """Stil sayfasını rapor dizinine kopyalar; güncelse dokunmaz"""
+        hedef = Path(hedef_dizin) / self.stil_yolu.name
+        if not hedef.exists() or hedef.stat().st_mtime < self.stil_yolu.stat().st_mtime:
+            hedef.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.stil_yolu, hedef)
+        return hedef
+
+    def yaz(self, file_path: Path, report_data: Dict):
+        """report_data'dan raporu parça parça file_path'e yazar"""
+        bilgi = report_data['ogrenci_bilgileri']
+        istatistik = report_data['genel_istatistikler']
+        sayfa = {
+            'stil': self.stil_yolu.name,
+            'ad_soyad': escape(str(bilgi['ad_soyad'])),
+            'okul_no': escape(str(bilgi['okul_no'])),
+            'sinif_sube': escape(str(bilgi['sinif_sube'])),
+            'tarih': bilgi['tarih'],
+            'toplam_soru': istatistik['toplam_soru'],
+            'dogru_sayisi': istatistik['dogru_sayisi'],
+            'yanlis_sayisi': istatistik['yanlis_sayisi'],
+            'bos_sayisi': istatistik['bos_sayisi'],
+            'basari_orani': f"{istatistik['basari_orani']:.2f}",
+            'ortalama_guven_endeksi': f"{istatistik['ortalama_guven_endeksi']:.2f}"
+        }
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(self._bas.format_map(sayfa))
+            f.write("".join([self._tema_blogu(tema, stats['dogru'], stats['toplam'])
+                             for tema, stats in istatistik['tema_basarisi'].items()]))
+            f.write(self._orta.format_map(sayfa))
+            f.write("".join([self._soru_satiri(*_soru_alanlari(sonuc))
+                             for sonuc in report_data['analiz_sonuclari']]))
+            f.write(self._son.format_map(sayfa))
+
+    def _tema_blogu_olustur(self, tema, dogru: int, toplam: int) -> str:
+        basari_orani = f"{(dogru / toplam) * 100 if toplam > 0 else 0:.1f}"
+        return self._tema.format(tema=escape(str(tema)), dogru=dogru, toplam=toplam,
+                                 basari_orani=basari_orani, genislik=basari_orani)
+
+    def _soru_satiri_olustur(self, soru_no, durum, tema_adi, hissiyat, guven_endeksi,
+                             zorluk_seviyesi, tavsiye, ogrenme_baglantisi) -> str:
+        tavsiye = escape(str(tavsiye or ''))
+        if ogrenme_baglantisi:
+            tavsiye = f'<a href="{escape(str(ogrenme_baglantisi))}" target="_blank">{tavsiye}</a>'
+        return self._soru.format(
+            sinif=_SATIR_SINIFLARI.get(durum, "empty"),
+            soru_no=soru_no,
+            durum=durum,
+            tema_adi=escape(str(tema_adi)),
+            hissiyat=hissiyat,
+            guven_endeksi=f"{guven_endeksi or 0:.2f}",
+            zorluk_seviyesi=zorluk_seviyesi or 'Orta',
+            tavsiye=tavsiye
+        )
@@ -0,0 +1,202 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from config import settings
+from utils.logger import logger
+
+IRT_MODELLERI = ("rasch", "2pl")
+
+# Yetenek dağılımı N(0,1) kabul edilir ve bu düğümlerde sayısal olarak integrallenir;
+# ölçek bu dağılımla sabitlendiğinden kestirimler iterasyonlar boyunca kaymaz.
+_DUGUMLER = np.linspace(-4.0, 4.0, 41)
+_LOG_AGIRLIKLAR = -_DUGUMLER ** 2 / 2 - np.log(np.exp(-_DUGUMLER ** 2 / 2).sum())
+# Soru parametrelerinin ön dağılımları (güçlük 0, ayırt edicilik 1 çevresinde) ve sınırları.
+# Herkesin bildiği veya kimsenin bilmediği soruların kestirimleri bu sayede sonsuza gitmez.
+_GUCLUK_VARYANSI = 4.0
+_AYIRT_VARYANSI = 0.25
+_GUCLUK_SINIRI = 6.0
+_AYIRT_SINIRLARI = (0.2, 4.0)
+_ADIM_SINIRI = 1.0
+# exp taşmasını önlemek için logit sınırı ve adım başına en çok yarılama sayısı
+_LOGIT_SINIRI = 30.0
+_YARILAMA_SAYISI = 10
+
+
+@dataclass
+class KalibrasyonSonucu:
+    """IRT kalibrasyonunun kestirimleri.
+
+    yetenek (öğrenci), gucluk ve ayirt_edicilik (soru) logit ölçeğindedir;
+    Rasch modelinde ayirt_edicilik tüm sorular için 1'dir.
+    """
+    model: str
+    yetenek: np.ndarray
+    gucluk: np.ndarray
+    ayirt_edicilik: np.ndarray
+    iterasyon: int
+    yakinsadi: bool
+
+
+class IRTCalibrator:
+    """Doğru/yanlış yanıt matrisine Rasch veya 2PL modeli uydurur.
+
+    Soru parametreleri marjinal en çok olabilirlikle (EM) kestirilir: E
+    adımında her öğrencinin yetenek düğümleri üzerindeki sonsal dağılımı
+    tek bir matris çarpımıyla hesaplanır; M adımında her soru için güçlük
+    ve ayırt edicilik birlikte, cezalı hedefi düşürdüğü sorularda yarılanan
+    Fisher puanlaması adımıyla güncellenir. Yetenek, sonsal dağılımın
+    beklenen değeridir (EAP). Soru parametreleri her kalibrasyondan sonra
+    soru numarasıyla kaydedilir ve bir sonraki sınavda başlangıç değeri
+    olarak kullanılır.
+    """
+
+    def __init__(self, model: str = "rasch", parametre_yolu: Optional[Path] = None,
+                 maks_iterasyon: int = 200, tolerans: float = 1e-4):
+        if model not in IRT_MODELLERI:
+            raise ValueError(f"Bilinmeyen IRT modeli: {model} (seçenekler: {', '.join(IRT_MODELLERI)})")
+        self.model = model
+        self.parametre_yolu = Path(parametre_yolu or settings.IRT_PARAMETRE_PATH)
+        self.maks_iterasyon = maks_iterasyon
+        self.tolerans = tolerans
+
+    def kalibre_et(self, dogru: np.ndarray, soru_nolari: np.ndarray) -> KalibrasyonSonucu:
+        """dogru (öğrenci x soru, 0/1) matrisinden parametreleri kestirir ve kaydeder"""
+        x = np.asarray(dogru, dtype=np.float64)
+        n, soru_sayisi = x.shape
+
+        # Başlangıç: güçlük soru başarısının logiti; önceki sınav parametreleri öncelikli
+        gucluk = -self._logit((x.sum(axis=0) + 0.5) / (n + 1.0))
+        ayirt = np.ones(soru_sayisi)
+        onceki = self._onceki_parametreler()
+        for j, soru in enumerate(soru_nolari.tolist()):
+            if str(soru) in onceki:
+                gucluk[j] = onceki[str(soru)]['gucluk']
+                if self.model == "2pl":
+                    ayirt[j] = onceki[str(soru)]['ayirt_edicilik']
+        gucluk = np.clip(gucluk, -_GUCLUK_SINIRI, _GUCLUK_SINIRI)
+        ayirt = np.clip(ayirt, *_AYIRT_SINIRLARI)
+
+        yakinsadi = False
+        for iterasyon in range(1, self.maks_iterasyon + 1):
+            # E adımı: düğüm başına beklenen öğrenci ve doğru cevap sayıları
+            sonsal = self._sonsal(x, gucluk, ayirt)
+            kisi = sonsal.sum(axis=0)
+            dogru_sayisi = sonsal.T @ x
+
+            # M adımı
+            yeni_gucluk, yeni_ayirt = self._soru_adimi(kisi, dogru_sayisi, gucluk, ayirt)
+            degisim = max(np.abs(yeni_gucluk - gucluk).max(initial=0.0),
+                          np.abs(yeni_ayirt - ayirt).max(initial=0.0))
+            gucluk, ayirt = yeni_gucluk, yeni_ayirt
+            if degisim < self.tolerans:
+                yakinsadi = True
+                break
+
+        yetenek = self._sonsal(x, gucluk, ayirt) @ _DUGUMLER
+
+        if not yakinsadi:
+            logger.warning(f"IRT kalibrasyonu {self.maks_iterasyon} iterasyonda yakınsamadı")
+        logger.info(f"IRT ({self.model}) kalibrasyonu: {n} öğrenci x {soru_sayisi} soru, {iterasyon} iterasyon")
+
+        sonuc = KalibrasyonSonucu(model=self.model, yetenek=yetenek, gucluk=gucluk,
+                                  ayirt_edicilik=ayirt, iterasyon=iterasyon, yakinsadi=yakinsadi)
+        self._parametreleri_kaydet(sonuc, soru_nolari)
+        return sonuc
+
+    @staticmethod
+    def _logit(p: np.ndarray) -> np.ndarray:
+        return np.log(p / (1.0 - p))
+
+    @staticmethod
+    def _z(yetenek: np.ndarray, gucluk: np.ndarray, ayirt: np.ndarray) -> np.ndarray:
+        return np.clip(ayirt * (yetenek[:, None] - gucluk), -_LOGIT_SINIRI, _LOGIT_SINIRI)
+
+    def _sonsal(self, x: np.ndarray, gucluk: np.ndarray, ayirt: np.ndarray) -> np.ndarray:
+        """Öğrenci x düğüm sonsal olasılıkları"""
+        z = self._z(_DUGUMLER, gucluk, ayirt)
+        log_p, log_q = -np.logaddexp(0.0, -z), -np.logaddexp(0.0, z)
+        sonsal = x @ (log_p - log_q).T + (log_q.sum(axis=1) + _LOG_AGIRLIKLAR)
+        sonsal -= sonsal.max(axis=1, keepdims=True)
+        np.exp(sonsal, out=sonsal)
+        sonsal /= sonsal.sum(axis=1, keepdims=True)
+        return sonsal
+
+    def _soru_hedefi(self, kisi: np.ndarray, dogru_sayisi: np.ndarray,
+                     gucluk: np.ndarray, ayirt: np.ndarray) -> np.ndarray:
+        """Soru başına beklenen cezalı log-olabilirlik"""
+        z = self._z(_DUGUMLER, gucluk, ayirt)
+        hedef = (dogru_sayisi * z - kisi[:, None] * np.logaddexp(0.0, z)).sum(axis=0)
+        hedef -= gucluk ** 2 / (2 * _GUCLUK_VARYANSI)
+        if self.model == "2pl":
+            hedef -= (ayirt - 1.0) ** 2 / (2 * _AYIRT_VARYANSI)
+        return hedef
+
+    def _soru_adimi(self, kisi: np.ndarray, dogru_sayisi: np.ndarray,
+                    gucluk: np.ndarray, ayirt: np.ndarray):
+        """Tüm sorular için tek Fisher puanlaması adımı (2PL'de güçlük ve ayırt edicilik birlikte)"""
+        p = 1.0 / (1.0 + np.exp(-self._z(_DUGUMLER, gucluk, ayirt)))
+        artik = dogru_sayisi - kisi[:, None] * p
+        agirlik = kisi[:, None] * p * (1.0 - p)
+        egim_b = -ayirt * artik.sum(axis=0) - gucluk / _GUCLUK_VARYANSI
+        bilgi_bb = ayirt ** 2 * agirlik.sum(axis=0) + 1.0 / _GUCLUK_VARYANSI
+        if self.model == "2pl":
+            fark = _DUGUMLER[:, None] - gucluk
+            egim_a = (artik * fark).sum(axis=0) - (ayirt - 1.0) / _AYIRT_VARYANSI
+            bilgi_aa = (agirlik * fark ** 2).sum(axis=0) + 1.0 / _AYIRT_VARYANSI
+            bilgi_ab = -ayirt * (agirlik * fark).sum(axis=0)
+            det = bilgi_aa * bilgi_bb - bilgi_ab ** 2
+            adim_a = (bilgi_bb * egim_a - bilgi_ab * egim_b) / det
+            adim_b = (bilgi_aa * egim_b - bilgi_ab * egim_a) / det
+            # Sınırdaki ayırt edicilik dışarı itilmez; bu sorularda yalnızca güçlük adımı atılır
+            sinirda = (((ayirt <= _AYIRT_SINIRLARI[0]) & (adim_a < 0))
+                       | ((ayirt >= _AYIRT_SINIRLARI[1]) & (adim_a > 0)))
+            adim_a[sinirda] = 0.0
+            adim_b[sinirda] = egim_b[sinirda] / bilgi_bb[sinirda]
+        else:
+            adim_a = np.zeros_like(ayirt)
+            adim_b = egim_b / bilgi_bb
+        adim_a = np.clip(adim_a, -_ADIM_SINIRI, _ADIM_SINIRI)
+        adim_b = np.clip(adim_b, -_ADIM_SINIRI, _ADIM_SINIRI)
+
+        def aday(t):
+            return (np.clip(gucluk + t * adim_b, -_GUCLUK_SINIRI, _GUCLUK_SINIRI),
+                    np.clip(ayirt + t * adim_a, *_AYIRT_SINIRLARI))
+
+        # Geri izlemeli çizgi araması: hedefi düşüren sorularda adım yarılanır, hiç artıramayanlar yerinde kalır
+        eski = self._soru_hedefi(kisi, dogru_sayisi, gucluk, ayirt)
+        t = np.ones_like(gucluk)
+        for _ in range(_YARILAMA_SAYISI):
+            kotu = self._soru_hedefi(kisi, dogru_sayisi, *aday(t)) < eski
+            if not kotu.any():
+                return aday(t)
+            t[kotu] *= 0.5
+        t[self._soru_hedefi(kisi, dogru_sayisi, *aday(t)) < eski] = 0.0
+        return aday(t)
+
+    def _onceki_parametreler(self) -> dict:
+        if not self.parametre_yolu.exists():
+            return {}
+        try:
+            with open(self.parametre_yolu, 'r', encoding='utf-8') as f:
+                kayit = json.load(f)
+            return kayit.get('sorular', {}) if kayit.get('model') == self.model else {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"IRT parametreleri okunamadı, soğuk başlatılıyor: {e}")
+            return {}
+
+    def _parametreleri_kaydet(self, sonuc: KalibrasyonSonucu, soru_nolari: np.ndarray):
+        kayit = {
+            'model': sonuc.model,
+            'sorular': {
+                str(soru): {'gucluk': round(b, 6), 'ayirt_edicilik': round(a, 6)}
+                for soru, b, a in zip(soru_nolari.tolist(), sonuc.gucluk.tolist(), sonuc.ayirt_edicilik.tolist())
+            }
+        }
+        try:
+            self.parametre_yolu.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.parametre_yolu, 'w', encoding='utf-8') as f:
+                json.dump(kayit, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"IRT parametreleri kaydedilemedi: {e}")
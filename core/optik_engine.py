@@ -0,0 +1,515 @@
+import re
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from config import settings
+from utils.logger import logger
+from utils.debug_artifacts import HataAyiklamaYazici
+from utils.image_processor import KUCULTME_BAYRAKLARI, sayfa_oku, sayfa_etiketi
+
+# Okuma sonucunu etkileyen bir değişiklik yapıldığında artırılır; manifestteki
+# eski sonuçların yeniden hesaplanmasını sağlar.
+MOTOR_SURUMU = 3
+
+
+@dataclass(frozen=True, eq=False)
+class KimlikAlani:
+    """Formdaki makinece okunabilir kimlik alanı (okul no, sınıf, şube).
+
+    Her hane bir baloncuk sütunudur; merkezler (hane, etiket, [x, y])
+    dizisi olarak form koordinatlarında tutulur.
+    """
+    ad: str
+    etiketler: Tuple[str, ...]
+    baloncuk_merkezleri: np.ndarray
+
+    @property
+    def hane_sayisi(self) -> int:
+        return len(self.baloncuk_merkezleri)
+
+
+@dataclass(frozen=True, eq=False)
+class FormLayout:
+    """Optik form düzeni tanımı.
+
+    Baloncuk merkezleri form (SVG) koordinatlarında (soru, seçenek, [x, y])
+    dizisi olarak tutulur. Farklı bir form tasarımı için yeni bir FormLayout
+    oluşturmak yeterlidir; okuma motoru düzenden bağımsızdır.
+    """
+    secenekler: Tuple[str, ...]
+    baloncuk_merkezleri: np.ndarray
+    baloncuk_yaricap: int = 8
+    # Doluluk yalnızca bu yarıçaplı iç dairede ölçülür; basılı baloncuk
+    # çerçevesi boş baloncukları dolu gibi göstermesin diye dışarıda kalır
+    olcum_yaricap: int = 6
+    bos_esik: float = settings.BOS_ESIK
+    dolu_esik: float = settings.DOLU_ESIK
+    # Ters eşiklenmiş görüntüde işaretli (koyu) piksellerin değeri
+    isaretli_deger: int = 255
+    # En yüksek doluluk iki eşik arasında kaldığında verilecek cevap
+    belirsiz_cevap: Optional[str] = "belirsiz"
+    sayfa_boyutu: Tuple[int, int] = (800, 1100)
+    # Köşelerdeki dolu hizalama dairelerinin merkezleri (sol üst, sağ üst, sol alt, sağ alt)
+    hizalama_isaretleri: Optional[np.ndarray] = None
+    hizalama_yaricap: int = 5
+    kimlik_alanlari: Tuple[KimlikAlani, ...] = ()
+
+    @property
+    def soru_sayisi(self) -> int:
+        return len(self.baloncuk_merkezleri)
+
+    def tum_merkezler(self) -> np.ndarray:
+        """Cevap ve kimlik baloncuklarının tümünü (N, [x, y]) dizisi olarak döndürür"""
+        return np.concatenate([self.baloncuk_merkezleri.reshape(-1, 2)] +
+                              [alan.baloncuk_merkezleri.reshape(-1, 2) for alan in self.kimlik_alanlari])
+
+    def gruplara_ayir(self, dizi) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """tum_merkezler() sırasındaki bir diziyi cevap ızgarası ve kimlik alanlarına böler"""
+        sekil = self.baloncuk_merkezleri.shape[:2]
+        bas = sekil[0] * sekil[1]
+        cevaplar = dizi[:bas].reshape(sekil + dizi.shape[1:])
+        alanlar = {}
+        for alan in self.kimlik_alanlari:
+            sekil = alan.baloncuk_merkezleri.shape[:2]
+            son = bas + sekil[0] * sekil[1]
+            alanlar[alan.ad] = dizi[bas:son].reshape(sekil + dizi.shape[1:])
+            bas = son
+        return cevaplar, alanlar
+
+    def kimlik_kodla(self, okul_no: str, sinif_sube: str) -> Dict[str, List[Optional[int]]]:
+        """Öğrenci kimliğini alan başına işaretlenecek etiket indekslerine çevirir.
+
+        Kişiye özel formlarda kimlik baloncuklarını önceden doldurmak için
+        kullanılır; sığmayan veya çözümlenemeyen alanlar boş bırakılır.
+        """
+        eslesme = re.match(r'^\s*(\d+)\s*[/-]?\s*(\w)\s*$', sinif_sube or '')
+        degerler = {
+            'okul_no': (okul_no or '').strip(),
+            'sinif': eslesme.group(1) if eslesme else '',
+            'sube': eslesme.group(2).upper() if eslesme else ''
+        }
+        kodlar = {}
+        for alan in self.kimlik_alanlari:
+            deger = degerler.get(alan.ad, '')
+            if deger.isdigit():
+                deger = deger.zfill(alan.hane_sayisi)
+            if not deger or len(deger) > alan.hane_sayisi or any(k not in alan.etiketler for k in deger):
+                kodlar[alan.ad] = [None] * alan.hane_sayisi
+            else:
+                kodlar[alan.ad] = [alan.etiketler.index(k) for k in deger]
+        return kodlar
+
+    @classmethod
+    def varsayilan(cls, **degisiklikler) -> "FormLayout":
+        """FormGenerator'ın ürettiği iki sütunlu standart formun düzeni"""
+        secenekler = tuple(settings.SECENEKLER)
+        merkezler = []
+        for soru in range(1, settings.SORU_SAYISI + 1):
+            sutun, satir = divmod(soru - 1, 10)
+            y = 120 + satir * 30 - 5
+            x0 = 170 if sutun == 0 else 500
+            merkezler.append([(x0 + i * 30, y) for i in range(len(secenekler))])
+
+        # Kimlik alanı soruların altında: her hane için 0-9 (şube için harf) satırları
+        rakamlar = tuple(str(i) for i in range(10))
+        subeler = tuple(settings.SUBELER)
+
+        def sutunlar(x0, hane, etiketler):
+            return np.array([[(x0 + h * 30, 475 + k * 26) for k in range(len(etiketler))]
+                             for h in range(hane)], dtype=np.int64)
+
+        kimlik_alanlari = (
+            KimlikAlani('okul_no', rakamlar, sutunlar(170, settings.OKUL_NO_HANE, rakamlar)),
+            KimlikAlani('sinif', rakamlar, sutunlar(170 + 30 * settings.OKUL_NO_HANE + 60, settings.SINIF_HANE, rakamlar)),
+            KimlikAlani('sube', subeler, sutunlar(170 + 30 * (settings.OKUL_NO_HANE + settings.SINIF_HANE) + 120, 1, subeler)),
+        )
+        duzen = cls(
+            secenekler=secenekler,
+            baloncuk_merkezleri=np.array(merkezler, dtype=np.int64),
+            hizalama_isaretleri=np.array([(50, 50), (750, 50), (50, 1050), (750, 1050)], dtype=np.float32),
+            kimlik_alanlari=kimlik_alanlari
+        )
+        return replace(duzen, **degisiklikler) if degisiklikler else duzen
+
+    def koordinat_sozlugu(self) -> Dict[int, Dict[str, Tuple[int, int]]]:
+        """Düzeni {soru: {seçenek: (x, y)}} sözlüğü olarak döndürür"""
+        return {
+            soru + 1: {secenek: tuple(int(v) for v in self.baloncuk_merkezleri[soru, j])
+                       for j, secenek in enumerate(self.secenekler)}
+            for soru in range(self.soru_sayisi)
+        }
+
+
+@dataclass
+class SayfaYerlesimi:
+    """Form düzeninin taranmış görüntü üzerindeki karşılığı"""
+    # FormLayout.tum_merkezler() sırasında (N, [x, y]) piksel koordinatları
+    baloncuk_merkezleri: np.ndarray
+    baloncuk_yaricap: int
+    olcum_yaricap: int
+    # "hizalandi": hizalama işaretlerinden homografi, "olcek": yalnızca sayfa boyutuna göre ölçekleme
+    durum: str
+    bulunan_isaret: int = 0
+
+
+class OptikEngine:
+    """Tek optik form okuma motoru.
+
+    Aşamalar: görüntüyü gri tonlamalı (gerekirse küçültülmüş) oku, hizalama
+    işaretlerini bulup baloncuk koordinatlarını görüntüye taşı, yalnızca
+    baloncukları kapsayan bölgeyi ön işle (bulanıklaştırma + Otsu), tüm
+    baloncukların doluluk oranlarını tek seferde hesapla ve cevapları
+    eşiklerle çöz. Çekirdek CLI (OptikProcessor), arayüz (TopluOptikOkuyucu)
+    ve bağımsız betik aynı motoru kullanır.
+    """
+
+    def __init__(self, layout: Optional[FormLayout] = None):
+        self.layout = layout or FormLayout.varsayilan()
+        self.hata_ayiklama = True
+        self.hizalama = settings.OPTIK_HIZALAMA and self.layout.hizalama_isaretleri is not None
+        self.bolge_onisleme = settings.OPTIK_ONISLEME_BOLGESI == "baloncuk"
+        self.kucultme = settings.OPTIK_KUCULTME if settings.OPTIK_KUCULTME in KUCULTME_BAYRAKLARI else 1
+        self.hata_yazici = HataAyiklamaYazici()
+        self._indeks_onbellegi = {}
+
+    def esik_degerleri(self) -> Dict[str, float]:
+        return {
+            'bos_esik': self.layout.bos_esik,
+            'dolu_esik': self.layout.dolu_esik
+        }
+
+    def yapilandirma_anahtari(self) -> Dict:
+        """Okuma sonucunu belirleyen ayarlar (manifest anahtarı olarak kullanılır)"""
+        anahtar = self.esik_degerleri()
+        anahtar.update({
+            'baloncuk_yaricap': self.layout.baloncuk_yaricap,
+            'olcum_yaricap': self.layout.olcum_yaricap,
+            'hizalama': self.hizalama,
+            'onisleme_bolgesi': settings.OPTIK_ONISLEME_BOLGESI,
+            'kucultme': settings.OPTIK_KUCULTME,
+            'motor_surumu': MOTOR_SURUMU
+        })
+        return anahtar
+
+    def goruntu_oku(self, dosya_yolu: Path, sayfa_no: Optional[int] = None):
+        gray = sayfa_oku(dosya_yolu, sayfa_no, self.kucultme)
+        if gray is None:
+            konum = f"{dosya_yolu}" if sayfa_no is None else f"{dosya_yolu} (sayfa {sayfa_no})"
+            raise ValueError(f"Görüntü yüklenemedi: {konum}")
+        if self.kucultme > 1 and self._olcek(gray.shape) < settings.OPTIK_MIN_OLCEK:
+            # Tarama zaten düşük çözünürlüklü; küçültülürse baloncuklar ölçülemeyecek kadar
+            # küçülür. Bu motorla okunan sonraki formlar da tam çözünürlükte okunur.
+            logger.debug(f"{dosya_yolu.name} küçültme için fazla küçük, tam çözünürlüğe geçiliyor")
+            self.kucultme = 1
+            return self.goruntu_oku(dosya_yolu, sayfa_no)
+        return gray
+
+    def _olcek(self, sekil) -> float:
+        sayfa_w, sayfa_h = self.layout.sayfa_boyutu
+        return min(sekil[1] / sayfa_w, sekil[0] / sayfa_h)
+
+    def onisleme_kutusu(self, sekil, yerlesim: SayfaYerlesimi) -> Tuple[int, int, int, int]:
+        """Ön işlemenin yapılacağı (x1, y1, x2, y2) bölgesi.
+
+        Bölge modunda tüm baloncukların birleşik sınır kutusu (bulanıklaştırma
+        kenar etkisi için iki yarıçap pay ile), aksi halde tüm görüntüdür.
+        """
+        h, w = sekil[:2]
+        if not self.bolge_onisleme:
+            return 0, 0, w, h
+        pay = 2 * yerlesim.baloncuk_yaricap
+        merkezler = yerlesim.baloncuk_merkezleri.reshape(-1, 2)
+        x1, y1 = merkezler.min(axis=0) - pay
+        x2, y2 = merkezler.max(axis=0) + pay
+        return max(0, int(x1)), max(0, int(y1)), min(w, int(x2)), min(h, int(y2))
+
+    def onisle(self, gray, kutu: Optional[Tuple[int, int, int, int]] = None):
+        """Görüntüyü (veya verilen bölgesini) bulanıklaştırıp Otsu ile ters eşikler"""
+        if kutu is not None:
+            x1, y1, x2, y2 = kutu
+            gray = gray[y1:y2, x1:x2]
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        return thresh
+
+    def yerlesimi_bul(self, gray) -> SayfaYerlesimi:
+        """Baloncuk koordinatlarını taranmış görüntünün piksel koordinatlarına taşır.
+
+        Dört köşedeki hizalama işaretleri bulunabilirse form koordinatlarından
+        görüntüye bir homografi hesaplanır ve yalnızca baloncuk merkezleri bu
+        dönüşümle taşınır; görüntünün kendisi döndürülmez. İşaretler
+        bulunamazsa formun sayfayı tam kapladığı varsayılarak ölçeklenir.
+        """
+        h, w = gray.shape[:2]
+        sayfa_w, sayfa_h = self.layout.sayfa_boyutu
+        olcek_donusumu = np.array([[w / sayfa_w, 0, 0], [0, h / sayfa_h, 0], [0, 0, 1]], dtype=np.float64)
+
+        donusum, durum, bulunan = olcek_donusumu, "olcek", 0
+        if self.hizalama:
+            hedefler = self._hizalama_isaretlerini_bul(gray, olcek_donusumu)
+            bulunan = sum(nokta is not None for nokta in hedefler)
+            kaynak = [nokta for nokta, hedef in zip(self.layout.hizalama_isaretleri, hedefler) if hedef is not None]
+            hedef = [nokta for nokta in hedefler if nokta is not None]
+            if bulunan == 4:
+                donusum = cv2.getPerspectiveTransform(np.float32(kaynak), np.float32(hedef))
+                durum = "hizalandi"
+            elif bulunan == 3:
+                donusum = np.vstack([cv2.getAffineTransform(np.float32(kaynak), np.float32(hedef)), [0, 0, 1]])
+                durum = "hizalandi"
+            else:
+                logger.debug(f"Hizalama işaretleri bulunamadı ({bulunan}/4), ölçekleme kullanılıyor")
+
+        merkezler = self.layout.tum_merkezler()
+        if durum != "olcek" or (w, h) != (sayfa_w, sayfa_h):
+            noktalar = merkezler.reshape(-1, 1, 2).astype(np.float64)
+            merkezler = np.rint(cv2.perspectiveTransform(noktalar, donusum)).astype(np.int64).reshape(-1, 2)
+
+        # Baloncuk boyutu, dönüşümün doğrusal kısmının ortalama ölçeğiyle büyür
+        olcek = float(np.sqrt(abs(np.linalg.det(donusum[:2, :2]))))
+        return SayfaYerlesimi(
+            baloncuk_merkezleri=merkezler,
+            baloncuk_yaricap=max(1, int(round(self.layout.baloncuk_yaricap * olcek))),
+            olcum_yaricap=max(1, int(round(self.layout.olcum_yaricap * olcek))),
+            durum=durum,
+            bulunan_isaret=bulunan
+        )
+
+    def _hizalama_isaretlerini_bul(self, gray, olcek_donusumu) -> List[Optional[Tuple[float, float]]]:
+        """Her hizalama işaretini beklenen konumu çevresindeki küçük bir pencerede arar"""
+        h, w = gray.shape[:2]
+        sx, sy = olcek_donusumu[0, 0], olcek_donusumu[1, 1]
+        olcek = (sx + sy) / 2
+        beklenen_alan = np.pi * (self.layout.hizalama_yaricap * olcek) ** 2
+        pencere = int(round(settings.OPTIK_HIZALAMA_PENCERESI * max(w, h)))
+
+        noktalar = []
+        for x, y in self.layout.hizalama_isaretleri:
+            ex, ey = x * sx, y * sy
+            x1, x2 = max(0, int(ex) - pencere), min(w, int(ex) + pencere)
+            y1, y2 = max(0, int(ey) - pencere), min(h, int(ey) + pencere)
+            parca = gray[y1:y2, x1:x2]
+            if parca.size == 0:
+                noktalar.append(None)
+                continue
+            parca = cv2.GaussianBlur(parca, (5, 5), 0)
+            _, ikili = cv2.threshold(parca, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+            adet, _, istatistik, agirlik = cv2.connectedComponentsWithStats(ikili)
+
+            en_iyi, en_iyi_uzaklik = None, None
+            for etiket in range(1, adet):
+                bw, bh, alan = istatistik[etiket, 2], istatistik[etiket, 3], istatistik[etiket, 4]
+                if not (0.3 * beklenen_alan <= alan <= 3 * beklenen_alan):
+                    continue
+                # Dolu daire: yaklaşık kare sınır kutusu, kutunun çoğu dolu
+                if not (0.5 <= bw / bh <= 2) or alan < 0.5 * bw * bh:
+                    continue
+                cx, cy = agirlik[etiket][0] + x1, agirlik[etiket][1] + y1
+                uzaklik = (cx - ex) ** 2 + (cy - ey) ** 2
+                if en_iyi_uzaklik is None or uzaklik < en_iyi_uzaklik:
+                    en_iyi, en_iyi_uzaklik = (cx, cy), uzaklik
+            noktalar.append(en_iyi)
+        return noktalar
+
+    @staticmethod
+    def _daire_sablonu(r: int, olcum_r: int):
+        ofset = np.arange(-r, r)
+        return ofset, ofset[:, None] ** 2 + ofset[None, :] ** 2 <= olcum_r ** 2
+
+    def _indeks_tensoru(self, sekil, yerlesim: SayfaYerlesimi, kutu: Tuple[int, int, int, int]):
+        """Tüm baloncukların ön işlenmiş bölgedeki piksel indekslerini ve ölçüm maskesini üretir.
+
+        Hizalama yapılmamış formlarda sonuç yalnızca görüntü boyutuna bağlıdır
+        ve önbelleğe alınır; aynı taramadan gelen formlar için tensör bir kez
+        hesaplanır.
+        """
+        onbellege_al = yerlesim.durum == "olcek"
+        tensor = self._indeks_onbellegi.get((sekil, kutu)) if onbellege_al else None
+        if tensor is None:
+            x1, y1, x2, y2 = kutu
+            h, w = y2 - y1, x2 - x1
+            ofset, daire = self._daire_sablonu(yerlesim.baloncuk_yaricap, yerlesim.olcum_yaricap)
+            merkezler = yerlesim.baloncuk_merkezleri - np.array([x1, y1])
+            ys = merkezler[..., 1, None] + ofset
+            xs = merkezler[..., 0, None] + ofset
+            maske = (((ys >= 0) & (ys < h))[..., :, None] &
+                     ((xs >= 0) & (xs < w))[..., None, :] & daire)
+            indeks = (np.clip(ys, 0, h - 1)[..., :, None] * w +
+                      np.clip(xs, 0, w - 1)[..., None, :])
+            tensor = (indeks, maske, maske.sum(axis=(-2, -1)))
+            if onbellege_al:
+                self._indeks_onbellegi[(sekil, kutu)] = tensor
+        return tensor
+
+    def doluluk_oranlari(self, thresh_img, yerlesim: Optional[SayfaYerlesimi] = None,
+                         kutu: Optional[Tuple[int, int, int, int]] = None):
+        """Tüm baloncukların (cevap ve kimlik) doluluk oranlarını tek seferde hesaplar.
+
+        Sonuç FormLayout.tum_merkezler() sırasında düz dizilerdir;
+        FormLayout.gruplara_ayir ile cevap ızgarasına ve kimlik alanlarına
+        bölünür. thresh_img, görüntünün kutu ile verilen bölgesinin eşiklenmiş halidir;
+        kutu verilmezse tüm görüntü kabul edilir.
+        """
+        sekil = thresh_img.shape[:2]
+        if yerlesim is None:
+            yerlesim = self.yerlesimi_bul(thresh_img)
+        if kutu is None:
+            kutu = (0, 0, sekil[1], sekil[0])
+        indeks, maske, alan = self._indeks_tensoru(sekil, yerlesim, kutu)
+        pikseller = thresh_img.ravel()[indeks]
+        isaretli = np.count_nonzero((pikseller == self.layout.isaretli_deger) & maske, axis=(-2, -1))
+        return isaretli / np.maximum(alan, 1), alan > 0
+
+    def cevaplari_coz(self, oranlar, gecerli) -> Tuple[List[Optional[str]], List[Dict[str, float]]]:
+        """Doluluk matrisinden cevapları ve soru başına doluluk ayrıntılarını çıkarır"""
+        secimli = np.where(gecerli, oranlar, -1.0)
+        en_yuksek = secimli.argmax(axis=1)
+        en_yuksek_oran = secimli[np.arange(len(secimli)), en_yuksek]
+
+        cevaplar = []
+        for secenek_indeksi, oran, soru_gecerli in zip(en_yuksek, en_yuksek_oran, gecerli.any(axis=1)):
+            if not soru_gecerli or oran < self.layout.bos_esik:
+                cevaplar.append(None)
+            elif oran >= self.layout.dolu_esik:
+                cevaplar.append(self.layout.secenekler[secenek_indeksi])
+            else:
+                cevaplar.append(self.layout.belirsiz_cevap)
+
+        yuvarlanmis = np.round(oranlar, 3).tolist()
+        detaylar = [
+            {secenek: yuvarlanmis[i][j] for j, secenek in enumerate(self.layout.secenekler) if gecerli[i, j]}
+            for i in range(len(oranlar))
+        ]
+        return cevaplar, detaylar
+
+    def kimlik_oku(self, dosya_yolu: Path) -> Tuple[str, str]:
+        """Sınıf/şube ve okul numarasını <sinif>_<okulno>_<ad>.png dosya adından okur"""
+        parcalar = dosya_yolu.stem.split('_')
+        if len(parcalar) < 2:
+            return "bilinmiyor", "bilinmiyor"
+        return parcalar[0], parcalar[1]
+
+    def kimlik_coz(self, alan_oranlari: Dict[str, np.ndarray]) -> Dict[str, Optional[str]]:
+        """Kimlik alanlarının doluluk oranlarından okul numarası ve sınıf/şubeyi çözer.
+
+        Her hanede tek bir baloncuk dolu olmalıdır; boş haneler atlanır.
+        Hiç işaretlenmemiş veya çift/belirsiz işaretli alanlar None döner.
+        """
+        degerler = {}
+        for alan in self.layout.kimlik_alanlari:
+            oranlar = alan_oranlari[alan.ad]
+            dolu = oranlar >= self.layout.dolu_esik
+            bos = oranlar.max(axis=1) < self.layout.bos_esik
+            if np.any(~bos & (dolu.sum(axis=1) != 1)):
+                degerler[alan.ad] = None
+                continue
+            hane = [alan.etiketler[j] for j in oranlar.argmax(axis=1)[~bos]]
+            degerler[alan.ad] = ''.join(hane) or None
+
+        okul_no, sinif, sube = degerler.get('okul_no'), degerler.get('sinif'), degerler.get('sube')
+        return {
+            'okul_no': str(int(okul_no)) if okul_no else None,
+            'sinif_sube': f"{int(sinif)}{sube}" if sinif and sube else None
+        }
+
+    def formu_oku(self, dosya_yolu, zamanlama: Optional[Dict[str, float]] = None,
+                  sayfa_no: Optional[int] = None) -> Dict:
+        """Optik formu okur ve sonuç sözlüğünü döndürür.
+
+        Çok sayfalı TIFF/PDF dosyalarında sayfa_no (1'den başlar) okunacak
+        sayfayı seçer ve sonuca eklenir. zamanlama sözlüğü verilirse aşama
+        sürelerini (saniye) üzerine ekler.
+        """
+        dosya_yolu = Path(dosya_yolu)
+        kaynak = {'dosya_adi': dosya_yolu.name}
+        if sayfa_no is not None:
+            kaynak['sayfa_no'] = sayfa_no
+        try:
+            t0 = time.perf_counter()
+            gray = self.goruntu_oku(dosya_yolu, sayfa_no)
+            t1 = time.perf_counter()
+            yerlesim = self.yerlesimi_bul(gray)
+            t2 = time.perf_counter()
+            kutu = self.onisleme_kutusu(gray.shape, yerlesim)
+            thresh = self.onisle(gray, kutu)
+            t3 = time.perf_counter()
+            tum_oranlar, tum_gecerli = self.doluluk_oranlari(thresh, yerlesim, kutu)
+            oranlar, alan_oranlari = self.layout.gruplara_ayir(tum_oranlar)
+            gecerli, _ = self.layout.gruplara_ayir(tum_gecerli)
+            cevaplar, detaylar = self.cevaplari_coz(oranlar, gecerli)
+            kimlik = self.kimlik_coz(alan_oranlari)
+            t4 = time.perf_counter()
+
+            # Formdan okunamayan kimlik bilgisi dosya adından alınır
+            dosya_sinif_sube, dosya_okul_no = self.kimlik_oku(dosya_yolu)
+            sonuclar = {
+                **kaynak,
+                'okul_no': kimlik['okul_no'] or dosya_okul_no,
+                'sinif_sube': kimlik['sinif_sube'] or dosya_sinif_sube,
+                'kimlik_kaynagi': {alan: 'form' if deger else 'dosya_adi' for alan, deger in kimlik.items()},
+                'cevaplar': {str(soru + 1): cevap for soru, cevap in enumerate(cevaplar)},
+                'doluluk': {str(soru + 1): oran for soru, oran in
+                            enumerate(np.where(gecerli, oranlar, 0.0).max(axis=1).round(3).tolist())},
+                'islem_tarihi': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'islem_durumu': 'başarılı',
+                'esik_degerler': self.esik_degerleri(),
+                'hizalama': {'durum': yerlesim.durum, 'bulunan_isaret': yerlesim.bulunan_isaret}
+            }
+            if self.hata_ayiklama:
+                sonuclar['hata_ayiklama'] = {str(soru + 1): d for soru, d in enumerate(detaylar)}
+            sonuclar['istatistikler'] = self.istatistikleri_hesapla(cevaplar)
+
+            if self.hata_yazici.etkin:
+                self._hata_ayiklama_goruntulerini_kaydet(sayfa_etiketi(dosya_yolu, sayfa_no), thresh,
+                                                         oranlar, yerlesim, kutu)
+
+            if zamanlama is not None:
+                for asama, sure in (('okuma', t1 - t0), ('hizalama', t2 - t1),
+                                    ('onisleme', t3 - t2), ('puanlama', t4 - t3)):
+                    zamanlama[asama] = zamanlama.get(asama, 0.0) + sure
+            return sonuclar
+
+        except Exception as e:
+            logger.error(f"Hata oluştu ({sayfa_etiketi(dosya_yolu, sayfa_no)}): {str(e)}")
+            return {
+                **kaynak,
+                'islem_durumu': 'hata',
+                'hata_mesaji': str(e)
+            }
+
+    def istatistikleri_hesapla(self, cevaplar: List[Optional[str]]) -> Dict:
+        bos_cevaplar = sum(1 for cevap in cevaplar if cevap is None)
+        secenek_dagilimi = {secenek: 0 for secenek in self.layout.secenekler}
+        for cevap in cevaplar:
+            if cevap in secenek_dagilimi:
+                secenek_dagilimi[cevap] += 1
+
+        return {
+            'toplam_soru': self.layout.soru_sayisi,
+            'dolu_cevaplar': self.layout.soru_sayisi - bos_cevaplar,
+            'bos_cevaplar': bos_cevaplar,
+            'secenek_dagilimi': secenek_dagilimi
+        }
+
+    def _hata_ayiklama_goruntulerini_kaydet(self, etiket: str, thresh_img, oranlar,
+                                            yerlesim: SayfaYerlesimi, kutu: Tuple[int, int, int, int]):
+        """Hata ayıklama moduna göre eşiklenmiş formu ve baloncuk görüntülerini kuyruğa ekler"""
+        if self.hata_yazici.form_tamamen_kaydedilsin_mi(etiket):
+            self.hata_yazici.ekle(f"islenmis_{etiket}.png", thresh_img)
+            sorular = range(self.layout.soru_sayisi)
+        else:
+            en_yuksek = oranlar.max(axis=1)
+            sorular = np.flatnonzero((en_yuksek >= self.layout.bos_esik) & (en_yuksek < self.layout.dolu_esik))
+
+        r = yerlesim.baloncuk_yaricap
+        h, w = thresh_img.shape[:2]
+        # Merkezler tam görüntü koordinatlarında; eşiklenmiş bölgeye göre kaydır
+        merkezler, _ = self.layout.gruplara_ayir(yerlesim.baloncuk_merkezleri - np.array(kutu[:2]))
+        for i in sorular:
+            for j, (x, y) in enumerate(merkezler[i]):
+                roi = thresh_img[max(0, y - r):min(h, y + r), max(0, x - r):min(w, x + r)]
+                if roi.size > 0:
+                    self.hata_yazici.ekle(f"{etiket}_soru{i + 1}_{self.layout.secenekler[j]}.png", roi)
@@ -0,0 +1,108 @@
+import os
+import json
+from pathlib import Path
+from typing import Dict, Optional
+from utils.file_utils import file_sha1
+from utils.logger import logger
+
+
+class OptikManifest:
+    """İşlenmiş optik form görüntülerinin kalıcı dizini (JSON-lines).
+
+    Her satır bir görüntü için boyut, değiştirilme zamanı, içerik özeti,
+    kullanılan eşik değerleri ve okuma sonucunu tutar. Kayıtlar her form
+    işlendiğinde dosyaya eklenir; böylece yarıda kesilen bir toplu işlem
+    kaldığı yerden devam edebilir. Aynı dosya için son satır geçerlidir.
+
+    Çok sayfalı TIFF/PDF dosyalarında her sayfa ayrı bir kayıttır.
+    """
+
+    def __init__(self, manifest_yolu: Path):
+        self.manifest_yolu = Path(manifest_yolu)
+        self.kayitlar = {}
+        self._satir_sayisi = 0
+        self._ozetler = {}  # (yol, boyut, mtime) -> özet; aynı dosyanın sayfaları için bir kez hesaplanır
+        self._yukle()
+
+    @staticmethod
+    def _anahtar(dosya_yolu, esikler: Dict, sayfa_no: Optional[int] = None) -> tuple:
+        return str(Path(dosya_yolu).resolve()), sayfa_no, json.dumps(esikler, sort_keys=True)
+
+    @staticmethod
+    def icerik_ozeti(dosya_yolu) -> str:
+        """Dosya içeriğinin SHA-1 özetini hesaplar"""
+        return file_sha1(dosya_yolu)
+
+    def _ozet(self, dosya_yolu, durum) -> str:
+        anahtar = (str(dosya_yolu), durum.st_size, durum.st_mtime)
+        if anahtar not in self._ozetler:
+            self._ozetler[anahtar] = self.icerik_ozeti(dosya_yolu)
+        return self._ozetler[anahtar]
+
+    def _yukle(self):
+        if not self.manifest_yolu.exists():
+            return
+        try:
+            with open(self.manifest_yolu, 'r', encoding='utf-8') as f:
+                for satir in f:
+                    self._satir_sayisi += 1
+                    try:
+                        kayit = json.loads(satir)
+                    except json.JSONDecodeError:
+                        # Yarıda kesilmiş son satır; atla
+                        continue
+                    self.kayitlar[self._anahtar(kayit['dosya'], kayit['esikler'], kayit.get('sayfa_no'))] = kayit
+            if self._satir_sayisi > 2 * len(self.kayitlar) + 100:
+                self.sikistir()
+        except Exception as e:
+            logger.error(f"Manifest yüklenemedi ({self.manifest_yolu}): {e}")
+            self.kayitlar = {}
+
+    def gecerli_sonuc(self, dosya_yolu, esikler: Dict, sayfa_no: Optional[int] = None) -> Optional[Dict]:
+        """Dosya değişmediyse ve aynı eşiklerle işlendiyse önbellekteki sonucu döndürür"""
+        kayit = self.kayitlar.get(self._anahtar(dosya_yolu, esikler, sayfa_no))
+        if kayit is None:
+            return None
+        try:
+            durum = os.stat(dosya_yolu)
+            if durum.st_size == kayit['boyut'] and durum.st_mtime == kayit['mtime']:
+                return kayit['sonuc']
+            if durum.st_size == kayit['boyut'] and self._ozet(dosya_yolu, durum) == kayit['ozet']:
+                # İçerik aynı, yalnızca zaman damgası değişmiş
+                self.kaydet(dosya_yolu, esikler, kayit['sonuc'], ozet=kayit['ozet'], sayfa_no=sayfa_no)
+                return kayit['sonuc']
+        except OSError:
+            pass
+        return None
+
+    def kaydet(self, dosya_yolu, esikler: Dict, sonuc: Dict, ozet: Optional[str] = None,
+               sayfa_no: Optional[int] = None):
+        """Başarılı bir okuma sonucunu manifeste ekler"""
+        try:
+            durum = os.stat(dosya_yolu)
+            kayit = {
+                'dosya': str(Path(dosya_yolu).resolve()),
+                'boyut': durum.st_size,
+                'mtime': durum.st_mtime,
+                'ozet': ozet or self._ozet(dosya_yolu, durum),
+                'esikler': esikler,
+                'sonuc': sonuc
+            }
+            if sayfa_no is not None:
+                kayit['sayfa_no'] = sayfa_no
+            self.manifest_yolu.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.manifest_yolu, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(kayit, ensure_ascii=False) + '\n')
+            self.kayitlar[self._anahtar(dosya_yolu, esikler, sayfa_no)] = kayit
+            self._satir_sayisi += 1
+        except Exception as e:
+            logger.error(f"Manifest kaydı yazılamadı ({dosya_yolu}): {e}")
+
+    def sikistir(self):
+        """Manifesti her dosya için yalnızca son kaydı içerecek şekilde yeniden yazar"""
+        gecici_yol = self.manifest_yolu.with_suffix('.tmp')
+        with open(gecici_yol, 'w', encoding='utf-8') as f:
+            for kayit in self.kayitlar.values():
+                f.write(json.dumps(kayit, ensure_ascii=False) + '\n')
+        os.replace(gecici_yol, self.manifest_yolu)
+        self._satir_sayisi = len(self.kayitlar)
@@ -1,208 +1,162 @@
 import os
-import json
-import cv2
-import numpy as np
-from datetime import datetime
-import glob
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 from config import settings
 from utils.logger import logger
+from core.optik_engine import OptikEngine, FormLayout
+from core.optik_manifest import OptikManifest
+from core.result_store import ResultStore
+from utils.image_processor import optik_dosyalarini_bul, sayfalari_listele, sayfa_etiketi
+
+# İşçi süreçlerinde kullanılan OptikProcessor örneği (süreç başına bir kez kurulur)
+_isci_islemcisi = None
+
+
+def _isci_baslat(islemci, hata_ayiklama_siniri):
+    global _isci_islemcisi
+    _isci_islemcisi = islemci
+    _isci_islemcisi.hata_yazici.maks_dosya = hata_ayiklama_siniri
+
+
+def _isci_formu_oku(dosya_yolu, sayfa_no=None):
+    return _isci_islemcisi.optik_formu_oku(dosya_yolu, sayfa_no)
+
 
 class OptikProcessor:
-    def __init__(self):
+    def __init__(self, layout: Optional[FormLayout] = None):
         self.girdi_dizini = settings.OPTIK_CEVAPLAR_DIR
         self.cikti_dizini = settings.RAPORLAR_DIR
 
         self.girdi_dizini.mkdir(exist_ok=True)
         self.cikti_dizini.mkdir(exist_ok=True)
 
-        self.soru_sayisi = settings.SORU_SAYISI
-        self.secenekler = settings.SECENEKLER
-        self.bos_esik = 0.1
-        self.dolu_esik = 0.3
-        self.baloncuk_yaricap = 12
-        self.baloncuk_koordinatlari = self._baloncuk_koordinatlari_olustur()
-        self.hata_ayiklama = True
-
-        logger.info(f"Eşik değerleri: Boş={self.bos_esik}, Dolu={self.dolu_esik}")
-
-    def _baloncuk_koordinatlari_olustur(self):
-        koordinatlar = {}
-        for soru in range(1, 11):
-            y = 120 + (soru - 1) * 30 - 5
-            koordinatlar[soru] = {}
-            for i, secenek in enumerate(self.secenekler):
-                x = 170 + i * 30
-                koordinatlar[soru][secenek] = (x, y)
-        for soru in range(11, 21):
-            y = 120 + (soru - 11) * 30 - 5
-            koordinatlar[soru] = {}
-            for i, secenek in enumerate(self.secenekler):
-                x = 500 + i * 30
-                koordinatlar[soru][secenek] = (x, y)
-        return koordinatlar
-
-    def _goruntu_onisle(self, img):
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        return thresh
-
-    def optik_formu_oku(self, dosya_yolu):
-        try:
-            img = cv2.imread(str(dosya_yolu))
-            if img is None:
-                raise ValueError(f"Görüntü yüklenemedi: {dosya_yolu}")
-
-            thresh = self._goruntu_onisle(img)
-
-            sonuclar = {
-                'dosya_adi': dosya_yolu.name,
-                'okul_no': self._okul_no_oku(dosya_yolu),
-                'sinif_sube': self._sinif_sube_oku(dosya_yolu),
-                'cevaplar': {},
-                'islem_tarihi': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'islem_durumu': 'başarılı',
-                'esik_degerler': {
-                    'bos_esik': self.bos_esik,
-                    'dolu_esik': self.dolu_esik
-                }
-            }
-
-            for soru in range(1, self.soru_sayisi + 1):
-                cevap, detaylar = self._soru_cevabi_bul(thresh, soru)
-                sonuclar['cevaplar'][str(soru)] = cevap
-                if self.hata_ayiklama:
-                    sonuclar.setdefault('hata_ayiklama', {})
-                    sonuclar['hata_ayiklama'][str(soru)] = detaylar
-
-            sonuclar['istatistikler'] = self._istatistikleri_hesapla(sonuclar)
-            return sonuclar
-
-        except Exception as e:
-            logger.error(f"Hata oluştu: {str(e)}")
-            return {
-                'dosya_adi': dosya_yolu.name,
-                'islem_durumu': 'hata',
-                'hata_mesaji': str(e)
-            }
-
-    def _soru_cevabi_bul(self, thresh_img, soru_no):
-        try:
-            secenek_doluluk_oranlari = {}
-            detaylar = {}
-            r = self.baloncuk_yaricap
-
-            for secenek, (x, y) in self.baloncuk_koordinatlari[soru_no].items():
-                y1, y2 = max(0, int(y)-r), min(thresh_img.shape[0], int(y)+r)
-                x1, x2 = max(0, int(x)-r), min(thresh_img.shape[1], int(x)+r)
-                roi = thresh_img[y1:y2, x1:x2]
-
-                if roi.size > 0:
-                    siyah_piksel_sayisi = np.sum(roi == 0)
-                    doluluk_orani = siyah_piksel_sayisi / roi.size
-                    secenek_doluluk_oranlari[secenek] = doluluk_orani
-                    detaylar[secenek] = round(doluluk_orani, 3)
-
-                    if self.hata_ayiklama:
-                        cv2.imwrite(f"debug_roi_soru{soru_no}_{secenek}.png", roi)
-
-            if secenek_doluluk_oranlari:
-                en_yuksek_secenek = max(secenek_doluluk_oranlari, key=secenek_doluluk_oranlari.get)
-                en_yuksek_oran = secenek_doluluk_oranlari[en_yuksek_secenek]
-
-                if en_yuksek_oran < self.bos_esik:
-                    return None, detaylar
-                elif en_yuksek_oran >= self.dolu_esik:
-                    return en_yuksek_secenek, detaylar
-                else:
-                    return "belirsiz", detaylar
+        self.engine = OptikEngine(layout)
+        self.store = ResultStore()
 
-            return None, detaylar
+        logger.info(f"Eşik değerleri: Boş={self.engine.layout.bos_esik}, Dolu={self.engine.layout.dolu_esik}")
 
-        except Exception as e:
-            logger.error(f"Soru {soru_no} işlenirken hata: {str(e)}")
-            return None, {}
-
-    def _istatistikleri_hesapla(self, sonuclar):
-        if sonuclar['islem_durumu'] != 'başarılı':
-            return {}
-
-        cevaplar = sonuclar['cevaplar']
-        bos_cevaplar = sum(1 for cevap in cevaplar.values() if cevap is None)
-        secenek_dagilimi = {secenek: 0 for secenek in self.secenekler}
-        for cevap in cevaplar.values():
-            if cevap in secenek_dagilimi:
-                secenek_dagilimi[cevap] += 1
-
-        return {
-            'toplam_soru': self.soru_sayisi,
-            'dolu_cevaplar': self.soru_sayisi - bos_cevaplar,
-            'bos_cevaplar': bos_cevaplar,
-            'secenek_dagilimi': secenek_dagilimi
-        }
-
-    def _okul_no_oku(self, dosya_yolu):
-        try:
-            return dosya_yolu.stem.split('_')[2]
-        except:
-            return "bilinmiyor"
+    @property
+    def hata_yazici(self):
+        return self.engine.hata_yazici
 
-    def _sinif_sube_oku(self, dosya_yolu):
-        try:
-            return dosya_yolu.stem.split('_')[0]
-        except:
-            return "bilinmiyor"
+    def optik_formu_oku(self, dosya_yolu, sayfa_no=None):
+        return self.engine.formu_oku(dosya_yolu, sayfa_no=sayfa_no)
 
-    def sonuclari_kaydet(self, sonuclar, dosya_adi=None):
+    def sonuclari_kaydet(self, sonuclar):
+        """Okuma sonuçlarını sonuç deposuna tek çalışma olarak ekler; çalışma numarasını döndürür"""
         try:
-            if dosya_adi is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                dosya_adi = f"optik_sonuclar_{timestamp}.json"
-
-            cikti_yolu = self.cikti_dizini / dosya_adi
-            with open(cikti_yolu, 'w', encoding='utf-8') as f:
-                json.dump(sonuclar, f, ensure_ascii=False, indent=4)
-
-            logger.info(f"Sonuçlar kaydedildi: {cikti_yolu}")
-            return cikti_yolu
+            calisma = self.store.formlari_ekle(sonuclar)
+            if calisma is not None:
+                logger.info(f"{len(sonuclar)} form sonucu depoya kaydedildi: {self.store.yol}")
+            return calisma
 
         except Exception as e:
             logger.error(f"Sonuçlar kaydedilirken hata: {str(e)}")
             return None
 
-    def process_all_forms(self):
-        """Tüm optik formları işle"""
-        try:
-            resim_formatlari = ["*.png", "*.jpg", "*.jpeg", "*.bmp", "*.tiff"]
-            dosya_yollari = []
-            for pattern in resim_formatlari:
-                dosya_yollari.extend(glob.glob(str(self.girdi_dizini / pattern)))
+    def process_all_forms(self, isci_sayisi=None, yeniden_isle=False):
+        """Tüm optik formları işle
+
+        Çok sayfalı TIFF ve PDF dosyalarının her sayfası ayrı bir form olarak
+        okunur ve sonucuna sayfa_no eklenir.
 
+        isci_sayisi verilmezse settings.OPTIK_ISCI_SAYISI kullanılır; 1'den
+        büyük değerlerde formlar süreç havuzunda paralel okunur. Sonuçların
+        sırası dosya ve sayfa sırasıyla aynıdır.
+
+        Daha önce aynı eşiklerle işlenmiş ve değişmemiş dosyaların sonuçları
+        manifestten alınır; yeniden_isle=True tüm dosyaları yeniden okur.
+        Yeni okunan (veya depoda henüz olmayan) başarılı sonuçlar tek çalışma
+        olarak sonuç deposuna eklenir.
+        """
+        try:
+            dosya_yollari = optik_dosyalarini_bul(self.girdi_dizini)
             if not dosya_yollari:
                 logger.info(f"Girdi dizininde resim dosyası bulunamadı: {self.girdi_dizini}")
                 return []
 
-            logger.info(f"{len(dosya_yollari)} dosya bulundu, işlem başlatılıyor...")
+            # Çok sayfalı TIFF/PDF dosyaları sayfalara açılır; sayfalar okunurken tek tek çözülür
+            sayfalar = list(sayfalari_listele(dosya_yollari))
+            manifest = OptikManifest(settings.OPTIK_MANIFEST_PATH)
+            esikler = self.engine.yapilandirma_anahtari()
+
+            tum_sonuclar = [None] * len(sayfalar)
+            bekleyenler = []
+            for i, (dosya_yolu, sayfa_no) in enumerate(sayfalar):
+                onceki = None if yeniden_isle else manifest.gecerli_sonuc(dosya_yolu, esikler, sayfa_no)
+                if onceki is not None:
+                    tum_sonuclar[i] = onceki
+                else:
+                    bekleyenler.append(i)
+
+            logger.info(f"{len(dosya_yollari)} dosya ({len(sayfalar)} sayfa) bulundu, "
+                        f"{len(sayfalar) - len(bekleyenler)} sayfa değişmediği için atlanıyor")
+
+            if isci_sayisi is None:
+                isci_sayisi = settings.OPTIK_ISCI_SAYISI or os.cpu_count() or 1
+            isci_sayisi = max(1, min(isci_sayisi, len(bekleyenler)))
+            if bekleyenler:
+                logger.info(f"{len(bekleyenler)} sayfa işleniyor ({isci_sayisi} işçi)...")
+
+            depodakiler = set(self.store.etiketler())
+            kaydedilecekler = [i for i, sonuc in enumerate(tum_sonuclar)
+                               if sonuc is not None and sayfa_etiketi(*sayfalar[i]) not in depodakiler]
 
-            tum_sonuclar = []
-            for dosya_yolu in dosya_yollari:
-                dosya_yolu = Path(dosya_yolu)
-                logger.info(f"İşleniyor: {dosya_yolu.name}")
-                sonuc = self.optik_formu_oku(dosya_yolu)
-                tum_sonuclar.append(sonuc)
+            self.hata_yazici.yeni_calisma()
+            bekleyen_sayfalar = [sayfalar[i] for i in bekleyenler]
+            for i, sonuc in zip(bekleyenler, self._formlari_oku(bekleyen_sayfalar, isci_sayisi)):
+                dosya_yolu, sayfa_no = sayfalar[i]
+                etiket = sayfa_etiketi(dosya_yolu, sayfa_no)
+                tum_sonuclar[i] = sonuc
 
                 if isinstance(sonuc, dict) and sonuc.get('islem_durumu') == 'başarılı':
                     ist = sonuc.get('istatistikler', {})
-                    logger.info(f"✓ Başarılı: {ist.get('dolu_cevaplar', 0)} dolu, {ist.get('bos_cevaplar', 0)} boş")
+                    logger.info(f"✓ {etiket}: {ist.get('dolu_cevaplar', 0)} dolu, {ist.get('bos_cevaplar', 0)} boş")
+                    manifest.kaydet(dosya_yolu, esikler, sonuc, sayfa_no=sayfa_no)
+                    kaydedilecekler.append(i)
                 else:
                     hata = (sonuc or {}).get('hata_mesaji', 'Bilinmeyen hata')
-                    logger.info(f"✗ Hata: {hata}")
+                    logger.info(f"✗ {etiket}: {hata}")
 
+            self.sonuclari_kaydet([tum_sonuclar[i] for i in sorted(kaydedilecekler)])
             basarili_sayisi = len([s for s in tum_sonuclar if isinstance(s, dict) and s.get('islem_durumu') == 'başarılı'])
+            self.hata_yazici.kapat()
             logger.info(f"İşlem tamamlandı: {basarili_sayisi} başarılı")
             return tum_sonuclar
         except Exception as e:
             logger.error(f"process_all_forms sırasında beklenmeyen hata: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def havuz_olustur(self, isci_sayisi):
+        """Her işçisinde bu işlemcinin bir kopyası kurulu süreç havuzu döndürür.
+
+        Havuza _isci_formu_oku ile iş gönderilir. Hata ayıklama görüntüsü
+        sınırı işçiler arasında bölünür; toplam sınır tek süreçteki ile aynı kalır.
+        """
+        hata_ayiklama_siniri = max(1, self.hata_yazici.maks_dosya // isci_sayisi)
+        return ProcessPoolExecutor(max_workers=isci_sayisi, initializer=_isci_baslat,
+                                   initargs=(self, hata_ayiklama_siniri))
+
+    def _formlari_oku(self, sayfalar, isci_sayisi):
+        """(dosya, sayfa) birimlerini sırayı koruyarak okur; her sayfanın hatası kendi sonucuna yazılır"""
+        if isci_sayisi <= 1:
+            for dosya_yolu, sayfa_no in sayfalar:
+                yield self.optik_formu_oku(dosya_yolu, sayfa_no)
+            return
+
+        with self.havuz_olustur(isci_sayisi) as havuz:
+            gelecekler = [havuz.submit(_isci_formu_oku, dosya_yolu, sayfa_no) for dosya_yolu, sayfa_no in sayfalar]
+            for (dosya_yolu, sayfa_no), gelecek in zip(sayfalar, gelecekler):
+                try:
+                    yield gelecek.result()
+                except Exception as e:
+                    logger.error(f"{sayfa_etiketi(dosya_yolu, sayfa_no)} işçi sürecinde işlenemedi: {e}")
+                    sonuc = {
+                        'dosya_adi': dosya_yolu.name,
+                        'islem_durumu': 'hata',
+                        'hata_mesaji': str(e)
+                    }
+                    if sayfa_no is not None:
+                        sonuc['sayfa_no'] = sayfa_no
+                    yield sonuc
@@ -0,0 +1,150 @@
+import os
+import time
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from config import settings
+from utils.logger import logger
+from core.optik_manifest import OptikManifest
+from core.optik_processor import OptikProcessor, _isci_formu_oku
+from utils.image_processor import RESIM_UZANTILARI, sayfalari_listele, sayfa_etiketi
+
+
+class OptikWatcher:
+    """optik_cevaplar dizinini izleyip yeni taramaları geldikçe işleyen servis.
+
+    Tarayıcı iş parçacığı dizini belirli aralıklarla yoklar. Boyutu ve
+    değiştirilme zamanı IZLEME_BEKLEME_SURESI boyunca sabit kalan dosyaları
+    (yazımı bitmiş taramaları) sayfalarına açıp sınırlı bir kuyruğa koyar. Ana
+    döngü kuyruktaki sayfaları süreç havuzuna gönderir. Biten her formun
+    sonucu sonuç deposuna eklenir, manifeste işlenir ve isteğe bağlı
+    sonuc_callback ile bildirilir. Manifest hem tarayıcı iş parçacığından hem
+    havuzun tamamlanma geri çağrılarından kullanıldığından tüm erişimler ve
+    sayaçlar tek bir kilitle korunur.
+    """
+
+    def __init__(self, optik_processor: OptikProcessor, dizin: Optional[Path] = None,
+                 isci_sayisi: Optional[int] = None,
+                 sonuc_callback: Optional[Callable[[Path, Dict], None]] = None):
+        self.processor = optik_processor
+        self.dizin = Path(dizin or settings.OPTIK_CEVAPLAR_DIR)
+        self.isci_sayisi = isci_sayisi or settings.OPTIK_ISCI_SAYISI or os.cpu_count() or 1
+        self.sonuc_callback = sonuc_callback
+        self.yoklama_araligi = settings.IZLEME_YOKLAMA_ARALIGI
+        self.bekleme_suresi = settings.IZLEME_BEKLEME_SURESI
+
+        self.manifest = OptikManifest(settings.OPTIK_MANIFEST_PATH)
+        self.esikler = self.processor.engine.yapilandirma_anahtari()
+        self._kuyruk = queue.Queue(maxsize=settings.IZLEME_KUYRUK_BOYUTU)
+        self._yuvalar = threading.BoundedSemaphore(self.isci_sayisi * 2)
+        self._dur = threading.Event()
+        self._kilit = threading.Lock()  # manifest ve sayaçlar
+        self._adaylar = {}   # yol -> (boyut, mtime)
+        self._gorulenler = {}  # yol -> (boyut, mtime); kuyruğa alınmış veya işlenmiş
+        self.islenen = 0
+        self.hatali = 0
+
+    def durdur(self):
+        self._dur.set()
+
+    def calistir(self):
+        """İzlemeyi başlatır; durdur() çağrılana veya Ctrl+C'ye kadar bloklar"""
+        self.dizin.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Optik klasör izleniyor: {self.dizin} ({self.isci_sayisi} işçi)")
+
+        tarayici = threading.Thread(target=self._tara, name="optik-tarayici", daemon=True)
+        tarayici.start()
+        self.processor.hata_yazici.yeni_calisma()
+        try:
+            with self.processor.havuz_olustur(self.isci_sayisi) as havuz:
+                while not self._dur.is_set():
+                    try:
+                        dosya_yolu, sayfa_no = self._kuyruk.get(timeout=self.yoklama_araligi)
+                    except queue.Empty:
+                        continue
+                    self._yuvalar.acquire()
+                    gelecek = havuz.submit(_isci_formu_oku, dosya_yolu, sayfa_no)
+                    gelecek.add_done_callback(
+                        lambda g, yol=dosya_yolu, sayfa=sayfa_no: self._tamamlandi(yol, sayfa, g)
+                    )
+        except KeyboardInterrupt:
+            logger.info("İzleme durduruluyor...")
+        finally:
+            self._dur.set()
+            tarayici.join()
+            self.processor.hata_yazici.kapat()
+            logger.info(f"İzleme sona erdi: {self.islenen} form işlendi, {self.hatali} hatalı")
+
+    def _tara(self):
+        while not self._dur.is_set():
+            try:
+                for sayfa in self._hazir_sayfalar():
+                    while not self._dur.is_set():
+                        try:
+                            self._kuyruk.put(sayfa, timeout=self.yoklama_araligi)
+                            break
+                        except queue.Full:
+                            continue
+            except Exception as e:
+                logger.error(f"Optik klasör taranırken hata: {e}")
+            self._dur.wait(self.yoklama_araligi)
+
+    def _hazir_sayfalar(self):
+        """Yazımı tamamlanmış taramaların henüz işlenmemiş (dosya, sayfa) birimlerini döndürür"""
+        simdi = time.time()
+        for dosya_yolu in sorted(self.dizin.iterdir()):
+            if dosya_yolu.suffix.lower() not in RESIM_UZANTILARI:
+                continue
+            try:
+                durum = dosya_yolu.stat()
+            except OSError:
+                continue
+            imza = (durum.st_size, durum.st_mtime)
+            if self._gorulenler.get(dosya_yolu) == imza:
+                continue
+
+            # Dosya hâlâ yazılıyorsa bir sonraki yoklamayı bekle
+            if self._adaylar.get(dosya_yolu) != imza or simdi - durum.st_mtime < self.bekleme_suresi:
+                self._adaylar[dosya_yolu] = imza
+                continue
+            self._adaylar.pop(dosya_yolu, None)
+            self._gorulenler[dosya_yolu] = imza
+
+            for _, sayfa_no in sayfalari_listele([dosya_yolu]):
+                with self._kilit:
+                    onceki = self.manifest.gecerli_sonuc(dosya_yolu, self.esikler, sayfa_no)
+                if onceki is None:
+                    yield dosya_yolu, sayfa_no
+
+    def _tamamlandi(self, dosya_yolu: Path, sayfa_no: Optional[int], gelecek):
+        self._yuvalar.release()
+        etiket = sayfa_etiketi(dosya_yolu, sayfa_no)
+        try:
+            sonuc = gelecek.result()
+        except Exception as e:
+            sonuc = {
+                'dosya_adi': dosya_yolu.name,
+                'islem_durumu': 'hata',
+                'hata_mesaji': str(e)
+            }
+            if sayfa_no is not None:
+                sonuc['sayfa_no'] = sayfa_no
+
+        if sonuc.get('islem_durumu') == 'başarılı':
+            with self._kilit:
+                self.islenen += 1
+                self.manifest.kaydet(dosya_yolu, self.esikler, sonuc, sayfa_no=sayfa_no)
+            self.processor.store.formlari_ekle([sonuc])
+            ist = sonuc.get('istatistikler', {})
+            logger.info(f"✓ {etiket}: {ist.get('dolu_cevaplar', 0)} dolu, {ist.get('bos_cevaplar', 0)} boş")
+        else:
+            with self._kilit:
+                self.hatali += 1
+            logger.info(f"✗ {etiket}: {sonuc.get('hata_mesaji', 'Bilinmeyen hata')}")
+
+        if self.sonuc_callback:
+            try:
+                self.sonuc_callback(dosya_yolu, sonuc)
+            except Exception as e:
+                logger.error(f"Sonuç bildirimi başarısız ({dosya_yolu.name}): {e}")
@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+from config import settings
+from utils.logger import logger
+from utils.file_utils import load_csv_file
+from models.answer_matrix import HISSIYATLAR, HISSIYAT_KODLARI
+from models.result import DURUMLAR, ZORLUK_SEVIYELERI
+
+JOKER = ("*", "any")
+
+# tavsiyeler.csv bulunamazsa kullanılan kurallar; ilk eşleşen kural geçerlidir
+VARSAYILAN_KURALLAR = [
+    ("Boş", "*", "{tema} konusunu tekrar gözden geçirmeniz önerilir."),
+    ("*", "anlamadım", "{tema} konusunda temel eksiğiniz var. Öğretmeninizle görüşmeniz faydalı olacaktır."),
+    ("Yanlış", "*", "{tema} konusunda yanlış anlaşılmalar var. Konuyu tekrar çalışmanız önerilir."),
+    ("Doğru", "çok kolay", "{tema} konusunu mükemmel anlamışsınız! Bir sonraki konuya geçebilirsiniz."),
+    ("Doğru", "kolay", "{tema} konusunu iyi anlamışsınız. Pratik yapmaya devam edin."),
+    ("Doğru", "orta", "{tema} konusunu anlamışsınız. Daha fazla pratik yaparak pekiştirebilirsiniz."),
+    ("Doğru", "zor", "{tema} konusunu anlamışsınız ancak zorlandınız. Ek çalışma faydalı olacaktır."),
+    ("Doğru", "çok zor", "{tema} konusunu anlamışsınız ama çok zorlandınız. Öğretmeninizden destek alabilirsiniz."),
+    ("*", "*", "{tema} konusunda ortalama performans gösterdiniz. Pratik yapmaya devam edin."),
+]
+
+# IRT kalibrasyonu açıkken (durum, zorluk seviyesi) kuralları; zorluk, soru güçlüğü ile
+# öğrenci yeteneği farkından gelir. Kuralı olmayan durumlarda yukarıdaki tavsiye geçerlidir.
+VARSAYILAN_IRT_KURALLARI = [
+    ("Doğru", "Zor", "{tema} konusunda seviyenizin üzerindeki bir soruyu doğru cevapladınız. İleri düzey sorularla devam edebilirsiniz."),
+    ("Yanlış", "Kolay", "{tema} konusunda seviyenize göre kolay bir soruyu kaçırdınız. Dikkat hatası olabilir; soruyu tekrar inceleyin."),
+    ("Boş", "Kolay", "{tema} konusunda seviyenize göre kolay bir soruyu boş bıraktınız. Konuyu kısa bir tekrarla pekiştirin."),
+    ("Yanlış", "Zor", "{tema} konusu şu anki seviyenizin üzerinde. Önce temel kazanımları pekiştirip sonra bu konuya dönün."),
+]
+
+
+class RecommendationTable:
+    """(durum, hissiyat) -> tavsiye şablonu arama tablosu.
+
+    Kurallar bir kez derlenir: tablo[durum_kodu, hissiyat_kodu] şablon
+    numarasını verir. Şablonlar {tema} yer tutucusu içerir ve yalnızca
+    raporlama sırasında konu adıyla doldurulur; toplu analiz yalnızca
+    şablon numaralarını saklar. irt_tablosu[durum_kodu, zorluk_kodu] IRT
+    kalibrasyonu açıkken tablo yerine kullanılan şablonu verir (-1: kural yok).
+    """
+
+    def __init__(self, kurallar: List[Tuple[str, str, str]],
+                 irt_kurallari: Optional[List[Tuple[str, str, str]]] = None):
+        self.sablonlar: Tuple[str, ...] = ()
+        self.tablo = np.full((len(DURUMLAR), len(HISSIYATLAR)), -1, dtype=np.int16)
+        self.irt_tablosu = np.full((len(DURUMLAR), len(ZORLUK_SEVIYELERI)), -1, dtype=np.int16)
+        self._derle(kurallar)
+        self._irt_derle(VARSAYILAN_IRT_KURALLARI if irt_kurallari is None else irt_kurallari)
+
+    @classmethod
+    def yukle(cls, dosya_yolu: Optional[Path] = None) -> "RecommendationTable":
+        """Kuralları CSV dosyasından (Durum, Hissiyat, Tavsiye sütunları) yükler.
+
+        İsteğe bağlı Zorluk sütunu dolu olan satırlar IRT kurallarıdır (Durum,
+        Zorluk, Tavsiye); dosyada IRT kuralı yoksa varsayılanlar kullanılır.
+        """
+        dosya_yolu = Path(dosya_yolu or settings.TAVSIYELER_PATH)
+        if dosya_yolu.exists():
+            df = load_csv_file(dosya_yolu)
+            if {'Durum', 'Hissiyat', 'Tavsiye'}.issubset(df.columns):
+                zorluklar = df['Zorluk'] if 'Zorluk' in df.columns else [None] * len(df)
+                kurallar, irt_kurallari = [], []
+                for d, h, z, t in zip(df['Durum'], df['Hissiyat'], zorluklar, df['Tavsiye']):
+                    if isinstance(z, str) and z.strip():
+                        irt_kurallari.append((str(d).strip(), z.strip().capitalize(), str(t).strip()))
+                    else:
+                        kurallar.append((str(d).strip(), str(h).strip().lower(), str(t).strip()))
+                return cls(kurallar, irt_kurallari or None)
+            logger.warning(f"Tavsiye dosyası sütunları hatalı, varsayılan kurallar kullanılıyor: {dosya_yolu}")
+        return cls(VARSAYILAN_KURALLAR)
+
+    def _derle(self, kurallar: List[Tuple[str, str, str]]):
+        sablonlar = []
+        for durum, hissiyat, sablon in kurallar:
+            if durum not in DURUMLAR and durum not in JOKER:
+                logger.warning(f"Tavsiye kuralında bilinmeyen durum atlandı: {durum}")
+                continue
+            if hissiyat not in HISSIYAT_KODLARI and hissiyat not in JOKER:
+                logger.warning(f"Tavsiye kuralında bilinmeyen hissiyat atlandı: {hissiyat}")
+                continue
+            satirlar = slice(None) if durum in JOKER else DURUMLAR.index(durum)
+            sutunlar = slice(None) if hissiyat in JOKER else HISSIYAT_KODLARI[hissiyat]
+            # Önceki kuralların doldurduğu hücreler korunur (ilk eşleşen kural)
+            maske = np.zeros(self.tablo.shape, dtype=bool)
+            maske[satirlar, sutunlar] = True
+            maske &= self.tablo == -1
+            if np.any(maske):
+                self.tablo[maske] = len(sablonlar)
+                sablonlar.append(sablon)
+
+        if np.any(self.tablo == -1):
+            # Hiçbir kurala uymayan durumlar için son çare şablonu
+            self.tablo[self.tablo == -1] = len(sablonlar)
+            sablonlar.append(VARSAYILAN_KURALLAR[-1][2])
+        self.sablonlar = tuple(sablonlar)
+
+    def _irt_derle(self, kurallar: List[Tuple[str, str, str]]):
+        sablonlar = list(self.sablonlar)
+        for durum, zorluk, sablon in kurallar:
+            if durum not in DURUMLAR or zorluk not in ZORLUK_SEVIYELERI:
+                logger.warning(f"IRT tavsiye kuralında bilinmeyen durum veya zorluk atlandı: {durum}, {zorluk}")
+                continue
+            hucre = DURUMLAR.index(durum), ZORLUK_SEVIYELERI.index(zorluk)
+            if self.irt_tablosu[hucre] == -1:
+                self.irt_tablosu[hucre] = len(sablonlar)
+                sablonlar.append(sablon)
+        self.sablonlar = tuple(sablonlar)
+
+    def sablon_no(self, durum: str, hissiyat: str) -> int:
+        return int(self.tablo[DURUMLAR.index(durum), HISSIYAT_KODLARI.get(hissiyat, HISSIYAT_KODLARI["belirsiz"])])
+
+    def irt_uygula(self, tavsiye: np.ndarray, durum: np.ndarray, zorluk: np.ndarray) -> np.ndarray:
+        """IRT zorluk seviyesine göre kuralı olan hücrelerde şablon numarasını değiştirir"""
+        irt = self.irt_tablosu[durum, zorluk]
+        return np.where(irt >= 0, irt, tavsiye)
+
+    def olustur(self, sablon_no: int, tema: str) -> str:
+        """Şablonu konu adıyla doldurur"""
+        return self.sablonlar[sablon_no].replace("{tema}", tema)
@@ -0,0 +1,127 @@
+import gzip
+import json
+from typing import Dict, List, Optional, Union
+from config import settings
+from utils.logger import logger
+from models.result import AnalysisResult
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+KODLAYICILAR = ("json", "orjson")
+# Kompakt rapor şemasının sürümü; bu anahtarı taşımayan veriler tam (eski) biçimdedir
+SEMA_SURUMU = 2
+
+# Soruya ait alanlar katalogda bir kez, öğrenciye ait alanlar raporda sütun olarak tutulur
+_SORU_ALANLARI = ("dogru_cevap", "tema_adi", "ogrenme_ciktisi", "ogrenme_baglantisi")
+_OGRENCI_ALANLARI = ("soru_no", "ogrenci_cevap", "durum", "hissiyat", "zorluk_seviyesi", "guven_endeksi")
+_GZIP_IMZASI = b"\x1f\x8b"
+_orjson_uyarildi = False
+
+
+class ReportCatalog:
+    """Bir rapor çalışmasının soru metinleri ve tavsiyeleri.
+
+    Kompakt raporlar soru metinlerine soru_no ile, tavsiyelere tavsiyeler
+    listesindeki indeksle bağlanır; katalog çalışma başına bir kez saklanır.
+    """
+
+    def __init__(self, sorular: Optional[Dict[str, Dict]] = None, tavsiyeler: Optional[List[str]] = None):
+        self.sorular = sorular or {}
+        self.tavsiyeler = tavsiyeler or []
+        self._tavsiye_indeksi = {tavsiye: i for i, tavsiye in enumerate(self.tavsiyeler)}
+
+    def to_dict(self) -> Dict:
+        return {'sorular': self.sorular, 'tavsiyeler': self.tavsiyeler}
+
+    @classmethod
+    def from_dict(cls, veri: Dict) -> "ReportCatalog":
+        return cls(veri.get('sorular'), veri.get('tavsiyeler'))
+
+    def sikistir(self, report_data: Dict) -> Dict:
+        """Tam rapor verisini kompakt şemaya çevirir.
+
+        Aynı soru_no'ya farklı soru metni düşerse (farklı sınavların raporları
+        aynı çalışmada) rapor tam biçimiyle bırakılır; katalog yalnızca rapor
+        sıkıştırıldığında güncellenir.
+        """
+        sonuclar = report_data['analiz_sonuclari']
+        yeni_sorular = {}
+        for sonuc in sonuclar:
+            soru = {alan: sonuc.get(alan) for alan in _SORU_ALANLARI}
+            soru_no = str(sonuc['soru_no'])
+            if (self.sorular.get(soru_no) or yeni_sorular.setdefault(soru_no, soru)) != soru:
+                return report_data
+        self.sorular.update(yeni_sorular)
+
+        sutunlar = {alan: [sonuc.get(alan) for sonuc in sonuclar] for alan in _OGRENCI_ALANLARI}
+        sutunlar['tavsiye'] = [self._tavsiye_kodu(sonuc.get('tavsiye')) for sonuc in sonuclar]
+        return {
+            'sema': SEMA_SURUMU,
+            'ogrenci_bilgileri': report_data['ogrenci_bilgileri'],
+            'genel_istatistikler': report_data['genel_istatistikler'],
+            'sonuclar': sutunlar
+        }
+
+    def genislet(self, veri: Dict) -> Dict:
+        """Kompakt rapor verisini tam biçime (AnalysisResult.to_dict satırları) geri çevirir"""
+        if veri.get('sema') != SEMA_SURUMU:
+            return veri
+        sutunlar = veri['sonuclar']
+        sonuclar = []
+        for i, soru_no in enumerate(sutunlar['soru_no']):
+            satir = dict(self.sorular.get(str(soru_no), {}))
+            satir.update({alan: sutunlar[alan][i] for alan in _OGRENCI_ALANLARI})
+            kod = sutunlar['tavsiye'][i]
+            satir['tavsiye'] = None if kod is None else self.tavsiyeler[kod]
+            sonuclar.append({alan: satir.get(alan) for alan in AnalysisResult.__slots__})
+        return {
+            'ogrenci_bilgileri': veri['ogrenci_bilgileri'],
+            'analiz_sonuclari': sonuclar,
+            'genel_istatistikler': veri['genel_istatistikler']
+        }
+
+    def _tavsiye_kodu(self, tavsiye: Optional[str]) -> Optional[int]:
+        if tavsiye is None:
+            return None
+        kod = self._tavsiye_indeksi.get(tavsiye)
+        if kod is None:
+            kod = self._tavsiye_indeksi[tavsiye] = len(self.tavsiyeler)
+            self.tavsiyeler.append(tavsiye)
+        return kod
+
+
+def kodla(veri: Dict, kodlayici: Optional[str] = None, gzip_seviyesi: Optional[int] = None) -> bytes:
+    """Rapor verisini boşluksuz JSON olarak kodlar; gzip_seviyesi > 0 ise sıkıştırır.
+
+    kodlayici "json" (standart kütüphane) veya "orjson"dur; orjson kurulu
+    değilse standart kütüphaneye dönülür. Verilmeyen değerler
+    settings.RAPOR_KODLAYICI ve settings.RAPOR_GZIP_SEVIYESI'nden alınır.
+    """
+    kodlayici = kodlayici or settings.RAPOR_KODLAYICI
+    if kodlayici not in KODLAYICILAR:
+        raise ValueError(f"Bilinmeyen rapor kodlayıcısı: {kodlayici} (seçenekler: {', '.join(KODLAYICILAR)})")
+    if gzip_seviyesi is None:
+        gzip_seviyesi = settings.RAPOR_GZIP_SEVIYESI
+
+    global _orjson_uyarildi
+    if kodlayici == "orjson" and orjson is not None:
+        ham = orjson.dumps(veri, default=str)
+    else:
+        if kodlayici == "orjson" and not _orjson_uyarildi:
+            logger.warning("orjson bulunamadı, standart json kodlayıcısı kullanılıyor. 'pip install orjson' ile yükleyin.")
+            _orjson_uyarildi = True
+        ham = json.dumps(veri, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    # mtime=0: aynı veri her zaman aynı baytlara kodlanır
+    return gzip.compress(ham, compresslevel=gzip_seviyesi, mtime=0) if gzip_seviyesi else ham
+
+
+def coz(ham: Union[bytes, str]) -> Dict:
+    """kodla() çıktısını veya eski (girintili, sıkıştırılmamış) JSON metnini çözer"""
+    if isinstance(ham, str):
+        return json.loads(ham)
+    if ham[:2] == _GZIP_IMZASI:
+        ham = gzip.decompress(ham)
+    return orjson.loads(ham) if orjson is not None else json.loads(ham)
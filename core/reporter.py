@@ -1,49 +1,265 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from config import settings
 from utils.logger import logger
 from models.student import Student
-from models.result import AnalysisResult
+from models.answer_matrix import AnswerMatrix
+from models.result import AnalysisResult, AnalysisBatch
+from core.result_store import ResultStore
+from core.html_renderer import HTMLReportRenderer
+from core.report_format import ReportCatalog
+
+# İşçi süreçlerinde kullanılan Reporter ve toplu analiz (süreç başına bir kez kurulur)
+_isci_durumu = None
+# Bir işçiye tek seferde gönderilen öğrenci sayısı (süreçler arası iletişim yükünü azaltır)
+_PARCA_BOYUTU = 16
+
+
+def _isci_baslat(reporter, matris, analiz):
+    global _isci_durumu
+    _isci_durumu = (reporter, matris, analiz)
+
+
+def _isci_raporlari(indeksler):
+    reporter, matris, analiz = _isci_durumu
+    return [_ogrenci_raporu(reporter, matris, analiz, i) for i in indeksler]
+
+
+def _ogrenci_raporu(reporter, matris, analiz, i):
+    """i. öğrencinin raporunu yazar; (i, öğrenci, html_path, rapor verisi) döndürür"""
+    student = matris.ogrenci(i)
+    report_data = reporter._rapor_verisi(student, analiz.sonuclar(i))
+    return i, student, reporter._rapor_yaz(student, report_data), report_data
+
 
 class Reporter:
     def __init__(self):
         self.reports_dir = settings.RAPORLAR_DIR
         self.reports_dir.mkdir(exist_ok=True)
+        self.store = ResultStore()
+        # Şablon bir kez derlenir; raporlar ortak stil sayfasına bağlanır
+        self.renderer = HTMLReportRenderer()
+        self.renderer.stil_sayfasini_kopyala(self.reports_dir)
+        # Rapor verileri depoya raporlari_kaydet() ile toplu yazılır
+        self._bekleyen_raporlar = []
         
+    def __getstate__(self):
+        # İşçi süreçlerine bekleyen depo kayıtları gönderilmez
+        durum = self.__dict__.copy()
+        durum['_bekleyen_raporlar'] = []
+        return durum
+
     def create_student_report(self, student: Student, analysis_results: List[AnalysisResult]) -> Path:
         """Öğrenci için detaylı rapor oluşturur"""
         try:
-            # Rapor verilerini hazırla
-            report_data = {
-                'ogrenci_bilgileri': {
-                    'okul_no': student.okul_no,
-                    'ad_soyad': student.ad_soyad,
-                    'sinif_sube': student.sinif_sube,
-                    'tarih': pd.Timestamp.now().strftime('%d/%m/%Y %H:%M')
-                },
-                'analiz_sonuclari': [result.__dict__ for result in analysis_results],
-                'genel_istatistikler': self._calculate_general_statistics(analysis_results)
-            }
-            
-            # JSON raporu oluştur
-            json_filename = f"rapor_{student.okul_no}_{student.ad_soyad.replace(' ', '_')}.json"
-            json_path = self.reports_dir / json_filename
-            from utils.file_utils import save_json_report
-            save_json_report(json_path, report_data)
+            report_data = self._rapor_verisi(student, analysis_results)
+            html_path = self._rapor_yaz(student, report_data)
+            if html_path:
+                self._bekleyen_raporlar.append(self._rapor_kaydi(student, html_path, report_data))
+            return html_path
             
-            # HTML raporu oluştur
+        except Exception as e:
+            logger.error(f"Rapor oluşturma hatası: {e}")
+            return None
+
+    def create_student_reports(self, matris: AnswerMatrix, analiz: AnalysisBatch,
+                               isci_sayisi: Optional[int] = None,
+                               ilerleme: Optional[Callable[[int, int, Student, Optional[Path]], None]] = None,
+                               yeniden_olustur: bool = False) -> int:
+        """Tüm öğrencilerin raporlarını oluşturur; güncel rapor sayısını döndürür.
+
+        Her öğrencinin rapor girdilerinden bir parmak izi hesaplanır; depodaki
+        son raporu aynı parmak izine sahip ve HTML dosyası duran öğrenciler
+        atlanır (yeniden_olustur=True ise hepsi yeniden üretilir). Kalan
+        raporlar için rapor verisinin hazırlanması ve HTML yazımı işçi
+        süreçlerine öğrenci parçaları hâlinde dağıtılır; aynı anda bekleyen
+        parça sayısı işçi sayısıyla sınırlıdır. isci_sayisi verilmezse
+        settings.RAPOR_ISCI_SAYISI kullanılır; 1'de raporlar bu süreçte
+        sırayla yazılır. ilerleme verilirse üretilen her rapordan sonra
+        (tamamlanan, toplam, öğrenci, html_path) ile çağıran iş parçacığında
+        çağrılır; başarısız raporlarda html_path None'dır. Depo kayıtları
+        öğrenci sırasıyla bekletilir.
+        """
+        parmak_izleri = self._parmak_izleri(analiz)
+        indeksler = list(range(len(analiz)))
+        if not yeniden_olustur:
+            indeksler = self._degisenler(analiz, parmak_izleri)
+        atlanan = len(analiz) - len(indeksler)
+
+        toplam = len(indeksler)
+        if isci_sayisi is None:
+            isci_sayisi = settings.RAPOR_ISCI_SAYISI or os.cpu_count() or 1
+        isci_sayisi = max(1, min(isci_sayisi, toplam or 1))
+
+        kayitlar = [None] * len(analiz)
+        tamamlanan = 0
+        for i, student, html_path, report_data in self._raporlari_yaz(matris, analiz, indeksler, isci_sayisi):
+            tamamlanan += 1
+            if html_path:
+                kayitlar[i] = self._rapor_kaydi(student, html_path, report_data, parmak_izleri[i])
+            if ilerleme:
+                try:
+                    ilerleme(tamamlanan, toplam, student, html_path)
+                except Exception as e:
+                    logger.error(f"İlerleme bildirimi hatası: {e}")
+
+        self._bekleyen_raporlar.extend(kayit for kayit in kayitlar if kayit)
+        basarili = sum(1 for kayit in kayitlar if kayit)
+        logger.info(f"{basarili}/{toplam} rapor oluşturuldu ({isci_sayisi} işçi), "
+                    f"{atlanan} rapor değişmediği için atlandı")
+        return basarili + atlanan
+
+    def _parmak_izleri(self, analiz: AnalysisBatch) -> List[str]:
+        """Öğrenci başına rapor girdilerinin SHA-1 özeti.
+
+        Ortak kısım soru bankası metinleri, tavsiye şablonları ve şablon
+        sürümüdür; öğrenci kısmı kimlik ile cevap, hissiyat ve analiz kodu
+        satırlarıdır (IRT veya tavsiye tablosu değişiklikleri de böylece
+        yakalanır).
+        """
+        ortak = hashlib.sha1(json.dumps([
+            self.renderer.surum, analiz.soru_nolari.tolist(), analiz.secenekler, analiz.dogru_cevaplar,
+            [analiz.temalar[k] for k in analiz.tema_kodlari.tolist()], analiz.ogrenme_ciktilari,
+            analiz.ogrenme_baglantilari, analiz.tavsiye_sablonlari
+        ], ensure_ascii=False).encode('utf-8'))
+        satirlar = (analiz.cevaplar, analiz.hissiyat, analiz.durum, analiz.guven_endeksi,
+                    analiz.zorluk_seviyesi, analiz.tavsiye)
+        kimlik = analiz.kimlik[['okul_no', 'ad_soyad', 'sinif_sube']].astype(str).itertuples(index=False)
+        izler = []
+        for i, (okul_no, ad_soyad, sinif_sube) in enumerate(kimlik):
+            h = ortak.copy()
+            h.update(f"{okul_no}\n{ad_soyad}\n{sinif_sube}\n".encode('utf-8'))
+            for satir in satirlar:
+                h.update(satir[i].tobytes())
+            izler.append(h.hexdigest())
+        return izler
+
+    def _degisenler(self, analiz: AnalysisBatch, parmak_izleri: List[str]) -> List[int]:
+        """Raporu yeniden üretilmesi gereken öğrencilerin indeksleri"""
+        try:
+            mevcut = self.store.rapor_parmak_izleri()
+        except Exception as e:
+            logger.warning(f"Rapor parmak izleri okunamadı, tüm raporlar üretilecek: {e}")
+            return list(range(len(analiz)))
+        degisenler = []
+        anahtarlar = zip(analiz.kimlik['sinif_sube'].astype(str), analiz.kimlik['okul_no'].astype(str))
+        for i, anahtar in enumerate(anahtarlar):
+            parmak_izi, html_yolu = mevcut.get(anahtar, (None, None))
+            if parmak_izi != parmak_izleri[i] or not html_yolu or not Path(html_yolu).exists():
+                degisenler.append(i)
+        return degisenler
+
+    def _raporlari_yaz(self, matris: AnswerMatrix, analiz: AnalysisBatch, indeksler: List[int], isci_sayisi: int):
+        """indeksler için (i, öğrenci, html_path, rapor verisi) demetlerini tamamlanma sırasıyla üretir"""
+        if isci_sayisi <= 1:
+            for i in indeksler:
+                try:
+                    sonuc = _ogrenci_raporu(self, matris, analiz, i)
+                except Exception as e:
+                    logger.error(f"{matris.kimlik['dosya'].iat[i]} için rapor oluşturulamadı: {e}")
+                    sonuc = (i, None, None, None)
+                yield sonuc
+            return
+
+        parcalar = (indeksler[bas:bas + _PARCA_BOYUTU] for bas in range(0, len(indeksler), _PARCA_BOYUTU))
+        with ProcessPoolExecutor(max_workers=isci_sayisi, initializer=_isci_baslat,
+                                 initargs=(self, matris, analiz)) as havuz:
+            sinir = isci_sayisi * settings.RAPOR_KUYRUK_CARPANI
+            bekleyenler = {havuz.submit(_isci_raporlari, parca): parca for parca in islice(parcalar, sinir)}
+            while bekleyenler:
+                bitenler, _ = wait(bekleyenler, return_when=FIRST_COMPLETED)
+                for gelecek in bitenler:
+                    parca = bekleyenler.pop(gelecek)
+                    try:
+                        yield from gelecek.result()
+                    except Exception as e:
+                        logger.error(f"{len(parca)} öğrencinin raporları oluşturulamadı: {e}")
+                        for i in parca:
+                            yield i, None, None, None
+                for parca in islice(parcalar, len(bitenler)):
+                    bekleyenler[havuz.submit(_isci_raporlari, parca)] = parca
+
+    def _rapor_verisi(self, student: Student, analysis_results: List[AnalysisResult]) -> Dict:
+        """Rapor şablonunun ve depo kaydının kullandığı rapor verisi"""
+        return {
+            'ogrenci_bilgileri': {
+                'okul_no': student.okul_no,
+                'ad_soyad': student.ad_soyad,
+                'sinif_sube': student.sinif_sube,
+                'tarih': pd.Timestamp.now().strftime('%d/%m/%Y %H:%M')
+            },
+            'analiz_sonuclari': [result.to_dict() for result in analysis_results],
+            'genel_istatistikler': self._calculate_general_statistics(analysis_results)
+        }
+
+    def _rapor_yaz(self, student: Student, report_data: Dict) -> Optional[Path]:
+        """HTML raporunu yazar; hata olursa None döndürür (işçi süreçlerinde de çağrılır)"""
+        try:
             html_filename = f"rapor_{student.okul_no}_{student.ad_soyad.replace(' ', '_')}.html"
             html_path = self.reports_dir / html_filename
-            self._create_html_report(html_path, report_data)
-            
+            self.renderer.yaz(html_path, report_data)
             logger.info(f"{student.ad_soyad} için rapor oluşturuldu: {html_path}")
             return html_path
-            
         except Exception as e:
-            logger.error(f"Rapor oluşturma hatası: {e}")
+            logger.error(f"{student.ad_soyad} için rapor oluşturma hatası: {e}")
             return None
+
+    @staticmethod
+    def _rapor_kaydi(student: Student, html_path: Path, report_data: Dict,
+                     parmak_izi: Optional[str] = None) -> Dict:
+        # Rapor verisi sonuç deposuna yazılmak üzere bekletilir
+        return {
+            'okul_no': student.okul_no,
+            'ad_soyad': student.ad_soyad,
+            'sinif_sube': student.sinif_sube,
+            'html_yolu': html_path,
+            'veri': report_data,
+            'parmak_izi': parmak_izi
+        }
             
+    def raporlari_kaydet(self) -> int:
+        """Bekleyen rapor verilerini sonuç deposuna tek çalışma olarak yazar"""
+        raporlar, self._bekleyen_raporlar = self._bekleyen_raporlar, []
+        try:
+            # Soru metinleri ve tavsiyeler çalışma kataloğuna bir kez yazılır; raporlar soru_no ile bağlanır
+            katalog = ReportCatalog()
+            for rapor in raporlar:
+                rapor['veri'] = katalog.sikistir(rapor['veri'])
+            self.store.raporlari_ekle(raporlar, katalog)
+            return len(raporlar)
+        except Exception as e:
+            logger.error(f"Rapor verileri depoya yazılamadı: {e}")
+            return 0
+
+    def analizleri_kaydet(self, analiz: AnalysisBatch):
+        """Toplu analiz sonuçlarını sonuç deposuna yazar"""
+        try:
+            self.store.analizleri_ekle(analiz)
+        except Exception as e:
+            logger.error(f"Analiz sonuçları depoya yazılamadı: {e}")
+
+    def create_class_summary(self, ozetler: Dict) -> Path:
+        """AggregateEngine sınıf ve okul özetlerini JSON olarak kaydeder"""
+        try:
+            ozet_path = self.reports_dir / "sinif_ozetleri.json"
+            from utils.file_utils import save_json_report
+            save_json_report(ozet_path, {
+                'tarih': pd.Timestamp.now().strftime('%d/%m/%Y %H:%M'),
+                **ozetler
+            })
+            logger.info(f"Sınıf özetleri oluşturuldu: {ozet_path}")
+            return ozet_path
+
+        except Exception as e:
+            logger.error(f"Sınıf özeti oluşturma hatası: {e}")
+            return None
+
     def _calculate_general_statistics(self, results: List[AnalysisResult]) -> Dict:
         """Genel istatistikleri hesaplar"""
         total = len(results)
@@ -63,7 +279,7 @@ class Reporter:
                 tema_basarisi[tema]['dogru'] += 1
                 
         # Ortalama güven endeksi
-        guven_endeksleri = [r.guven_endeksi for r in results if hasattr(r, 'guven_endeksi') and r.guven_endeksi is not None]
+        guven_endeksleri = [r.guven_endeksi for r in results if r.guven_endeksi is not None]
         ortalama_guven = sum(guven_endeksleri) / len(guven_endeksleri) if guven_endeksleri else 0
         
         return {
@@ -75,117 +291,3 @@ class Reporter:
             'tema_basarisi': tema_basarisi,
             'ortalama_guven_endeksi': ortalama_guven
         }
-        
-    def _create_html_report(self, file_path: Path, report_data: Dict):
-        """HTML raporu oluşturur"""
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="tr">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Tam Öğrenme Raporu - {report_data['ogrenci_bilgileri']['ad_soyad']}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .header {{ background-color: #f8f9fa; padding: 20px; border-radius: 5px; }}
-                .summary {{ margin: 20px 0; }}
-                .table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-                .table th, .table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                .table th {{ background-color: #f2f2f2; }}
-                .correct {{ background-color: #d4edda; }}
-                .wrong {{ background-color: #f8d7da; }}
-                .empty {{ background-color: #fff3cd; }}
-                .tema-stats {{ margin: 15px 0; }}
-                .progress-bar {{ background-color: #e9ecef; border-radius: 5px; height: 20px; }}
-                .progress {{ background-color: #007bff; height: 100%; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Tam Öğrenme Analiz Raporu</h1>
-                <p><strong>Öğrenci:</strong> {report_data['ogrenci_bilgileri']['ad_soyad']}</p>
-                <p><strong>Okul No:</strong> {report_data['ogrenci_bilgileri']['okul_no']}</p>
-                <p><strong>Sınıf/Şube:</strong> {report_data['ogrenci_bilgileri']['sinif_sube']}</p>
-                <p><strong>Tarih:</strong> {report_data['ogrenci_bilgileri']['tarih']}</p>
-            </div>
-            
-            <div class="summary">
-                <h2>Genel Performans Özeti</h2>
-                <p><strong>Toplam Soru:</strong> {report_data['genel_istatistikler']['toplam_soru']}</p>
-                <p><strong>Doğru Sayısı:</strong> {report_data['genel_istatistikler']['dogru_sayisi']}</p>
-                <p><strong>Yanlış Sayısı:</strong> {report_data['genel_istatistikler']['yanlis_sayisi']}</p>
-                <p><strong>Boş Sayısı:</strong> {report_data['genel_istatistikler']['bos_sayisi']}</p>
-                <p><strong>Başarı Oranı:</strong> {report_data['genel_istatistikler']['basari_orani']:.2f}%</p>
-                <p><strong>Ortalama Güven Endeksi:</strong> {report_data['genel_istatistikler']['ortalama_guven_endeksi']:.2f}</p>
-            </div>
-            
-            <h2>Tema Bazlı Performans</h2>
-            {"".join([self._create_tema_html(tema, stats) for tema, stats in report_data['genel_istatistikler']['tema_basarisi'].items()])}
-            
-            <h2>Detaylı Soru Analizi</h2>
-            <table class="table">
-                <thead>
-                    <tr>
-                        <th>Soru No</th>
-                        <th>Durum</th>
-                        <th>Tema</th>
-                        <th>Hissiyat</th>
-                        <th>Güven</th>
-                        <th>Zorluk</th>
-                        <th>Tavsiye</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {"".join([self._create_question_row_html(result) for result in report_data['analiz_sonuclari']])}
-                </tbody>
-            </table>
-        </body>
-        </html>
-        """
-        
-        from utils.file_utils import save_html_report
-        save_html_report(file_path, html_content)
-        
-    def _create_tema_html(self, tema: str, stats: Dict) -> str:
-        """Tema istatistikleri için HTML oluşturur"""
-        basari_orani = (stats['dogru'] / stats['toplam']) * 100 if stats['toplam'] > 0 else 0
-        return f"""
-        <div class="tema-stats">
-            <h3>{tema}</h3>
-            <p>Doğru: {stats['dogru']}/{stats['toplam']} ({basari_orani:.1f}%)</p>
-            <div class="progress-bar">
-                <div class="progress" style="width: {basari_orani}%"></div>
-            </div>
-        </div>
-        """
-        
-    def _create_question_row_html(self, result: Dict) -> str:
-        """Soru analizi için tablo satırı oluşturur"""
-        row_class = ""
-        if result['durum'] == "Doğru":
-            row_class = "correct"
-        elif result['durum'] == "Yanlış":
-            row_class = "wrong"
-        else:
-            row_class = "empty"
-            
-        # Öğrenme bağlantısını kontrol et ve link olarak göster
-        ogrenme_baglantisi = result.get('ogrenme_baglantisi', '')
-        tavsiye = result.get('tavsiye', '')
-        
-        if ogrenme_baglantisi:
-            tavsiye_html = f'<a href="{ogrenme_baglantisi}" target="_blank">{tavsiye}</a>'
-        else:
-            tavsiye_html = tavsiye
-            
-        return f"""
-        <tr class="{row_class}">
-            <td>{result['soru_no']}</td>
-            <td>{result['durum']}</td>
-            <td>{result['tema_adi']}</td>
-            <td>{result['hissiyat']}</td>
-            <td>{result.get('guven_endeksi', 0):.2f}</td>
-            <td>{result.get('zorluk_seviyesi', 'Orta')}</td>
-            <td>{tavsiye_html}</td>
-        </tr>
-        """
\ No newline at end of file
@@ -0,0 +1,283 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from config import settings
+from utils.logger import logger
+from utils.file_utils import load_json_file
+from utils.image_processor import sayfa_etiketi
+from core.report_format import ReportCatalog, kodla, coz
+
+_SEMA = """
+CREATE TABLE IF NOT EXISTS calismalar (
+    id INTEGER PRIMARY KEY,
+    tur TEXT NOT NULL,
+    tarih TEXT NOT NULL,
+    ek TEXT
+);
+CREATE TABLE IF NOT EXISTS formlar (
+    id INTEGER PRIMARY KEY,
+    calisma_id INTEGER NOT NULL REFERENCES calismalar(id),
+    etiket TEXT NOT NULL,
+    dosya_adi TEXT,
+    sayfa_no INTEGER,
+    okul_no TEXT,
+    sinif_sube TEXT,
+    islem_durumu TEXT NOT NULL,
+    hata_mesaji TEXT,
+    islem_tarihi TEXT,
+    ek TEXT
+);
+CREATE INDEX IF NOT EXISTS formlar_etiket ON formlar(islem_durumu, etiket, id);
+CREATE INDEX IF NOT EXISTS formlar_ogrenci ON formlar(sinif_sube, okul_no);
+CREATE TABLE IF NOT EXISTS cevaplar (
+    form_id INTEGER NOT NULL,
+    soru_no INTEGER NOT NULL,
+    cevap TEXT,
+    doluluk REAL,
+    PRIMARY KEY (form_id, soru_no)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS analizler (
+    calisma_id INTEGER NOT NULL,
+    okul_no TEXT NOT NULL,
+    sinif_sube TEXT NOT NULL,
+    soru_no INTEGER NOT NULL,
+    durum INTEGER,
+    hissiyat INTEGER,
+    guven_endeksi REAL,
+    zorluk_seviyesi INTEGER,
+    tavsiye INTEGER
+);
+CREATE INDEX IF NOT EXISTS analizler_ogrenci ON analizler(sinif_sube, okul_no, calisma_id);
+CREATE TABLE IF NOT EXISTS raporlar (
+    id INTEGER PRIMARY KEY,
+    calisma_id INTEGER NOT NULL,
+    okul_no TEXT NOT NULL,
+    ad_soyad TEXT,
+    sinif_sube TEXT NOT NULL,
+    html_yolu TEXT,
+    veri BLOB,
+    parmak_izi TEXT
+);
+CREATE INDEX IF NOT EXISTS raporlar_ogrenci ON raporlar(sinif_sube, okul_no, id);
+"""
+
+# Önceki sürümlerin oluşturduğu depolara sonradan eklenen sütunlar
+_EK_SUTUNLAR = {'raporlar': {'parmak_izi': 'TEXT'}}
+
+# Her form etiketi için en son başarılı okuma
+_GUNCEL_FORMLAR = """
+SELECT MAX(id) AS id FROM formlar WHERE islem_durumu = 'başarılı' GROUP BY etiket
+"""
+
+# Form sonucunda ayrı sütunu olmayan ve JSON olarak saklanan alanlar
+_FORM_EK_ALANLARI = ('kimlik_kaynagi', 'esik_degerler', 'hizalama', 'istatistikler')
+
+
+class ResultStore:
+    """Optik okuma, analiz ve rapor sonuçlarının tek dosyalık SQLite deposu.
+
+    Her yazma bir çalışma (calismalar satırı) altında tek işlemde eklenir;
+    satırlar güncellenmez. Aynı form etiketi veya öğrenci için en son kayıt
+    geçerlidir. Cevaplar ve analiz sonuçları form/öğrenci x soru başına bir
+    satırdır. Depo ilk kez oluşturulurken optik_cevaplar dizinindeki eski
+    sonuc_*.json dosyaları içe aktarılır.
+    """
+
+    def __init__(self, yol: Optional[Path] = None):
+        self.yol = Path(yol or settings.SONUC_DEPOSU_PATH)
+        # Rapor çalışmalarının katalogları (satırlar güncellenmediğinden önbelleklenebilir)
+        self._kataloglar = {}
+        yeni = not self.yol.exists()
+        self.yol.parent.mkdir(parents=True, exist_ok=True)
+        with self._islem() as db:
+            db.executescript(_SEMA)
+            for tablo, sutunlar in _EK_SUTUNLAR.items():
+                mevcut = {satir[1] for satir in db.execute(f"PRAGMA table_info({tablo})")}
+                for sutun, tur in sutunlar.items():
+                    if sutun not in mevcut:
+                        db.execute(f"ALTER TABLE {tablo} ADD COLUMN {sutun} {tur}")
+        if yeni:
+            self._eski_sonuclari_aktar(settings.OPTIK_CEVAPLAR_DIR)
+
+    @contextmanager
+    def _islem(self):
+        """Tek bir işlem (transaction) için bağlantı açar; hata olursa geri alınır"""
+        db = sqlite3.connect(str(self.yol), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _calisma_ekle(db, tur: str, ek: Optional[Dict] = None) -> int:
+        return db.execute(
+            "INSERT INTO calismalar (tur, tarih, ek) VALUES (?, ?, ?)",
+            (tur, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+             json.dumps(ek, ensure_ascii=False) if ek else None)
+        ).lastrowid
+
+    def formlari_ekle(self, sonuclar: Iterable[Dict], etiketler: Optional[List[str]] = None,
+                      tur: str = 'optik') -> Optional[int]:
+        """Optik okuma sonuçlarını tek çalışma olarak ekler; çalışma numarasını döndürür"""
+        sonuclar = [s for s in sonuclar if isinstance(s, dict)]
+        if not sonuclar:
+            return None
+        with self._islem() as db:
+            calisma = self._calisma_ekle(db, tur)
+            for i, sonuc in enumerate(sonuclar):
+                etiket = etiketler[i] if etiketler else sayfa_etiketi(sonuc.get('dosya_adi', ''),
+                                                                      sonuc.get('sayfa_no'))
+                ek = {alan: sonuc[alan] for alan in _FORM_EK_ALANLARI if alan in sonuc}
+                form_id = db.execute(
+                    "INSERT INTO formlar (calisma_id, etiket, dosya_adi, sayfa_no, okul_no, sinif_sube,"
+                    " islem_durumu, hata_mesaji, islem_tarihi, ek) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (calisma, etiket, sonuc.get('dosya_adi'), sonuc.get('sayfa_no'), sonuc.get('okul_no'),
+                     sonuc.get('sinif_sube'), sonuc.get('islem_durumu', 'hata'), sonuc.get('hata_mesaji'),
+                     sonuc.get('islem_tarihi'), json.dumps(ek, ensure_ascii=False))
+                ).lastrowid
+                doluluk = sonuc.get('doluluk', {})
+                db.executemany("INSERT INTO cevaplar (form_id, soru_no, cevap, doluluk) VALUES (?, ?, ?, ?)",
+                               [(form_id, int(soru), cevap, doluluk.get(soru))
+                                for soru, cevap in sonuc.get('cevaplar', {}).items()])
+        return calisma
+
+    def etiketler(self) -> List[str]:
+        """Başarıyla okunmuş formların etiketleri"""
+        with self._islem() as db:
+            return [etiket for (etiket,) in db.execute(
+                "SELECT DISTINCT etiket FROM formlar WHERE islem_durumu = 'başarılı' ORDER BY etiket")]
+
+    def optik_sonuclari(self) -> List[Dict]:
+        """Her form etiketinin en son başarılı okumasını optik sonuç biçiminde döndürür"""
+        with self._islem() as db:
+            formlar = db.execute(
+                "SELECT id, etiket, dosya_adi, sayfa_no, okul_no, sinif_sube, islem_tarihi, ek FROM formlar"
+                f" WHERE id IN ({_GUNCEL_FORMLAR}) ORDER BY etiket").fetchall()
+            cevap_satirlari = db.execute(
+                f"SELECT form_id, soru_no, cevap FROM cevaplar WHERE form_id IN ({_GUNCEL_FORMLAR})"
+                " ORDER BY form_id, soru_no").fetchall()
+
+        cevaplar = {form_id: {str(soru): cevap for _, soru, cevap in satirlar}
+                    for form_id, satirlar in groupby(cevap_satirlari, key=lambda s: s[0])}
+        sonuclar = []
+        for form_id, etiket, dosya_adi, sayfa_no, okul_no, sinif_sube, islem_tarihi, ek in formlar:
+            sonuc = {'etiket': etiket, 'dosya_adi': dosya_adi}
+            if sayfa_no is not None:
+                sonuc['sayfa_no'] = sayfa_no
+            sonuc.update({
+                'okul_no': okul_no,
+                'sinif_sube': sinif_sube,
+                'cevaplar': cevaplar.get(form_id, {}),
+                'islem_tarihi': islem_tarihi,
+                'islem_durumu': 'başarılı',
+                **json.loads(ek or '{}')
+            })
+            sonuclar.append(sonuc)
+        return sonuclar
+
+    def analizleri_ekle(self, batch, ek: Optional[Dict] = None) -> Optional[int]:
+        """AnalysisBatch kodlarını öğrenci x soru satırları olarak ekler.
+
+        durum, hissiyat, zorluk_seviyesi ve tavsiye kodları AnalysisBatch ile
+        aynıdır; tavsiye şablonları çalışma kaydında saklanır.
+        """
+        n, soru_sayisi = batch.durum.shape
+        if n == 0:
+            return None
+        okul_no = np.repeat(batch.kimlik['okul_no'].astype(str).to_numpy(), soru_sayisi)
+        sinif_sube = np.repeat(batch.kimlik['sinif_sube'].astype(str).to_numpy(), soru_sayisi)
+        soru_nolari = np.tile(batch.soru_nolari, n)
+        with self._islem() as db:
+            calisma = self._calisma_ekle(db, 'analiz', {
+                'tavsiye_sablonlari': list(batch.tavsiye_sablonlari), **(ek or {})})
+            db.executemany(
+                "INSERT INTO analizler (calisma_id, okul_no, sinif_sube, soru_no, durum, hissiyat,"
+                " guven_endeksi, zorluk_seviyesi, tavsiye) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                zip([calisma] * (n * soru_sayisi), okul_no.tolist(), sinif_sube.tolist(), soru_nolari.tolist(),
+                    batch.durum.ravel().tolist(), batch.hissiyat.ravel().tolist(),
+                    batch.guven_endeksi.ravel().tolist(), batch.zorluk_seviyesi.ravel().tolist(),
+                    batch.tavsiye.ravel().tolist()))
+        logger.info(f"{n} öğrencinin analiz sonuçları depoya eklendi")
+        return calisma
+
+    def raporlari_ekle(self, raporlar: List[Dict], katalog: Optional[ReportCatalog] = None) -> Optional[int]:
+        """Rapor kayıtlarını (okul_no, ad_soyad, sinif_sube, html_yolu, veri, parmak_izi) tek çalışma olarak ekler.
+
+        veri report_format.kodla ile kodlanır; kompakt raporların bağlandığı
+        katalog çalışmanın ek alanında saklanır.
+        """
+        if not raporlar:
+            return None
+        with self._islem() as db:
+            calisma = self._calisma_ekle(db, 'rapor', {'katalog': katalog.to_dict()} if katalog else None)
+            db.executemany(
+                "INSERT INTO raporlar (calisma_id, okul_no, ad_soyad, sinif_sube, html_yolu, veri, parmak_izi)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(calisma, str(r['okul_no']), r.get('ad_soyad'), r['sinif_sube'],
+                  str(r['html_yolu']) if r.get('html_yolu') else None,
+                  kodla(r['veri']) if r.get('veri') is not None else None,
+                  r.get('parmak_izi'))
+                 for r in raporlar])
+        return calisma
+
+    def siniflar(self) -> List[str]:
+        """Raporu bulunan sınıf/şubeler"""
+        with self._islem() as db:
+            return [s for (s,) in db.execute("SELECT DISTINCT sinif_sube FROM raporlar ORDER BY sinif_sube")]
+
+    def raporlar(self, sinif_sube: Optional[str] = None) -> List[Dict]:
+        """Her öğrencinin en son rapor kaydı (veri hariç)"""
+        kosul, parametreler = ("WHERE sinif_sube = ?", (sinif_sube,)) if sinif_sube else ("", ())
+        with self._islem() as db:
+            satirlar = db.execute(
+                "SELECT okul_no, ad_soyad, sinif_sube, html_yolu FROM raporlar WHERE id IN"
+                f" (SELECT MAX(id) FROM raporlar {kosul} GROUP BY sinif_sube, okul_no)"
+                " ORDER BY sinif_sube, okul_no", parametreler).fetchall()
+        return [{'okul_no': o, 'ad_soyad': a, 'sinif_sube': s, 'html_yolu': h} for o, a, s, h in satirlar]
+
+    def rapor_parmak_izleri(self) -> Dict[tuple, tuple]:
+        """{(sinif_sube, okul_no): (parmak_izi, html_yolu)}; her öğrencinin en son rapor kaydı"""
+        with self._islem() as db:
+            satirlar = db.execute(
+                "SELECT sinif_sube, okul_no, parmak_izi, html_yolu FROM raporlar WHERE id IN"
+                " (SELECT MAX(id) FROM raporlar GROUP BY sinif_sube, okul_no)").fetchall()
+        return {(s, o): (p, h) for s, o, p, h in satirlar}
+
+    def rapor_verisi(self, okul_no: str, sinif_sube: str) -> Optional[Dict]:
+        """Öğrencinin en son rapor verisi, tam biçimde (eski rapor JSON'unun içeriği)"""
+        with self._islem() as db:
+            satir = db.execute(
+                "SELECT r.veri, r.calisma_id, c.ek FROM raporlar r JOIN calismalar c ON c.id = r.calisma_id"
+                " WHERE r.sinif_sube = ? AND r.okul_no = ? ORDER BY r.id DESC LIMIT 1",
+                (sinif_sube, str(okul_no))).fetchone()
+        if not satir or not satir[0]:
+            return None
+        veri, calisma, ek = satir
+        katalog = self._kataloglar.get(calisma)
+        if katalog is None:
+            katalog = self._kataloglar[calisma] = ReportCatalog.from_dict(json.loads(ek or '{}').get('katalog', {}))
+        return katalog.genislet(coz(veri))
+
+    def _eski_sonuclari_aktar(self, dizin: Path):
+        """Depodan önceki sürümlerin yazdığı sonuc_*.json dosyalarını bir kez içe aktarır"""
+        dizin = Path(dizin)
+        if not dizin.exists():
+            return
+        dosyalar = sorted(dizin.glob('sonuc_*.json'))
+        sonuclar, etiketler = [], []
+        for dosya in dosyalar:
+            veri = load_json_file(dosya)
+            if veri:
+                veri.setdefault('islem_durumu', 'başarılı')
+                veri.setdefault('dosya_adi', dosya.name)
+                sonuclar.append(veri)
+                etiketler.append(dosya.stem[len('sonuc_'):])
+        if sonuclar:
+            self.formlari_ekle(sonuclar, etiketler, tur='ice_aktarma')
+            logger.info(f"{len(sonuclar)} eski optik sonuç dosyası depoya aktarıldı: {self.yol}")
@@ -2,6 +2,15 @@
 # -*- coding: utf-8 -*-
 
 # Optik form okuyucu ayarları
+# Eşik değerleri config/settings.py ile aynıdır; okuma core/optik_engine.py
+# içindeki ortak motor tarafından yapılır.
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from config import settings
 
 AYARLAR = {
     # Dizin yolları
@@ -9,12 +18,12 @@ AYARLAR = {
     "CIKTI_DIZINI": "/home/gazy/Masaüstü/Proje_SON/optik/data/cikti/",
     
     # Optik form ayarları
-    "SORU_SAYISI": 20,
-    "SECENEKLER": ['a', 'b', 'c', 'd', 'e'],
+    "SORU_SAYISI": settings.SORU_SAYISI,
+    "SECENEKLER": settings.SECENEKLER,
     
     # Görüntü işleme ayarları
-    "BOS_ESIK": 0.15,    # Baloncuğun boş kabul edilmesi için maksimum doluluk oranı
-    "DOLU_ESIK": 0.40,   # Baloncuğun dolu kabul edilmesi için minimum doluluk oranı
+    "BOS_ESIK": settings.BOS_ESIK,    # Baloncuğun boş kabul edilmesi için maksimum doluluk oranı
+    "DOLU_ESIK": settings.DOLU_ESIK,  # Baloncuğun dolu kabul edilmesi için minimum doluluk oranı
     
     # Desteklenen dosya formatları
     "DESTEKLENEN_FORMATLAR": ['*.png', '*.jpg', '*.jpeg', '*.bmp', '*.tiff']
@@ -343,23 +343,26 @@ Tarih: 2025
                     raise AttributeError("DataLoader.get_questions() bulunamadı.")
 
                 self.app.ai_engine.set_questions(questions)
-                success_count = 0
 
-                for optik_file in self.app.data_loader.optik_dosyalar:
-                    try:
-                        student = self.app.data_loader.parse_optik_file(optik_file)
-                        if student:
-                            analysis_results = self.app.ai_engine.analyze_student(student)
-                            report_path = self.app.reporter.create_student_report(student, analysis_results)
-                            if report_path:
-                                success_count += 1
-                                self.log(f"Rapor oluşturuldu: {student.ad_soyad}")
-                        else:
-                            self.log(f"Atlandı: {optik_file.name} öğrenci verisi oluşturulamadı")
-                    except Exception as e:
-                        self.log(f"Hata: {optik_file.name} işlenirken hata: {e}")
-                        logger.error(f"Analiz sırasında hata ({optik_file.name}): {e}")
+                matris = self.app.data_loader.load_answer_matrix()
+                for dosya in matris.atlanan:
+                    self.log(f"Atlandı: {dosya} öğrenci verisi oluşturulamadı")
+
+                analiz = self.app.ai_engine.analyze_batch(matris)
+                self.app.reporter.analizleri_kaydet(analiz)
+                if self.app.reporter.create_class_summary(self.app.aggregate_engine.hesapla(analiz)):
+                    self.log("Sınıf özetleri oluşturuldu")
+
+                def rapor_ilerlemesi(tamamlanan, toplam, student, report_path):
+                    self.set_status(f"Raporlar oluşturuluyor... {tamamlanan}/{toplam}")
+                    if report_path:
+                        self.log(f"Rapor oluşturuldu: {student.ad_soyad}")
+                    else:
+                        self.log(f"Hata: {student.ad_soyad if student else 'öğrenci'} için rapor oluşturulamadı")
+
+                success_count = self.app.reporter.create_student_reports(matris, analiz, ilerleme=rapor_ilerlemesi)
 
+                self.app.reporter.raporlari_kaydet()
                 self.set_status(f"{success_count} rapor oluşturuldu")
                 self.log(f"Analiz tamamlandı: {success_count} rapor")
                 
@@ -3,8 +3,10 @@ from tkinter import ttk, messagebox, filedialog  # filedialog eklendi
 import os
 import webbrowser
 import shutil  # shutil eklendi
+import threading
 from pathlib import Path
 from config import settings
+from core.result_store import ResultStore
 
 class ReportViewerWindow(tk.Toplevel):
     def __init__(self, master=None):
@@ -12,6 +14,8 @@ class ReportViewerWindow(tk.Toplevel):
         self.title("Raporları İzle")
         self.geometry("800x600+100+100")
         self.reports_dir = settings.RAPORLAR_DIR
+        self.store = ResultStore()
+        self.rapor_yollari = {}  # okul_no -> html_yolu (seçili sınıf)
         
         self.build_ui()
         self.load_classes()
@@ -65,6 +69,7 @@ class ReportViewerWindow(tk.Toplevel):
         
         ttk.Button(button_frame, text="Raporu Aç", command=self.open_report).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Raporu İndir", command=self.download_report).pack(side=tk.LEFT, padx=5)  # Yeni buton
+        ttk.Button(button_frame, text="Sınıf PDF'i İndir", command=self.download_class_pdf).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Yenile", command=self.refresh).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Kapat", command=self.destroy).pack(side=tk.RIGHT, padx=5)
         
@@ -81,14 +86,11 @@ class ReportViewerWindow(tk.Toplevel):
         except Exception as e:
             print(f"Sınıf yükleme hatası: {e}")
         
-        # Rapor dosyalarından sınıfları al
-        if self.reports_dir.exists():
-            for file in self.reports_dir.glob('*.html'):
-                # Dosya adı formatı: rapor_{okul_no}_{ad_soyad}.html
-                parts = file.stem.split('_')
-                if len(parts) >= 3:
-                    # Sınıf bilgisini öğrenci CSV'sinden alacağız
-                    pass
+        # Raporu oluşturulmuş sınıfları sonuç deposundan al
+        try:
+            classes.update(self.store.siniflar())
+        except Exception as e:
+            print(f"Sonuç deposu okuma hatası: {e}")
         
         self.class_combo['values'] = sorted(classes)
         
@@ -103,6 +105,12 @@ class ReportViewerWindow(tk.Toplevel):
         # Treeview'ı temizle
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self.rapor_yollari = {}
+            
+        try:
+            self.rapor_yollari = {r['okul_no']: r['html_yolu'] for r in self.store.raporlar(class_name)}
+        except Exception as e:
+            print(f"Sonuç deposu okuma hatası: {e}")
             
         try:
             import pandas as pd
@@ -114,14 +122,20 @@ class ReportViewerWindow(tk.Toplevel):
                 ad_soyad = student.get('Ad_Soyad', '')
                 
                 # Rapor durumunu kontrol et
-                report_file = self.reports_dir / f"rapor_{okul_no}_{ad_soyad.replace(' ', '_')}.html"
-                report_status = "Var" if report_file.exists() else "Yok"
+                report_status = "Var" if self._rapor_dosyasi(okul_no, ad_soyad).exists() else "Yok"
                 
                 self.tree.insert('', 'end', values=(okul_no, ad_soyad, report_status))
                 
         except Exception as e:
             messagebox.showerror("Hata", f"Öğrenci yükleme hatası: {e}")
             
+    def _rapor_dosyasi(self, okul_no, ad_soyad) -> Path:
+        """Depodaki rapor yolu; depoda kaydı yoksa eski dosya adı"""
+        yol = self.rapor_yollari.get(str(okul_no))
+        if yol:
+            return Path(yol)
+        return self.reports_dir / f"rapor_{okul_no}_{ad_soyad.replace(' ', '_')}.html"
+            
     def open_report(self):
         """Seçili öğrencinin raporunu aç"""
         selected = self.tree.selection()
@@ -133,7 +147,7 @@ class ReportViewerWindow(tk.Toplevel):
         values = self.tree.item(item, 'values')
         okul_no, ad_soyad, _ = values
         
-        report_file = self.reports_dir / f"rapor_{okul_no}_{ad_soyad.replace(' ', '_')}.html"
+        report_file = self._rapor_dosyasi(okul_no, ad_soyad)
         
         if report_file.exists():
             try:
@@ -154,7 +168,7 @@ class ReportViewerWindow(tk.Toplevel):
         values = self.tree.item(item, 'values')
         okul_no, ad_soyad, _ = values
 
-        report_file = self.reports_dir / f"rapor_{okul_no}_{ad_soyad.replace(' ', '_')}.html"
+        report_file = self._rapor_dosyasi(okul_no, ad_soyad)
 
         if not report_file.exists():
             messagebox.showwarning("Uyarı", "Bu öğrenci için rapor bulunamadı")
@@ -172,10 +186,46 @@ class ReportViewerWindow(tk.Toplevel):
 
         try:
             shutil.copy2(report_file, save_path)
+            # Rapor ortak stil sayfasına bağlıdır; yanına kopyalanır
+            stil = report_file.parent / settings.RAPOR_STIL_PATH.name
+            hedef_stil = Path(save_path).parent / stil.name
+            if stil.exists() and not hedef_stil.exists():
+                shutil.copy2(stil, hedef_stil)
             messagebox.showinfo("Başarılı", f"Rapor başarıyla indirildi:\n{save_path}")
         except Exception as e:
             messagebox.showerror("Hata", f"Rapor indirilemedi:\n{e}")
             
+    def download_class_pdf(self):
+        """Seçili sınıfın tüm raporlarını tek bir PDF dosyası olarak kaydet"""
+        selected_class = self.class_var.get()
+        if not selected_class:
+            messagebox.showwarning("Uyarı", "Lütfen bir sınıf seçin")
+            return
+
+        save_path = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            filetypes=[("PDF Files", "*.pdf"), ("All Files", "*.*")],
+            initialfile=f"sinif_{selected_class}.pdf"
+        )
+        if not save_path:
+            return  # Kullanıcı iptal etti
+
+        def run_export():
+            from core.class_report_pdf import ClassReportPDF
+            pdf_path = ClassReportPDF(self.store).olustur(selected_class, Path(save_path))
+            self.after(0, export_done, pdf_path)
+
+        def export_done(pdf_path):
+            self.config(cursor="")
+            if pdf_path:
+                messagebox.showinfo("Başarılı", f"Sınıf raporu başarıyla indirildi:\n{pdf_path}")
+            else:
+                messagebox.showerror("Hata", "Sınıf raporu oluşturulamadı. Ayrıntılar için log dosyasına bakın.")
+
+        # PDF oluşturma arka planda yapılır; pencere donmaz
+        self.config(cursor="watch")
+        threading.Thread(target=run_export, daemon=True).start()
+            
     def refresh(self):
         """Listeyi yenile"""
         selected_class = self.class_var.get()
@@ -12,9 +12,11 @@ sys.path.insert(0, str(current_dir))
 
 from core.data_loader import DataLoader
 from core.ai_engine import AIEngine
+from core.aggregate_engine import AggregateEngine
 from core.reporter import Reporter
 from core.optik_processor import OptikProcessor
 from core.form_generator import FormGenerator
+from core.optik_watcher import OptikWatcher
 from utils.logger import logger
 from gui.main_window import MainWindow
 
@@ -25,6 +27,7 @@ class TamÖgrenmeOtomasyonu:
     def __init__(self):
         self.data_loader = DataLoader()
         self.ai_engine = AIEngine()
+        self.aggregate_engine = AggregateEngine()
         self.reporter = Reporter()
         self.optik_processor = OptikProcessor()
         self.form_generator = FormGenerator()
@@ -65,38 +68,30 @@ class TamÖgrenmeOtomasyonu:
         logger.info("İşlem tamamlandı!")
         return True
 
+    def run_watch(self):
+        """optik_cevaplar dizinini izleyerek yeni taramaları geldikçe işle"""
+        logger.info("Optik klasör izleme modu başlatılıyor (durdurmak için Ctrl+C)...")
+        OptikWatcher(self.optik_processor).calistir()
+        return True
+
     def analyze_and_report(self):
         """Tüm öğrencileri analiz et ve raporla"""
         questions = self.data_loader.get_questions()
         self.ai_engine.set_questions(questions)
 
-        success_count = 0
-        for optik_file in self.data_loader.optik_dosyalar:
-            try:
-                logger.info(f"İşleniyor: {optik_file.name}")
-
-                # Öğrenci verilerini yükle
-                student = self.data_loader.parse_optik_file(optik_file)
-                if not student:
-                    logger.warning(f"{optik_file.name} işlenemedi, atlanıyor")
-                    continue
-
-                # Analiz yap
-                analysis_results = self.ai_engine.analyze_student(student)
-
-                # Rapor oluştur
-                report_path = self.reporter.create_student_report(student, analysis_results)
-
-                if report_path:
-                    success_count += 1
-                    logger.info(f"Rapor oluşturuldu: {report_path}")
-                else:
-                    logger.error(f"{student.ad_soyad} için rapor oluşturulamadı")
+        matris = self.data_loader.load_answer_matrix()
+        for dosya in matris.atlanan:
+            logger.warning(f"{dosya} işlenemedi, atlanıyor")
 
-            except Exception as e:
-                logger.error(f"{optik_file.name} işlenirken hata: {e}")
+        # Tüm öğrenciler tek seferde analiz edilir; sonuç nesneleri rapor sırasında üretilir
+        analiz = self.ai_engine.analyze_batch(matris)
+        self.reporter.analizleri_kaydet(analiz)
+        self.reporter.create_class_summary(self.aggregate_engine.hesapla(analiz))
 
-        logger.info(f"İşlem tamamlandı. {success_count}/{len(self.data_loader.optik_dosyalar)} öğrenci başarıyla işlendi.")
+        # Raporlar işçi süreçlerinde yazılır; hatalar öğrenci başına loglanır
+        success_count = self.reporter.create_student_reports(matris, analiz)
+        self.reporter.raporlari_kaydet()
+        logger.info(f"İşlem tamamlandı. {success_count}/{len(matris)} öğrenci başarıyla işlendi.")
 
 
 def main():
@@ -108,6 +103,8 @@ def main():
         success = app.run_cli()
         if not success:
             sys.exit(1)
+    elif len(sys.argv) > 1 and sys.argv[1] == "-watch":
+        app.run_watch()
     else:
         app.run_gui()
 
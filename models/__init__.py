@@ -1,9 +1,14 @@
 from .student import Student
 from .question import Question
-from .result import AnalysisResult
+from .question_bank import QuestionBank
+from .result import AnalysisResult, AnalysisBatch
+from .answer_matrix import AnswerMatrix
 
 __all__ = [
     'Student',
     'Question',
-    'AnalysisResult'
+    'QuestionBank',
+    'AnalysisResult',
+    'AnalysisBatch',
+    'AnswerMatrix'
 ]
\ No newline at end of file
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from models.student import Student
+
+# Cevap kodları: 0..k-1 seçenek indeksi, aşağıdakiler özel durumlar
+BOS = -1
+BELIRSIZ = -2  # optik okuyucunun çözemediği veya geçersiz işaretleme
+
+# Hissiyat kodları; sözlükte olmayan değerler "belirsiz" sayılır
+HISSIYATLAR = ("çok kolay", "kolay", "orta", "zor", "çok zor", "anlamadım", "belirsiz")
+HISSIYAT_KODLARI = {hissiyat: kod for kod, hissiyat in enumerate(HISSIYATLAR)}
+HISSIYAT_BELIRSIZ = HISSIYAT_KODLARI["belirsiz"]
+
+
+@dataclass
+class AnswerMatrix:
+    """Bir sınavın tüm optik sonuçları, sütunsal biçimde.
+
+    cevaplar (öğrenci x soru) int8 kod matrisidir; sütunlar soru_nolari
+    sırasındadır. kimlik, satırlarla aynı sırada okul_no, ad_soyad,
+    sinif_sube ve dosya sütunlarını içerir. hissiyat, aynı biçimde
+    HISSIYATLAR indeksleri tutan int8 matristir.
+    """
+    cevaplar: np.ndarray
+    soru_nolari: np.ndarray
+    secenekler: Tuple[str, ...]
+    kimlik: pd.DataFrame
+    atlanan: List[str] = field(default_factory=list)
+    hissiyat: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.cevaplar)
+
+    @classmethod
+    def olustur(cls, kayitlar: List[Tuple[Dict[str, str], Dict[str, Optional[str]]]],
+                secenekler, atlanan: Optional[List[str]] = None) -> "AnswerMatrix":
+        """(kimlik, cevaplar) kayıtlarından matrisi kurar"""
+        secenekler = tuple(s.lower() for s in secenekler)
+        soru_nolari = sorted({int(soru) for _, cevaplar in kayitlar for soru in cevaplar})
+        sutun = {str(soru): j for j, soru in enumerate(soru_nolari)}
+        kodlar = {secenek: i for i, secenek in enumerate(secenekler)}
+
+        matris = np.full((len(kayitlar), len(soru_nolari)), BOS, dtype=np.int8)
+        for i, (_, cevaplar) in enumerate(kayitlar):
+            for soru, cevap in cevaplar.items():
+                if cevap is None or not str(cevap).strip():
+                    continue
+                matris[i, sutun[str(int(soru))]] = kodlar.get(str(cevap).strip().lower(), BELIRSIZ)
+
+        kimlik = pd.DataFrame([k for k, _ in kayitlar], columns=['okul_no', 'ad_soyad', 'sinif_sube', 'dosya'])
+        return cls(cevaplar=matris, soru_nolari=np.array(soru_nolari, dtype=np.int32),
+                   secenekler=secenekler, kimlik=kimlik, atlanan=list(atlanan or []),
+                   hissiyat=np.full(matris.shape, HISSIYAT_BELIRSIZ, dtype=np.int8))
+
+    def hissiyat_doldur(self, i: int, hissiyatlar: Dict[str, str]):
+        """i. öğrencinin {soru_no: hissiyat} verisini kodlayıp hissiyat matrisine yazar"""
+        for j, soru in enumerate(self.soru_nolari.tolist()):
+            deger = hissiyatlar.get(str(soru))
+            if deger is not None:
+                self.hissiyat[i, j] = HISSIYAT_KODLARI.get(deger.strip().lower(), HISSIYAT_BELIRSIZ)
+
+    def cevap_sozlugu(self, i: int) -> Dict[str, Optional[str]]:
+        """i. öğrencinin cevaplarını optik sonuç biçiminde ({soru_no: seçenek}) döndürür"""
+        sozluk = {}
+        for soru, kod in zip(self.soru_nolari.tolist(), self.cevaplar[i].tolist()):
+            if kod == BOS:
+                sozluk[str(soru)] = None
+            elif kod == BELIRSIZ:
+                sozluk[str(soru)] = "belirsiz"
+            else:
+                sozluk[str(soru)] = self.secenekler[kod]
+        return sozluk
+
+    def istatistikler(self, i: int) -> Dict:
+        satir = self.cevaplar[i]
+        dagilim = np.bincount(satir[satir >= 0], minlength=len(self.secenekler))
+        bos = int(np.count_nonzero(satir == BOS))
+        return {
+            'toplam_soru': len(satir),
+            'dolu_cevaplar': len(satir) - bos,
+            'bos_cevaplar': bos,
+            'secenek_dagilimi': dict(zip(self.secenekler, dagilim.tolist()))
+        }
+
+    def ogrenci(self, i: int, hissiyat_verileri: Optional[Dict[str, str]] = None) -> Student:
+        """i. satırı mevcut analiz ve raporlama adımları için Student nesnesine çevirir"""
+        # Satır (iloc) yerine sütun başına erişim; satır Series'i oluşturmak pahalıdır
+        return Student(
+            okul_no=self.kimlik['okul_no'].iat[i],
+            ad_soyad=self.kimlik['ad_soyad'].iat[i],
+            sinif_sube=self.kimlik['sinif_sube'].iat[i],
+            cevaplar=self.cevap_sozlugu(i),
+            hissiyat_verileri=hissiyat_verileri or {},
+            istatistikler=self.istatistikler(i)
+        )
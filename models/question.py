@@ -2,6 +2,9 @@ from dataclasses import dataclass
 
 @dataclass
 class Question:
+    __slots__ = ("soru_no", "soru_metni", "secenekler", "tema_adi", "ogrenme_ciktisi", "dogru_cevap",
+                 "ogrenme_baglantisi")
+
     def __init__(self, soru_no, soru_metni, secenekler, tema_adi, ogrenme_ciktisi, dogru_cevap, ogrenme_baglantisi):
         self.soru_no = soru_no
         self.soru_metni = soru_metni
@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping, Optional, Tuple
+import numpy as np
+from models.question import Question
+
+# Doğru cevabı seçeneklerden biri olmayan soruların kodu; hiçbir cevap koduyla eşleşmez
+GECERSIZ_CEVAP = -3
+
+
+def _salt_okunur(dizi: np.ndarray) -> np.ndarray:
+    dizi.flags.writeable = False
+    return dizi
+
+
+@dataclass(frozen=True, eq=False)
+class QuestionBank:
+    """Bir sınavın soruları, değiştirilemez ve soru_no ile indeksli biçimde.
+
+    sorular kaynaklar.csv sırasındadır. dogru_cevap_kodlari secenekler
+    indeksleridir (AnswerMatrix cevap kodlarıyla karşılaştırılabilir),
+    tema_kodlari ise temalar demetine bağlanır. Diziler salt okunurdur;
+    aynı banka süreç içinde birden fazla analizde paylaşılır.
+    """
+    sorular: Tuple[Question, ...]
+    secenekler: Tuple[str, ...]
+    soru_nolari: np.ndarray
+    dogru_cevap_kodlari: np.ndarray
+    temalar: Tuple[str, ...]
+    tema_kodlari: np.ndarray
+    indeks: Mapping[int, int]
+
+    @classmethod
+    def olustur(cls, sorular: Iterable[Question], secenekler) -> "QuestionBank":
+        sorular = tuple(sorular)
+        secenekler = tuple(s.lower() for s in secenekler)
+        kodlar = {secenek: i for i, secenek in enumerate(secenekler)}
+        temalar = tuple(dict.fromkeys(q.tema_adi for q in sorular))
+        tema_kodlari = {tema: i for i, tema in enumerate(temalar)}
+        return cls(
+            sorular=sorular,
+            secenekler=secenekler,
+            soru_nolari=_salt_okunur(np.array([q.soru_no for q in sorular], dtype=np.int32)),
+            dogru_cevap_kodlari=_salt_okunur(np.array(
+                [kodlar.get(str(q.dogru_cevap).strip().lower(), GECERSIZ_CEVAP) for q in sorular], dtype=np.int8)),
+            temalar=temalar,
+            tema_kodlari=_salt_okunur(np.array([tema_kodlari[q.tema_adi] for q in sorular], dtype=np.int16)),
+            indeks=MappingProxyType({q.soru_no: i for i, q in enumerate(sorular)})
+        )
+
+    def __len__(self) -> int:
+        return len(self.sorular)
+
+    def __iter__(self) -> Iterator[Question]:
+        return iter(self.sorular)
+
+    def soru(self, soru_no: int) -> Optional[Question]:
+        i = self.indeks.get(int(soru_no))
+        return None if i is None else self.sorular[i]
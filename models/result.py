@@ -1,9 +1,19 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from models.answer_matrix import BOS, BELIRSIZ, HISSIYATLAR
+
+# Toplu analiz sonuçlarındaki kodların karşılıkları
+DURUMLAR = ("Doğru", "Yanlış", "Boş")
+ZORLUK_SEVIYELERI = ("Kolay", "Orta", "Zor")
 
 @dataclass
 class AnalysisResult:
-    def __init__(self, soru_no, ogrenci_cevap, dogru_cevap, durum, hissiyat, 
+    __slots__ = ("soru_no", "ogrenci_cevap", "dogru_cevap", "durum", "hissiyat", "tema_adi",
+                 "ogrenme_ciktisi", "zorluk_seviyesi", "guven_endeksi", "tavsiye", "ogrenme_baglantisi")
+
+    def __init__(self, soru_no, ogrenci_cevap, dogru_cevap, durum, hissiyat,
                  tema_adi, ogrenme_ciktisi, zorluk_seviyesi, guven_endeksi, tavsiye, ogrenme_baglantisi):
         self.soru_no = soru_no
         self.ogrenci_cevap = ogrenci_cevap
@@ -15,4 +25,71 @@ class AnalysisResult:
         self.zorluk_seviyesi = zorluk_seviyesi
         self.guven_endeksi = guven_endeksi
         self.tavsiye = tavsiye
-        self.ogrenme_baglantisi = ogrenme_baglantisi  # ✅ Yeni alan
\ No newline at end of file
+        self.ogrenme_baglantisi = ogrenme_baglantisi  # ✅ Yeni alan
+
+    def to_dict(self) -> Dict:
+        """Rapor JSON'u için alanları sözlük olarak döndürür"""
+        return {alan: getattr(self, alan) for alan in self.__slots__}
+
+
+@dataclass
+class AnalysisBatch:
+    """Bir sınavın tüm analiz sonuçları, sütunsal biçimde.
+
+    Öğrenci x soru matrisleri yalnızca kod tutar: cevaplar (AnswerMatrix
+    cevap kodları), hissiyat (HISSIYATLAR), durum (DURUMLAR), zorluk_seviyesi
+    (ZORLUK_SEVIYELERI) ve tavsiye (tavsiye_sablonlari indeksi). Soruya ait
+    metinler soru başına bir kez saklanır; konu adları temalar demetine
+    tema_kodlari ile bağlanır. kimlik, satırlarla aynı sırada öğrenci
+    bilgilerini içerir. IRT kalibrasyonu açıksa yetenek (öğrenci başına),
+    gucluk ve ayirt_edicilik (soru başına) kestirimleri de doldurulur.
+    """
+    kimlik: pd.DataFrame
+    soru_nolari: np.ndarray
+    secenekler: Tuple[str, ...]
+    dogru_cevaplar: Tuple[str, ...]
+    temalar: Tuple[str, ...]
+    tema_kodlari: np.ndarray
+    ogrenme_ciktilari: Tuple[str, ...]
+    ogrenme_baglantilari: Tuple[str, ...]
+    tavsiye_sablonlari: Tuple[str, ...]
+    cevaplar: np.ndarray
+    hissiyat: np.ndarray
+    durum: np.ndarray
+    guven_endeksi: np.ndarray
+    zorluk_seviyesi: np.ndarray
+    tavsiye: np.ndarray
+    yetenek: Optional[np.ndarray] = None
+    gucluk: Optional[np.ndarray] = None
+    ayirt_edicilik: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.durum)
+
+    def _cevap(self, kod: int) -> Optional[str]:
+        if kod == BOS:
+            return None
+        if kod == BELIRSIZ:
+            return "belirsiz"
+        return self.secenekler[kod]
+
+    def sonuc(self, i: int, j: int) -> AnalysisResult:
+        """i. öğrencinin j. soru sonucunu AnalysisResult olarak döndürür"""
+        tema = self.temalar[self.tema_kodlari[j]]
+        return AnalysisResult(
+            soru_no=int(self.soru_nolari[j]),
+            ogrenci_cevap=self._cevap(int(self.cevaplar[i, j])),
+            dogru_cevap=self.dogru_cevaplar[j],
+            durum=DURUMLAR[self.durum[i, j]],
+            hissiyat=HISSIYATLAR[self.hissiyat[i, j]],
+            tema_adi=tema,
+            ogrenme_ciktisi=self.ogrenme_ciktilari[j],
+            zorluk_seviyesi=ZORLUK_SEVIYELERI[self.zorluk_seviyesi[i, j]],
+            guven_endeksi=float(self.guven_endeksi[i, j]),
+            tavsiye=self.tavsiye_sablonlari[self.tavsiye[i, j]].replace("{tema}", tema),
+            ogrenme_baglantisi=self.ogrenme_baglantilari[j]
+        )
+
+    def sonuclar(self, i: int) -> List[AnalysisResult]:
+        """i. öğrencinin sonuçları; nesneler yalnızca istendiğinde ve o öğrenci için oluşturulur"""
+        return [self.sonuc(i, j) for j in range(len(self.soru_nolari))]
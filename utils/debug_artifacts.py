@@ -0,0 +1,132 @@
+import queue
+import threading
+import zlib
+from datetime import datetime
+from multiprocessing import util as mp_util
+from pathlib import Path
+from typing import Optional
+import cv2
+from config import settings
+from utils.logger import logger
+
+MODLAR = ("kapali", "ornek", "tam")
+
+
+class HataAyiklamaYazici:
+    """Optik okuma sırasında üretilen hata ayıklama görüntülerini arka planda diske yazar.
+
+    Modlar:
+        kapali: hiçbir görüntü yazılmaz
+        ornek:  her N formdan biri tamamen, diğer formlarda yalnızca belirsiz cevaplar yazılır
+        tam:    tüm formların tüm görüntüleri yazılır
+
+    Örnek formlar form etiketinin sağlama toplamıyla seçilir; aynı formlar
+    işçi sayısından bağımsız olarak seçilir. Görüntüler sınırlı bir kuyruk
+    üzerinden tek bir yazıcı iş parçacığına aktarılır; kuyruk doluysa veya
+    çalışma başına dosya sınırına ulaşıldıysa görüntü atlanır. Böylece
+    puanlama döngüsü PNG kodlaması için hiç beklemez. maks_dosya bu
+    yazıcının sınırıdır; süreç havuzlarında işçiler arasında paylaştırılır
+    (OptikProcessor.havuz_olustur).
+    """
+
+    def __init__(self, mod: Optional[str] = None, ornek_araligi: Optional[int] = None,
+                 kok_dizin: Optional[Path] = None, maks_dosya: Optional[int] = None):
+        self.mod = mod or settings.HATA_AYIKLAMA_MODU
+        if self.mod not in MODLAR:
+            logger.warning(f"Bilinmeyen hata ayıklama modu '{self.mod}', 'kapali' kullanılıyor")
+            self.mod = "kapali"
+        self.ornek_araligi = max(1, ornek_araligi or settings.HATA_AYIKLAMA_ORNEK_ARALIGI)
+        self.maks_dosya = maks_dosya or settings.HATA_AYIKLAMA_MAKS_DOSYA
+        self.kok_dizin = Path(kok_dizin or settings.HATA_AYIKLAMA_DIZINI)
+        self._hazirla()
+        self.yeni_calisma()
+
+    def yeni_calisma(self):
+        """Sonraki görüntüler için zaman damgalı yeni bir çalışma dizini seçer"""
+        self.kapat()
+        self.calisma_dizini = self.kok_dizin / datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.yazilan = 0
+        self.atlanan = 0
+
+    def _hazirla(self):
+        self._kuyruk = None
+        self._is_parcacigi = None
+        self._kilit = threading.Lock()
+        self.yazilan = 0
+        self.atlanan = 0
+
+    def __getstate__(self):
+        # Süreç havuzuna aktarılırken kuyruk ve iş parçacığı taşınmaz; işçide yeniden kurulur
+        durum = self.__dict__.copy()
+        for anahtar in ('_kuyruk', '_is_parcacigi', '_kilit'):
+            durum.pop(anahtar, None)
+        return durum
+
+    def __setstate__(self, durum):
+        self.__dict__.update(durum)
+        self._hazirla()
+
+    @property
+    def etkin(self) -> bool:
+        return self.mod != "kapali"
+
+    def form_tamamen_kaydedilsin_mi(self, etiket: str) -> bool:
+        """Formun tüm görüntülerinin mi yoksa yalnızca belirsiz cevapların mı yazılacağını belirler"""
+        if self.mod == "tam":
+            return True
+        if self.mod == "ornek":
+            return zlib.crc32(etiket.encode('utf-8')) % self.ornek_araligi == 0
+        return False
+
+    def ekle(self, dosya_adi: str, goruntu) -> bool:
+        """Görüntüyü yazma kuyruğuna ekler; beklemeden döner"""
+        if not self.etkin:
+            return False
+        if self.yazilan + self._kuyruk_uzunlugu() >= self.maks_dosya:
+            self.atlanan += 1
+            return False
+        self._baslat()
+        try:
+            self._kuyruk.put_nowait((dosya_adi, goruntu.copy()))
+            return True
+        except queue.Full:
+            self.atlanan += 1
+            return False
+
+    def _kuyruk_uzunlugu(self) -> int:
+        return self._kuyruk.qsize() if self._kuyruk is not None else 0
+
+    def _baslat(self):
+        if self._is_parcacigi is not None:
+            return
+        with self._kilit:
+            if self._is_parcacigi is not None:
+                return
+            self.calisma_dizini.mkdir(parents=True, exist_ok=True)
+            self._kuyruk = queue.Queue(maxsize=settings.HATA_AYIKLAMA_KUYRUK_BOYUTU)
+            self._is_parcacigi = threading.Thread(target=self._yaz, name="hata-ayiklama-yazici", daemon=True)
+            self._is_parcacigi.start()
+            # Ana süreçte ve süreç havuzu işçilerinde çıkışta kuyruğu boşalt
+            mp_util.Finalize(self, self.kapat, exitpriority=10)
+
+    def _yaz(self):
+        while True:
+            oge = self._kuyruk.get()
+            if oge is None:
+                break
+            dosya_adi, goruntu = oge
+            try:
+                cv2.imwrite(str(self.calisma_dizini / dosya_adi), goruntu)
+                self.yazilan += 1
+            except Exception as e:
+                logger.error(f"Hata ayıklama görüntüsü yazılamadı ({dosya_adi}): {e}")
+
+    def kapat(self):
+        """Kuyruktaki görüntülerin yazılmasını bekler ve yazıcıyı durdurur"""
+        if self._is_parcacigi is None:
+            return
+        self._kuyruk.put(None)
+        self._is_parcacigi.join()
+        self._is_parcacigi = None
+        if self.atlanan:
+            logger.warning(f"{self.atlanan} hata ayıklama görüntüsü sınır nedeniyle atlandı")
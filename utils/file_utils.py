@@ -1,5 +1,6 @@
 import os
 import json
+import hashlib
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Any
@@ -42,21 +43,32 @@ def load_json_file(file_path: Path) -> Dict[str, Any]:
         logger.error(f"JSON yükleme hatası: {e}")
         return {}
 
-def save_json_file(file_path: Path, data: Dict) -> bool:
-    """JSON dosyasını kaydeder"""
+def save_json_file(file_path: Path, data: Dict, kompakt: bool = False) -> bool:
+    """JSON dosyasını kaydeder; kompakt ise girintisiz ve boşluksuz yazar"""
     try:
         file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+            if kompakt:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=4)
         logger.info(f"JSON dosyası kaydedildi: {file_path}")
         return True
     except Exception as e:
         logger.error(f"JSON kaydetme hatası: {e}")
         return False
 
+def file_sha1(file_path: Path) -> str:
+    """Dosya içeriğinin SHA-1 özetini hesaplar"""
+    ozet = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for parca in iter(lambda: f.read(1 << 20), b''):
+            ozet.update(parca)
+    return ozet.hexdigest()
+
 def save_json_report(file_path: Path, data: Dict) -> bool:
-    """JSON rapor dosyasını kaydeder (save_json_file ile aynı)"""
-    return save_json_file(file_path, data)
+    """JSON rapor dosyasını girintisiz kaydeder"""
+    return save_json_file(file_path, data, kompakt=True)
 
 def save_html_report(file_path: Path, html_content: str) -> bool:
     """HTML raporunu kaydeder"""
@@ -70,22 +82,13 @@ def save_html_report(file_path: Path, html_content: str) -> bool:
         logger.error(f"HTML kaydetme hatası: {e}")
         return False
 
-def find_optik_files() -> List[Path]:
-    """Optik cevap dosyalarını bulur"""
+def find_optik_files() -> List[str]:
+    """Sonuç deposunda başarıyla okunmuş optik formların etiketlerini döndürür"""
     try:
-        optik_files = []
-        optik_dir = settings.OPTIK_CEVAPLAR_DIR
-        
-        if not optik_dir.exists():
-            logger.warning(f"Optik cevaplar dizini bulunamadı: {optik_dir}")
-            return []
-            
-        for file in optik_dir.iterdir():
-            if file.name.startswith('sonuc_') and file.suffix == '.json':
-                optik_files.append(file)
-                
-        logger.info(f"{len(optik_files)} optik dosya bulundu")
-        return optik_files
+        from core.result_store import ResultStore
+        etiketler = ResultStore().etiketler()
+        logger.info(f"{len(etiketler)} okunmuş optik form bulundu")
+        return etiketler
         
     except Exception as e:
         logger.error(f"Optik dosya bulma hatası: {e}")
@@ -0,0 +1,109 @@
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import cv2
+import numpy as np
+from config import settings
+from utils.logger import logger
+
+try:
+    import fitz  # PyMuPDF, yalnızca PDF girdiler için gerekir
+except ImportError:
+    fitz = None
+
+RESIM_UZANTILARI = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif", ".pdf"}
+
+# Küçültme oranına karşılık gelen OpenCV okuma bayrakları; JPEG gibi
+# biçimlerde görüntü doğrudan düşük çözünürlükte çözülür
+KUCULTME_BAYRAKLARI = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Bir form okuma birimi: (dosya, sayfa numarası). Tek sayfalık dosyalarda sayfa None'dır.
+Sayfa = Tuple[Path, Optional[int]]
+
+
+def optik_dosyalarini_bul(dizin: Path) -> List[Path]:
+    """Dizindeki optik tarama dosyalarını (resimler, çok sayfalı TIFF ve PDF) sıralı döndürür"""
+    return sorted(p for p in Path(dizin).iterdir()
+                  if p.is_file() and p.suffix.lower() in RESIM_UZANTILARI)
+
+
+def sayfa_sayisi(dosya_yolu: Path) -> int:
+    """Dosyadaki sayfa sayısını yalnızca başlıkları okuyarak döndürür"""
+    dosya_yolu = Path(dosya_yolu)
+    if dosya_yolu.suffix.lower() == ".pdf":
+        if fitz is None:
+            raise ImportError("PDF girdiler için PyMuPDF (fitz) kurulu olmalıdır")
+        with fitz.open(str(dosya_yolu)) as belge:
+            return belge.page_count
+    if dosya_yolu.suffix.lower() in (".tif", ".tiff"):
+        return cv2.imcount(str(dosya_yolu))
+    return 1
+
+
+def sayfalari_listele(dosya_yollari) -> Iterator[Sayfa]:
+    """Dosyaları okuma birimlerine açar; çok sayfalı dosyalar her sayfa için bir birim üretir.
+
+    Sayfalar burada çözülmez, yalnızca sayılır. Sayılamayan dosya tek birim
+    olarak bırakılır; hatası okuma sırasında o sayfanın sonucuna yazılır.
+    """
+    for dosya_yolu in dosya_yollari:
+        dosya_yolu = Path(dosya_yolu)
+        try:
+            adet = sayfa_sayisi(dosya_yolu)
+        except Exception as e:
+            logger.error(f"Sayfa sayısı okunamadı ({dosya_yolu.name}): {e}")
+            adet = 1
+        if adet <= 1 and dosya_yolu.suffix.lower() != ".pdf":
+            yield dosya_yolu, None
+        else:
+            for sayfa_no in range(1, adet + 1):
+                yield dosya_yolu, sayfa_no
+
+
+def sayfa_etiketi(dosya_yolu: Path, sayfa_no: Optional[int]) -> str:
+    """Sonuç ve hata ayıklama dosya adlarında kullanılan sayfa adı"""
+    stem = Path(dosya_yolu).stem
+    return stem if sayfa_no is None else f"{stem}_sayfa{sayfa_no:03d}"
+
+
+def sayfa_oku(dosya_yolu: Path, sayfa_no: Optional[int] = None, kucultme: int = 1) -> Optional[np.ndarray]:
+    """Tek bir sayfayı gri tonlamalı okur; dosyanın diğer sayfaları belleğe alınmaz.
+
+    sayfa_no 1'den başlar; None tek sayfalık dosyanın (veya ilk sayfanın)
+    okunacağını belirtir. kucultme > 1 ise sayfa bu oranda küçültülür.
+    """
+    dosya_yolu = Path(dosya_yolu)
+    uzanti = dosya_yolu.suffix.lower()
+    indeks = (sayfa_no or 1) - 1
+
+    if uzanti == ".pdf":
+        return _pdf_sayfasi_oku(dosya_yolu, indeks, kucultme)
+
+    if sayfa_no is None:
+        return cv2.imread(str(dosya_yolu), KUCULTME_BAYRAKLARI[kucultme])
+
+    basarili, sayfalar = cv2.imreadmulti(str(dosya_yolu), start=indeks, count=1, flags=cv2.IMREAD_GRAYSCALE)
+    if not basarili or not sayfalar:
+        return None
+    gray = sayfalar[0]
+    # imreadmulti küçültülmüş okuma bayraklarını desteklemez
+    if kucultme > 1:
+        gray = cv2.resize(gray, (gray.shape[1] // kucultme, gray.shape[0] // kucultme),
+                          interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _pdf_sayfasi_oku(dosya_yolu: Path, indeks: int, kucultme: int) -> Optional[np.ndarray]:
+    if fitz is None:
+        raise ImportError("PDF girdiler için PyMuPDF (fitz) kurulu olmalıdır")
+    with fitz.open(str(dosya_yolu)) as belge:
+        if not 0 <= indeks < belge.page_count:
+            return None
+        pix = belge.load_page(indeks).get_pixmap(dpi=settings.OPTIK_PDF_DPI // kucultme,
+                                                 colorspace=fitz.csGRAY)
+        gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+        return gray[:, :pix.width].copy()